@@ -11,13 +11,22 @@ class BleDevice {
   final String id;
   final BluetoothDevice device;
   final String? serialNumber;
+  // TR: Reklamdaki üretici verisinden: device_hash'in ilk 4 baytı ve durum baytı | EN: From advertised manufacturer data: first 4 bytes of device_hash and the state byte | RU: Из рекламных данных производителя: первые 4 байта device_hash и байт состояния
+  final String? hashPrefix;
+  final int? state;
 
   BleDevice({
     required this.name,
     required this.id,
     required this.device,
     this.serialNumber,
+    this.hashPrefix,
+    this.state,
   });
+
+  bool get wifiConnected => ((state ?? 0) & BleService.stateWifi) != 0;
+  bool get streaming => ((state ?? 0) & BleService.stateStreaming) != 0;
+  bool get provisioned => ((state ?? 0) & BleService.stateProvisioned) != 0;
 }
 
 class BleService {
@@ -28,6 +37,12 @@ class BleService {
   static const String wifiServiceUuid = '12345678-1234-5678-9abc-123456789abc';
   static const String credentialCharUuid = '87654321-4321-4321-4321-cba987654321';
 
+  // TR: Cihazın reklam ettiği üretici verisi: [durum, hash0..hash3] | EN: Manufacturer data advertised by the device: [state, hash0..hash3] | RU: Данные производителя в рекламе устройства: [состояние, hash0..hash3]
+  static const int optixCompanyId = 0xFFFF;
+  static const int stateWifi = 0x01;
+  static const int stateStreaming = 0x02;
+  static const int stateProvisioned = 0x04;
+
   StreamSubscription<List<ScanResult>>? _scanSubscription;
   final List<BleDevice> _devices = [];
   bool _isScanning = false;
@@ -338,6 +353,20 @@ class BleService {
             debugPrint('  No service UUIDs in advertisement data');
           }
 
+          // TR: OPTIX üretici verisi: bağlanmadan kimlik ve durum | EN: OPTIX manufacturer data: identity and state without connecting | RU: Данные производителя OPTIX: идентификатор и состояние без подключения
+          String? hashPrefix;
+          int? state;
+          final optixData = result.advertisementData.manufacturerData[optixCompanyId];
+          if (optixData != null && optixData.length >= 5) {
+            state = optixData[0];
+            hashPrefix = optixData
+                .sublist(1, 5)
+                .map((b) => b.toRadixString(16).padLeft(2, '0'))
+                .join();
+            isOptixDevice = true;
+            matchReason = 'manufacturer data: $hashPrefix';
+          }
+
           // TR: Üretici verilerinde OPTIX var mı bak | EN: Check manufacturer data for OPTIX | RU: Проверить данные производителя на наличие OPTIX
           if (result.advertisementData.manufacturerData.isNotEmpty) {
             for (var entry in result.advertisementData.manufacturerData.entries) {
@@ -356,6 +385,8 @@ class BleService {
               name: displayName,
               id: device.remoteId.toString(),
               device: device,
+              hashPrefix: hashPrefix,
+              state: state,
             );
 
             // TR: Cihaz listede var mı kontrol et | EN: Check if device already exists | RU: Проверить, есть ли устройство уже в списке
@@ -84,6 +84,52 @@ class SupabaseService {
     return List<Map<String, dynamic>>.from(response);
   }
   
+  /// TR: Kullanıcının sonuçlarında tam metin/bulanık arama (sıralı; file ve box dahil) | EN: Full-text/fuzzy search in a user's results (ranked; includes file and box) | RU: Полнотекстовый/нечеткий поиск по результатам пользователя (ранжированный; с file и box)
+  Future<List<Map<String, dynamic>>> searchUserResults(
+    String userId,
+    String query, {
+    int limit = 20,
+  }) async {
+    final response = await client.rpc('search_results', params: {
+      'p_user': userId,
+      'p_query': query,
+      'p_limit': limit,
+    });
+    return List<Map<String, dynamic>>.from(response);
+  }
+
+  /// TR: Görüntü bölgesiyle kesişen metin blokları (box_points: [x1, y1, ..., x4, y4] tamsayı) | EN: Text blocks overlapping an image region (box_points: [x1, y1, ..., x4, y4] integers) | RU: Текстовые блоки, пересекающие область изображения (box_points: [x1, y1, ..., x4, y4] целые)
+  Future<List<Map<String, dynamic>>> getResultsInRegion(
+    String userId,
+    int x1,
+    int y1,
+    int x2,
+    int y2, {
+    int margin = 0,
+    String? file,
+    String? textType,
+    int limit = 200,
+  }) async {
+    final response = await client.rpc('results_in_region', params: {
+      'p_user': userId,
+      'p_x1': x1,
+      'p_y1': y1,
+      'p_x2': x2,
+      'p_y2': y2,
+      'p_margin': margin,
+      if (file != null) 'p_file': file,
+      if (textType != null) 'p_text_type': textType,
+      'p_limit': limit,
+    });
+    return List<Map<String, dynamic>>.from(response);
+  }
+
+  /// TR: Satırın kutusunu dizge ayrıştırmadan oku | EN: Read a row's box without string parsing | RU: Прочитать рамку строки без разбора строки
+  static List<int>? boxPoints(Map<String, dynamic> row) {
+    final points = row['box_points'];
+    return points is List ? points.cast<num>().map((v) => v.toInt()).toList() : null;
+  }
+
   /// TR: Tüm kullanıcılar için metin tipine göre sonuçları getir | EN: Get results by text type for all users | RU: Получить результаты по типу текста для всех пользователей
   Future<List<Map<String, dynamic>>> getResultsByType(String textType) async {
     final response = await client
@@ -1,6 +1,7 @@
 import 'package:flutter/material.dart';
 import '../widgets/app_drawer.dart';
 import '../../controllers/auth_service.dart';
+import '../../controllers/supabase.dart';
 
 class RawScreen extends StatefulWidget {
   const RawScreen({super.key});
@@ -59,6 +60,17 @@ class _RawScreenState extends State<RawScreen> {
     });
   }
 
+  /// TR: Kutunun eksen hizalı sınırları (sol,üst → sağ,alt) | EN: Axis-aligned bounds of the box (left,top → right,bottom) | RU: Выровненные по осям границы рамки (лево,верх → право,низ)
+  String? _boxLabel(Map<String, dynamic> row) {
+    final points = SupabaseService.boxPoints(row);
+    if (points == null || points.length != 8) return null;
+    final xs = [points[0], points[2], points[4], points[6]];
+    final ys = [points[1], points[3], points[5], points[7]];
+    xs.sort();
+    ys.sort();
+    return '${xs.first},${ys.first} → ${xs.last},${ys.last}';
+  }
+
   @override
   Widget build(BuildContext context) {
     return Scaffold(
@@ -81,10 +93,11 @@ class _RawScreenState extends State<RawScreen> {
               itemCount: filtered.length,
               itemBuilder: (_, i) {
                 final r = filtered[i];
+                final box = _boxLabel(r);
                 return ListTile(
                   title: Text(r['text'] ?? ''),
                   subtitle: Text(
-                    "file: ${r['file']} • conf: ${r['confidence']}",
+                    "file: ${r['file']} • conf: ${r['confidence']}${box != null ? ' • box: $box' : ''}",
                   ),
                 );
               },
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+TR: OPTIX komut protokolü karşılaştırması - metin/JSON ve ikili TLV | EN: OPTIX command protocol benchmark - text/JSON vs binary TLV | RU: Сравнение протоколов команд OPTIX — текст/JSON и двоичный TLV
+TR: Havadaki bayt, ATT paket sayısı ve çözme+dağıtım süresi | EN: Bytes on air, ATT packet count and decode+dispatch time | RU: Байты в эфире, число ATT-пакетов и время декодирования+диспетчеризации
+"""
+
+import argparse
+import json
+import time
+
+import optix_smart_glasses as optix
+
+SAMPLES = [
+    ('scan_wifi', optix.OP_SCAN_WIFI, {}),
+    ('get_serial', optix.OP_GET_SERIAL, {}),
+    ('profile', optix.OP_PROFILE, {'seconds': 30}),
+    ('auth', optix.OP_AUTH, {'username': 'elzemeth', 'password': 'correct horse battery',
+                             'device_serial': '10000000a1b2c3d4'}),
+    ('register', optix.OP_REGISTER, {'username': 'elzemeth', 'email': 'elzemeth@example.com',
+                                     'password': 'correct horse battery',
+                                     'device_serial': '10000000a1b2c3d4'}),
+]
+
+def text_encoding(name: str, fields: dict) -> bytes:
+    """TR: Uygulamanın bugün gönderdiği metin biçimi | EN: The text form the app sends today | RU: Текстовая форма, которую приложение отправляет сейчас"""
+    if not fields:
+        return name.encode('utf-8')
+    if name == 'profile':
+        return f"profile:{fields['seconds']}".encode('utf-8')
+    return f"{name}:{json.dumps(fields)}".encode('utf-8')
+
+def att_packets(payload: bytes, mtu: int) -> int:
+    if len(payload) <= mtu - optix.ATT_OVERHEAD:
+        return 1
+    return len(optix.fragment_message(payload, 0, mtu))
+
+def time_dispatch(payload: bytes, table: dict, rounds: int) -> float:
+    """TR: Çağrı başına ortalama mikro saniye | EN: Mean microseconds per call | RU: Среднее время вызова в микросекундах"""
+    started = time.perf_counter()
+    for _ in range(rounds):
+        request = optix.read_command(payload)
+        table[request.opcode](request.fields)
+    return (time.perf_counter() - started) / rounds * 1e6
+
+def main():
+    parser = argparse.ArgumentParser(description='OPTIX command protocol benchmark')
+    parser.add_argument('--rounds', type=int, default=20000)
+    parser.add_argument('--mtu', type=int, default=23, help='ATT MTU (23 = BLE default)')
+    args = parser.parse_args()
+
+    # TR: Gerçek işleyiciler yerine boş işleyiciler: yalnızca protokol maliyeti ölçülür | EN: No-op handlers instead of real ones: only protocol cost is measured | RU: Пустые обработчики вместо реальных: измеряется только стоимость протокола
+    table = {opcode: (lambda fields: None) for opcode in optix.TEXT_COMMANDS.values()}
+
+    print(f"{'command':<12}{'text B':>8}{'bin B':>8}{'text pk':>9}{'bin pk':>8}{'text us':>10}{'bin us':>9}")
+    totals = [0, 0]
+    for request_id, (name, opcode, fields) in enumerate(SAMPLES, 1):
+        text = text_encoding(name, fields)
+        binary = optix.encode_command(opcode, fields, request_id)
+        totals[0] += len(text)
+        totals[1] += len(binary)
+        print(f"{name:<12}{len(text):>8}{len(binary):>8}"
+              f"{att_packets(text, args.mtu):>9}{att_packets(binary, args.mtu):>8}"
+              f"{time_dispatch(text, table, args.rounds):>10.2f}"
+              f"{time_dispatch(binary, table, args.rounds):>9.2f}")
+    print(f"{'total':<12}{totals[0]:>8}{totals[1]:>8}  ({100 * (1 - totals[1] / totals[0]):.0f}% fewer bytes)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+TR: OPTIX alıcı karşılaştırması - sıralı aşamalar ve çok süreçli aşamalı havuz | EN: OPTIX receiver benchmark - sequential stages vs the multi-process staged pool | RU: Сравнение приемника OPTIX — последовательные стадии и многопроцессный поэтапный пул
+TR: Yer tutucu (CPU) aşamalarla sentetik kareler işlenir; kare/s ve satır/s raporlanır | EN: Synthetic frames run through the CPU stand-in stages; frames/s and rows/s are reported | RU: Синтетические кадры проходят через CPU-заглушки стадий; выводятся кадры/с и строки/с
+"""
+
+import argparse
+import os
+import time
+
+from optix_receiver import DEFAULT_STAGES, STAGE_ORDER, StagedPipeline, load_stage, result_rows
+
+def frames(count: int, size: int) -> list:
+    return [{'created_by': 'bench', 'file': f'image_{n}.jpg', 'ts': float(n), 'image': os.urandom(size)}
+            for n in range(count)]
+
+def run_sequential(items: list, rounds: int) -> int:
+    # TR: Bugünkü biçim: her kare üç aşamadan tek süreçte art arda geçer | EN: Today's shape: each frame passes the three stages back to back in one process | RU: Текущая схема: каждый кадр последовательно проходит три стадии в одном процессе
+    stages = [load_stage(DEFAULT_STAGES[name], {'rounds': rounds}) for name in STAGE_ORDER]
+    rows = 0
+    for item in items:
+        batch = [item]
+        for name, stage in zip(STAGE_ORDER, stages):
+            batch = stage.process(batch)
+            rows += len(result_rows(batch[0], name))
+    return rows
+
+def run_pipeline(items: list, rounds: int, workers: dict, batch: int, queue_size: int) -> tuple:
+    counted = [0]
+    pipeline = StagedPipeline(lambda rows: counted.__setitem__(0, counted[0] + len(rows)), workers=workers,
+                              batch={name: batch for name in STAGE_ORDER}, queue_size=queue_size,
+                              options={'rounds': rounds})
+    pipeline.start()
+    time.sleep(1.0)  # Let the spawned workers import before timing
+    started = time.perf_counter()
+    for item in items:
+        pipeline.submit(item, timeout=None)
+    pipeline.close()
+    return counted[0], time.perf_counter() - started, pipeline.stats()
+
+def main():
+    cores = os.cpu_count() or 1
+    parser = argparse.ArgumentParser(description='OPTIX receiver pipeline benchmark')
+    parser.add_argument('--frames', type=int, default=200)
+    parser.add_argument('--frame-kb', type=int, default=120, help='Synthetic JPEG size')
+    parser.add_argument('--rounds', type=int, default=20000, help='CPU cost per stand-in stage call')
+    parser.add_argument('--batch', type=int, default=4)
+    parser.add_argument('--queue', type=int, default=64)
+    args = parser.parse_args()
+
+    items = frames(args.frames, args.frame_kb * 1024)
+    print(f"{args.frames} frames, {cores} cores, {args.rounds} rounds per stage call")
+    print(f"{'mode':<26}{'seconds':>9}{'frames/s':>10}{'rows':>8}")
+
+    started = time.perf_counter()
+    rows = run_sequential([dict(item) for item in items], args.rounds)
+    elapsed = time.perf_counter() - started
+    print(f"{'sequential':<26}{elapsed:>9.2f}{args.frames / elapsed:>10.1f}{rows:>8}")
+
+    # TR: Yer tutucularda raw kare başına, düzelticiler blok başına bir kez çalışır | EN: With the stand-ins raw runs once per frame and the correctors once per block | RU: В заглушках raw выполняется раз на кадр, корректоры — раз на блок
+    configs = [{'raw': 1, 'character_corrected': 1, 'meaning_corrected': 1}]
+    if cores >= 4:
+        share = max(1, cores // 3)
+        configs.append({'raw': share, 'character_corrected': share, 'meaning_corrected': share})
+    for workers in configs:
+        rows, elapsed, stats = run_pipeline(items, args.rounds, workers, args.batch, args.queue)
+        label = 'pipeline ' + '/'.join(str(workers[name]) for name in STAGE_ORDER)
+        print(f"{label:<26}{elapsed:>9.2f}{args.frames / elapsed:>10.1f}{rows:>8}")
+        print('    busy s: ' + ', '.join(f"{name} {stats[name]['busy_sec']:.2f}" for name in STAGE_ORDER))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+TR: OPTIX sonuç düzeni karşılaştırması - aşama başına satır (results_legacy) ve blok başına satır (result_blocks) | EN: OPTIX results layout benchmark - one row per stage (results_legacy) vs one row per block (result_blocks) | RU: Сравнение схем хранения результатов OPTIX — строка на стадию (results_legacy) и строка на блок (result_blocks)
+TR: Aynı veriyi iki düzende yükler; tablo/indeks boyutlarını ve tipik sorguların gecikmesini yerel Postgres'te ölçer | EN: Loads the same data in both layouts; measures table/index sizes and typical query latency on a local Postgres | RU: Загружает одинаковые данные в обе схемы; измеряет размеры таблиц/индексов и задержку типичных запросов на локальном Postgres
+"""
+
+import argparse
+import random
+import statistics
+import time
+
+from bench_search import ROLES_SQL, SETUP_SQL, USERS_SQL, sample_words
+
+try:
+    import psycopg2
+    HAS_PSYCOPG2 = True
+except ImportError:
+    HAS_PSYCOPG2 = False
+
+BENCH_DB = 'optix_layout_bench'
+INSERT_CHUNK = 100000
+STAGES = ('raw', 'character_corrected', 'meaning_corrected')
+
+# TR: Bölüm 19/20 indeksleriyle birlikte eski tablo | EN: The old table with its section 19/20 indexes | RU: Старая таблица с индексами из разделов 19/20
+LEGACY_SQL = """
+CREATE TABLE public.results_legacy (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    created_by UUID NOT NULL REFERENCES public.users(id) ON DELETE CASCADE,
+    file VARCHAR(255),
+    ts DOUBLE PRECISION,
+    text_index INTEGER,
+    text_type VARCHAR(50),
+    text TEXT,
+    confidence DOUBLE PRECISION,
+    box TEXT,
+    box_points INTEGER[],
+    box_bounds BOX,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    text_search TSVECTOR GENERATED ALWAYS AS (to_tsvector('simple', coalesce(text, ''))) STORED
+);
+CREATE INDEX idx_legacy_user_date ON public.results_legacy (created_by, created_at DESC);
+CREATE INDEX idx_legacy_user_type_date ON public.results_legacy (created_by, text_type, created_at DESC);
+CREATE INDEX idx_legacy_file ON public.results_legacy (file);
+CREATE INDEX idx_legacy_user_text_search ON public.results_legacy USING GIN (created_by, text_search);
+CREATE INDEX idx_legacy_user_text_trgm ON public.results_legacy USING GIN (created_by, text gin_trgm_ops);
+CREATE INDEX idx_legacy_user_box ON public.results_legacy USING GIST (created_by, box_bounds);
+"""
+
+# TR: Blok başına üç aşama satırı; aşamalar yalnızca metinde farklı | EN: Three stage rows per block; stages differ only in text | RU: Три строки стадий на блок; стадии отличаются только текстом
+LEGACY_ROWS_SQL = """
+INSERT INTO public.results_legacy (created_by, file, ts, text_index, text_type, text, confidence, box, box_points, box_bounds, created_at)
+SELECT b.owner, b.file, b.ts, b.text_index, s.stage,
+       CASE s.stage WHEN 'raw' THEN upper(b.text) ELSE b.text END,
+       b.confidence, b.box, b.points, box_points_bounds(b.points), b.created_at
+FROM (
+    SELECT u.ids[1 + g %% array_length(u.ids, 1)] AS owner,
+           'image_' || (g / 12) || '.jpg' AS file,
+           1757612552 + g AS ts,
+           g %% 12 AS text_index,
+           random() AS confidence,
+           '[[' || (g %% 4000) || ', 100], [' || (g %% 4000 + 300) || ', 100], [' || (g %% 4000 + 300) || ', 140], [' || (g %% 4000) || ', 140]]' AS box,
+           ARRAY[g %% 4000, 100, g %% 4000 + 300, 100, g %% 4000 + 300, 140, g %% 4000, 140] AS points,
+           NOW() - g * INTERVAL '1 second' AS created_at,
+           (SELECT string_agg(w.words[1 + floor(random() * array_length(w.words, 1))::int], ' ')
+            FROM generate_series(1, 8 + g %% 16) n WHERE n > 0 AND g > 0) AS text
+    FROM generate_series(%(start)s, %(stop)s) g,
+         (SELECT array_agg(id ORDER BY username) AS ids FROM public.users) u,
+         (SELECT %(words)s::text[] AS words) w
+) b
+CROSS JOIN unnest(%(stages)s::text[]) AS s(stage)
+"""
+
+# TR: 002 geçişindeki katlama sorgusunun aynısı | EN: Same fold as migration 002 | RU: Та же свертка, что в миграции 002
+FOLD_SQL = """
+INSERT INTO public.result_blocks (created_by, file, ts, text_index, confidence, box, box_points, variants, created_at)
+SELECT l.created_by, l.file, min(l.ts), l.text_index, max(l.confidence), min(l.box),
+       (array_agg(l.box_points) FILTER (WHERE l.box_points IS NOT NULL))[1],
+       jsonb_object_agg(coalesce(l.text_type, 'raw'), l.text ORDER BY l.created_at),
+       min(l.created_at)
+FROM public.results_legacy l
+GROUP BY l.created_by, l.file, l.text_index
+"""
+
+SIZE_SQL = """
+SELECT c.relname,
+       pg_table_size(c.oid) AS heap,
+       pg_indexes_size(c.oid) AS indexes,
+       c.reltuples::BIGINT AS rows
+FROM pg_class c
+WHERE c.oid = %s::REGCLASS
+"""
+
+INDEX_SIZES_SQL = """
+SELECT indexrelid::REGCLASS::TEXT, pg_relation_size(indexrelid)
+FROM pg_index WHERE indrelid = %s::REGCLASS ORDER BY 1
+"""
+
+# TR: (ad, eski düzen sorgusu, blok düzeni sorgusu); parametreler: kullanıcı, dosya, terim | EN: (name, legacy query, block query); params: user, file, term | RU: (имя, запрос старой схемы, запрос блоков); параметры: пользователь, файл, термин
+QUERIES = [
+    ('latest 20 blocks',
+     "SELECT * FROM public.results_legacy WHERE created_by = %(user)s ORDER BY created_at DESC LIMIT 60",
+     "SELECT * FROM public.result_blocks WHERE created_by = %(user)s ORDER BY created_at DESC LIMIT 20"),
+    ('one frame',
+     "SELECT * FROM public.results_legacy WHERE created_by = %(user)s AND file = %(file)s",
+     "SELECT * FROM public.result_blocks WHERE created_by = %(user)s AND file = %(file)s"),
+    ('meaning stage, 50',
+     "SELECT * FROM public.results_legacy WHERE created_by = %(user)s AND text_type = 'meaning_corrected' "
+     "ORDER BY created_at DESC LIMIT 50",
+     "SELECT id, file, variants->>'meaning_corrected' FROM public.result_blocks "
+     "WHERE created_by = %(user)s AND variants ? 'meaning_corrected' ORDER BY created_at DESC LIMIT 50"),
+    ('term search',
+     "SELECT id FROM public.results_legacy WHERE created_by = %(user)s "
+     "AND text_search @@ websearch_to_tsquery('simple', %(term)s) LIMIT 60",
+     "SELECT id FROM public.result_blocks WHERE created_by = %(user)s "
+     "AND text_search @@ websearch_to_tsquery('simple', %(term)s) LIMIT 20"),
+    ('region',
+     "SELECT id FROM public.results_legacy WHERE created_by = %(user)s "
+     "AND box_bounds && box(point(1000, 90), point(1400, 150)) LIMIT 300",
+     "SELECT id FROM public.result_blocks WHERE created_by = %(user)s "
+     "AND box_bounds && box(point(1000, 90), point(1400, 150)) LIMIT 100"),
+    ('compat view, 60 rows',
+     None,
+     "SELECT * FROM public.results WHERE created_by = %(user)s ORDER BY created_at DESC LIMIT 60"),
+]
+
+def prepare(admin_dsn: str, users: int, blocks: int) -> str:
+    admin = psycopg2.connect(admin_dsn)
+    admin.autocommit = True
+    with admin.cursor() as cur:
+        cur.execute(f"DROP DATABASE IF EXISTS {BENCH_DB}")
+        cur.execute(f"CREATE DATABASE {BENCH_DB}")
+        cur.execute(ROLES_SQL)
+    admin.close()
+
+    dsn = f"{admin_dsn} dbname={BENCH_DB}"
+    conn = psycopg2.connect(dsn)
+    conn.autocommit = True
+    words = sample_words()
+    with conn.cursor() as cur, open(SETUP_SQL, encoding='utf-8') as f:
+        cur.execute(f.read())
+        cur.execute(LEGACY_SQL)
+        cur.execute(USERS_SQL, {'users': users})
+        started = time.monotonic()
+        for start in range(1, blocks + 1, INSERT_CHUNK):
+            stop = min(start + INSERT_CHUNK - 1, blocks)
+            cur.execute(LEGACY_ROWS_SQL, {'start': start, 'stop': stop, 'words': words, 'stages': list(STAGES)})
+            print(f"  loaded {stop} blocks ({stop / (time.monotonic() - started):.0f} blocks/s)")
+        started = time.monotonic()
+        cur.execute(FOLD_SQL)
+        print(f"  folded into result_blocks in {time.monotonic() - started:.1f}s")
+        cur.execute("VACUUM ANALYZE public.results_legacy")
+        cur.execute("VACUUM ANALYZE public.result_blocks")
+    conn.close()
+    return dsn
+
+def report_sizes(cur):
+    print(f"{'table':<16}{'rows':>10}{'heap MB':>10}{'index MB':>10}{'total MB':>10}")
+    totals = {}
+    for table in ('results_legacy', 'result_blocks'):
+        cur.execute(SIZE_SQL, (f'public.{table}',))
+        name, heap, indexes, rows = cur.fetchone()
+        totals[table] = heap + indexes
+        print(f"{name:<16}{rows:>10}{heap / 2**20:>10.1f}{indexes / 2**20:>10.1f}{(heap + indexes) / 2**20:>10.1f}")
+    print(f"block layout is {totals['result_blocks'] / totals['results_legacy']:.0%} of the per-stage layout")
+    for table in ('results_legacy', 'result_blocks'):
+        cur.execute(INDEX_SIZES_SQL, (f'public.{table}',))
+        for index, size in cur.fetchall():
+            print(f"  {index:<38}{size / 2**20:>8.1f} MB")
+
+def measure(cur, sql: str, params: dict, rounds: int) -> list:
+    timings = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        cur.execute(sql, params)
+        cur.fetchall()
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+def summary(timings: list) -> str:
+    if not timings:
+        return f"{'-':>8}{'-':>8}"
+    timings.sort()
+    return f"{statistics.median(timings):>8.2f}{timings[int(len(timings) * 0.95) - 1]:>8.2f}"
+
+def main():
+    parser = argparse.ArgumentParser(description='OPTIX results layout benchmark (local Postgres)')
+    parser.add_argument('--dsn', default='host=localhost user=postgres', help='libpq DSN without dbname')
+    parser.add_argument('--users', type=int, default=100)
+    parser.add_argument('--blocks', type=int, default=500000, help='Text blocks (x3 stage rows in the legacy table)')
+    parser.add_argument('--rounds', type=int, default=200)
+    parser.add_argument('--skip-load', action='store_true', help=f'Reuse the existing {BENCH_DB} database')
+    args = parser.parse_args()
+    if not HAS_PSYCOPG2:
+        raise SystemExit("psycopg2 is required (pip install psycopg2-binary)")
+
+    if args.skip_load:
+        dsn = f"{args.dsn} dbname={BENCH_DB}"
+    else:
+        print(f"Loading {args.blocks} blocks ({args.blocks * len(STAGES)} stage rows) for {args.users} users...")
+        dsn = prepare(args.dsn, args.users, args.blocks)
+
+    words = sample_words()
+    random.seed(7)
+    conn = psycopg2.connect(dsn)
+    with conn.cursor() as cur:
+        report_sizes(cur)
+        cur.execute("SELECT created_by, file FROM public.result_blocks ORDER BY random() LIMIT 20")
+        samples = cur.fetchall()
+        print(f"\n{'query':<22}{'legacy p50':>12}{'p95':>8}{'blocks p50':>12}{'p95':>8}")
+        for name, legacy_sql, block_sql in QUERIES:
+            legacy, blocks = [], []
+            for user, file in samples:
+                params = {'user': user, 'file': file, 'term': random.choice(words)}
+                per_sample = max(1, args.rounds // len(samples))
+                if legacy_sql:
+                    legacy += measure(cur, legacy_sql, params, per_sample)
+                blocks += measure(cur, block_sql, params, per_sample)
+            print(f"{name:<22}{summary(legacy):>20}{summary(blocks):>20}")
+    conn.close()
+
+if __name__ == "__main__":
+    main()
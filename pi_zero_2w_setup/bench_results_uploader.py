@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+TR: OPTIX sonuç yükleyici karşılaştırması - satır başına POST ve toplu/gzip ekleme | EN: OPTIX results uploader benchmark - one POST per row vs batched/gzip inserts | RU: Сравнение загрузчика результатов OPTIX — POST на строку и пакетные/gzip вставки
+TR: results_rows.csv biçimindeki veriyle yerel sahte PostgREST'e karşı çalışır | EN: Runs against a local fake PostgREST with results_rows.csv-shaped data | RU: Работает с локальным фиктивным PostgREST на данных формата results_rows.csv
+"""
+
+import argparse
+import csv
+import gzip
+import json
+import os
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from results_uploader import ResultsUploader
+from supabase_client import SupabaseClient
+
+DEFAULT_CSV = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'results_rows.csv')
+
+class FakePostgrest(BaseHTTPRequestHandler):
+    """TR: Gövdeyi çözüp satırları sayan sahte uç nokta; PostgREST gibi gzip'i 400 ile reddeder | EN: Fake endpoint that decodes the body and counts rows; like PostgREST it rejects gzip with 400 | RU: Фиктивная конечная точка, декодирующая тело и считающая строки; как PostgREST, отклоняет gzip с 400"""
+    protocol_version = 'HTTP/1.1'
+    gzip_gateway = False  # True: a proxy in front decompresses gzip bodies
+    rows = 0
+    requests = 0
+    wire_bytes = 0
+    latency = 0.0
+    lock = threading.Lock()
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers['Content-Length']))
+        wire = len(body) + sum(len(k) + len(v) + 4 for k, v in self.headers.items())
+        if self.headers.get('Content-Encoding') == 'gzip':
+            if not self.gzip_gateway:
+                # TR: PostgREST Content-Encoding'i yok sayar ve gövdeyi JSON olarak okur | EN: PostgREST ignores Content-Encoding and parses the body as JSON | RU: PostgREST игнорирует Content-Encoding и разбирает тело как JSON
+                with FakePostgrest.lock:
+                    FakePostgrest.requests += 1
+                    FakePostgrest.wire_bytes += wire
+                reply = b'{"code":"PGRST102","message":"Empty or invalid json"}'
+                self.send_response(400)
+                self.send_header('Content-Length', str(len(reply)))
+                self.end_headers()
+                self.wfile.write(reply)
+                return
+            body = gzip.decompress(body)
+        rows = json.loads(body)
+        if isinstance(rows, dict):
+            rows = rows.get('p_rows', [rows])  # upsert_results RPC body
+        time.sleep(self.latency)  # Simulated network round trip + insert
+        with FakePostgrest.lock:
+            FakePostgrest.rows += len(rows) if isinstance(rows, list) else 1
+            FakePostgrest.requests += 1
+            FakePostgrest.wire_bytes += wire
+        self.send_response(201)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+def load_rows(path: str, count: int) -> list:
+    """TR: CSV satırlarını istenen sayıya kadar çoğalt | EN: Repeat the CSV rows up to the requested count | RU: Повторять строки CSV до нужного количества"""
+    with open(path, newline='', encoding='utf-8') as f:
+        template = [{k: v for k, v in row.items() if k not in ('id', 'created_at')} for row in csv.DictReader(f)]
+    for row in template:
+        row['ts'] = float(row['ts'])
+        row['text_index'] = int(row['text_index'])
+        row['confidence'] = float(row['confidence'])
+    return [dict(template[i % len(template)]) for i in range(count)]
+
+def reset():
+    FakePostgrest.rows = FakePostgrest.requests = FakePostgrest.wire_bytes = 0
+
+def run_single(client, rows: list):
+    # TR: Bugünkü davranış: her metin bloğu için ayrı bir ekleme | EN: Today's behaviour: one insert per text block | RU: Текущее поведение: одна вставка на каждый текстовый блок
+    for row in rows:
+        client.post('results', json=row)
+
+def run_uploader(client, rows: list, compress: bool, batch_rows: int):
+    with tempfile.TemporaryDirectory() as spool:
+        uploader = ResultsUploader(client, batch_rows=batch_rows, spool_dir=spool, compress=compress)
+        uploader.start()
+        # TR: Sayfa başına ~ düzine satır gelir, alıcıdaki gibi | EN: Rows arrive a page (~a dozen) at a time, as in the receiver | RU: Строки приходят постранично (~дюжина), как в приемнике
+        for start in range(0, len(rows), 12):
+            uploader.add_many(rows[start:start + 12])
+        uploader.close()
+
+def main():
+    parser = argparse.ArgumentParser(description='OPTIX results uploader benchmark')
+    parser.add_argument('--csv', default=DEFAULT_CSV)
+    parser.add_argument('--rows', type=int, default=2000)
+    parser.add_argument('--batch', type=int, default=200)
+    parser.add_argument('--latency-ms', type=float, default=20.0, help='Simulated per-request latency')
+    parser.add_argument('--gzip-gateway', action='store_true',
+                        help='Simulate a proxy that decompresses gzip bodies (plain PostgREST answers 400)')
+    args = parser.parse_args()
+
+    rows = load_rows(args.csv, args.rows)
+    FakePostgrest.latency = args.latency_ms / 1000
+    FakePostgrest.gzip_gateway = args.gzip_gateway
+    server = ThreadingHTTPServer(('127.0.0.1', 0), FakePostgrest)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    client = SupabaseClient(f"http://127.0.0.1:{server.server_address[1]}", 'bench-key')
+
+    modes = [
+        ('per-row', lambda: run_single(client, rows)),
+        ('batched', lambda: run_uploader(client, rows, False, args.batch)),
+        ('batched+gzip', lambda: run_uploader(client, rows, True, args.batch)),
+    ]
+    print(f"{len(rows)} rows, {args.latency_ms:.0f} ms simulated latency")
+    print(f"{'mode':<14}{'requests':>9}{'wire KB':>10}{'seconds':>9}{'rows/s':>10}")
+    for name, run in modes:
+        reset()
+        started = time.perf_counter()
+        run()
+        elapsed = time.perf_counter() - started
+        assert FakePostgrest.rows == len(rows), (name, FakePostgrest.rows)
+        print(f"{name:<14}{FakePostgrest.requests:>9}{FakePostgrest.wire_bytes / 1024:>10.1f}"
+              f"{elapsed:>9.2f}{len(rows) / elapsed:>10.0f}")
+    server.shutdown()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+TR: OPTIX sonuç araması karşılaştırması - yerel Postgres üzerinde search_results | EN: OPTIX results search benchmark - search_results on a local Postgres | RU: Сравнение поиска результатов OPTIX — search_results на локальном Postgres
+TR: Geçici bir veritabanı kurar, supabase_setup.sql'i uygular, milyonlarca satır üretir ve kullanıcı başına gecikmeyi ölçer | EN: Creates a scratch database, applies supabase_setup.sql, generates millions of rows and measures per-user latency | RU: Создает временную базу, применяет supabase_setup.sql, генерирует миллионы строк и измеряет задержку на пользователя
+"""
+
+import argparse
+import csv
+import os
+import random
+import re
+import statistics
+import time
+
+try:
+    import psycopg2
+    HAS_PSYCOPG2 = True
+except ImportError:
+    HAS_PSYCOPG2 = False
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+SETUP_SQL = os.path.join(ROOT, 'supabase_setup.sql')
+RESULTS_CSV = os.path.join(ROOT, 'results_rows.csv')
+BENCH_DB = 'optix_search_bench'
+INSERT_CHUNK = 200000
+TARGET_MS = 50.0
+
+# TR: Supabase rollerini taklit et (GRANT ifadeleri için) | EN: Stand in for the Supabase roles (for the GRANT statements) | RU: Заменить роли Supabase (для операторов GRANT)
+ROLES_SQL = """
+DO $$
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM pg_roles WHERE rolname = 'anon') THEN CREATE ROLE anon; END IF;
+    IF NOT EXISTS (SELECT 1 FROM pg_roles WHERE rolname = 'authenticated') THEN CREATE ROLE authenticated; END IF;
+END $$;
+"""
+
+USERS_SQL = """
+INSERT INTO public.users (username, email, password_hash)
+SELECT 'bench_' || g, 'bench_' || g || '@example.com', md5(g::text)
+FROM generate_series(1, %(users)s) g
+"""
+
+# TR: Her blok, örnek metinlerden rastgele 8-23 kelime; üç düzeltme aşaması dahil | EN: Each block is 8-23 random words from the sample texts, all three correction stages included | RU: Каждый блок — 8–23 случайных слова из примеров, включая три стадии коррекции
+RESULTS_SQL = """
+INSERT INTO public.result_blocks (created_by, file, ts, text_index, confidence, box, variants)
+SELECT u.ids[1 + g %% array_length(u.ids, 1)],
+       'image_' || (g / 12) || '.jpg',
+       1757612552 + g,
+       g %% 12,
+       random(),
+       '[[0, 0], [100, 0], [100, 40], [0, 40]]',
+       jsonb_build_object('raw', t.text, 'character_corrected', t.text, 'meaning_corrected', t.text)
+FROM generate_series(%(start)s, %(stop)s) g,
+     (SELECT array_agg(id ORDER BY username) AS ids FROM public.users) u,
+     (SELECT %(words)s::text[] AS words) w,
+     LATERAL (SELECT string_agg(w.words[1 + floor(random() * array_length(w.words, 1))::int], ' ') AS text
+              FROM generate_series(1, 8 + g %% 16) n WHERE n > 0 AND g > 0) t
+"""
+
+def sample_words() -> list:
+    with open(RESULTS_CSV, newline='', encoding='utf-8') as f:
+        text = ' '.join(row['text'] for row in csv.DictReader(f))
+    return sorted({word.lower() for word in re.findall(r'\w{3,}', text)})
+
+def typo(word: str) -> str:
+    """TR: Bulanık arama için tek harf değiştir | EN: Swap one letter for the fuzzy case | RU: Заменить одну букву для нечеткого поиска"""
+    i = len(word) // 2
+    return word[:i] + ('x' if word[i] != 'x' else 'y') + word[i + 1:]
+
+def prepare(admin_dsn: str, users: int, blocks: int) -> str:
+    admin = psycopg2.connect(admin_dsn)
+    admin.autocommit = True
+    with admin.cursor() as cur:
+        cur.execute(f"DROP DATABASE IF EXISTS {BENCH_DB}")
+        cur.execute(f"CREATE DATABASE {BENCH_DB}")
+        cur.execute(ROLES_SQL)
+    admin.close()
+
+    dsn = f"{admin_dsn} dbname={BENCH_DB}"
+    conn = psycopg2.connect(dsn)
+    conn.autocommit = True
+    words = sample_words()
+    with conn.cursor() as cur, open(SETUP_SQL, encoding='utf-8') as f:
+        cur.execute(f.read())
+        cur.execute(USERS_SQL, {'users': users})
+        started = time.monotonic()
+        for start in range(1, blocks + 1, INSERT_CHUNK):
+            stop = min(start + INSERT_CHUNK - 1, blocks)
+            cur.execute(RESULTS_SQL, {'start': start, 'stop': stop, 'words': words})
+            print(f"  loaded {stop} blocks ({stop / (time.monotonic() - started):.0f} blocks/s)")
+        cur.execute("VACUUM ANALYZE public.result_blocks")
+        cur.execute("SELECT pg_size_pretty(pg_relation_size('idx_result_blocks_user_text_search')), "
+                    "pg_size_pretty(pg_relation_size('idx_result_blocks_user_text_trgm'))")
+        print("  index sizes: tsvector %s, trigram %s" % cur.fetchone())
+    conn.close()
+    return dsn
+
+def measure(cur, user: str, query: str, rounds: int) -> list:
+    timings = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        cur.execute("SELECT * FROM search_results(%s, %s, 20)", (user, query))
+        cur.fetchall()
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+def main():
+    parser = argparse.ArgumentParser(description='OPTIX results search benchmark (local Postgres)')
+    parser.add_argument('--dsn', default='host=localhost user=postgres', help='libpq DSN without dbname')
+    parser.add_argument('--users', type=int, default=100)
+    parser.add_argument('--blocks', type=int, default=700000, help='Text blocks (x3 stage rows)')
+    parser.add_argument('--rounds', type=int, default=30)
+    parser.add_argument('--skip-load', action='store_true', help=f'Reuse the existing {BENCH_DB} database')
+    args = parser.parse_args()
+    if not HAS_PSYCOPG2:
+        raise SystemExit("psycopg2 is required (pip install psycopg2-binary)")
+
+    if args.skip_load:
+        dsn = f"{args.dsn} dbname={BENCH_DB}"
+    else:
+        print(f"Loading {args.blocks} blocks for {args.users} users into {BENCH_DB}...")
+        dsn = prepare(args.dsn, args.users, args.blocks)
+
+    words = sample_words()
+    random.seed(7)
+    conn = psycopg2.connect(dsn)
+    with conn.cursor() as cur:
+        cur.execute("SELECT id FROM public.users ORDER BY random() LIMIT 10")
+        users = [row[0] for row in cur.fetchall()]
+        long_words = [w for w in words if len(w) >= 6]
+        cases = [
+            ('term', random.choice(words)),
+            ('two terms', ' '.join(random.sample(words, 2))),
+            ('phrase', '"' + ' '.join(random.sample(words, 2)) + '"'),
+            ('fuzzy', typo(random.choice(long_words))),
+        ]
+        print(f"{'case':<11}{'query':<28}{'p50 ms':>8}{'p95 ms':>8}{'max ms':>8}")
+        for name, query in cases:
+            timings = []
+            for user in users:
+                timings += measure(cur, user, query, max(1, args.rounds // len(users)) + 1)
+            timings.sort()
+            p95 = timings[int(len(timings) * 0.95) - 1]
+            flag = '' if p95 <= TARGET_MS else f'  > {TARGET_MS:.0f} ms'
+            print(f"{name:<11}{query[:27]:<28}{statistics.median(timings):>8.1f}{p95:>8.1f}{timings[-1]:>8.1f}{flag}")
+    conn.close()
+
+if __name__ == "__main__":
+    main()
@@ -48,6 +48,7 @@ COMMAND_CHAR_UUID = "66666666-7777-8888-9999-aaaaaaaaaaaa"
 # TR: D-Bus sabitleri | EN: D-Bus constants | RU: Константы D-Bus
 BLUEZ_SERVICE_NAME = 'org.bluez'
 GATT_MANAGER_IFACE = 'org.bluez.GattManager1'
+ADAPTER_IFACE = 'org.bluez.Adapter1'
 DBUS_OM_IFACE = 'org.freedesktop.DBus.ObjectManager'
 DBUS_PROP_IFACE = 'org.freedesktop.DBus.Properties'
 GATT_SERVICE_IFACE = 'org.bluez.GattService1'
@@ -312,6 +313,31 @@ def find_adapter(bus):
         logger.error(f"❌ Error finding adapter: {e}")
         return None
 
+def keep_discoverable(bus, adapter):
+    """TR: Adaptörü D-Bus üzerinden keşfedilebilir tut | EN: Keep the adapter discoverable over D-Bus | RU: Держать адаптер обнаруживаемым через D-Bus"""
+    props = dbus.Interface(bus.get_object(BLUEZ_SERVICE_NAME, adapter), DBUS_PROP_IFACE)
+
+    def set_property(name, value):
+        # TR: Asenkron çağrı: ana döngü bloklanmaz | EN: Async call: the main loop never blocks | RU: Асинхронный вызов: главный цикл не блокируется
+        props.Set(ADAPTER_IFACE, name, value,
+                  reply_handler=lambda: None,
+                  error_handler=lambda e: logger.warning(f"⚠️ Adapter {name} set failed: {e}"))
+
+    def on_properties_changed(interface, changed, invalidated):
+        if interface == ADAPTER_IFACE and 'Discoverable' in changed and not changed['Discoverable']:
+            logger.info("🔄 Adapter no longer discoverable - re-enabling advertising")
+            set_property('Discoverable', dbus.Boolean(True))
+
+    bus.add_signal_receiver(on_properties_changed,
+                            signal_name='PropertiesChanged',
+                            dbus_interface=DBUS_PROP_IFACE,
+                            path=adapter)
+    # TR: DiscoverableTimeout=0: 180 s sonra kapanmasın | EN: DiscoverableTimeout=0: don't switch off after 180 s | RU: DiscoverableTimeout=0: не выключаться через 180 с
+    set_property('Alias', dbus.String('OPTIX'))
+    set_property('DiscoverableTimeout', dbus.UInt32(0))
+    set_property('Discoverable', dbus.Boolean(True))
+    set_property('Pairable', dbus.Boolean(True))
+
 def register_app_cb():
     logger.info('✅ GATT application registered!')
     logger.info('🎯 Ready for connections!')
@@ -364,23 +390,8 @@ def main():
         logger.info(f"⚡ Command: {COMMAND_CHAR_UUID}")
         logger.info("🎯 Device: OPTIX")
         
-        # TR: Periyodik reklam yenilemeyi ayarla | EN: Set up periodic advertising renewal | RU: Настрой периодическое обновление рекламы
-        def renew_advertising():
-            try:
-                logger.info("🔄 Renewing BLE advertising...")
-                subprocess.run(['sudo', 'hciconfig', 'hci0', 'leadv', '0'], capture_output=True)
-                time.sleep(0.5)
-                subprocess.run(['sudo', 'hciconfig', 'hci0', 'name', 'OPTIX'], capture_output=True)
-                subprocess.run(['sudo', 'hciconfig', 'hci0', 'piscan'], capture_output=True)
-                subprocess.run(['sudo', 'hciconfig', 'hci0', 'leadv', '3'], capture_output=True)
-                return True  # TR: Periyodik çağrılara devam et | EN: Continue periodic calls | RU: Продолжать периодические вызовы
-            except Exception as e:
-                logger.error(f"❌ Advertising renewal failed: {e}")
-                return True
-        
-        # TR: Reklam yenileme zamanlayıcısını başlat (30 saniyede bir) | EN: Start advertising renewal timer (every 30 seconds) | RU: Запусти таймер обновления рекламы (каждые 30 секунд)
-        if HAS_GLIB:
-            GLib.timeout_add_seconds(30, renew_advertising)
+        # TR: Periyodik yenileme yerine Adapter1 özellik değişikliklerine tepki ver | EN: React to Adapter1 property changes instead of periodic renewal | RU: Реагировать на изменения свойств Adapter1 вместо периодического обновления
+        keep_discoverable(bus, adapter)
         
         # TR: Ana döngüyü başlat | EN: Start main loop | RU: Запусти главный цикл
         mainloop = GLib.MainLoop()
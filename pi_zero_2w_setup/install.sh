@@ -14,7 +14,7 @@ VENV_DIR="$BASE_DIR/.venv"
 SERVICE_DST="/etc/systemd/system/smart-glasses.service"
 WIFI_WATCHER_SERVICE_DST="/etc/systemd/system/wifi-watcher.service"
 ENTRYPOINT="$BASE_DIR/optix_smart_glasses.py"
-WIFI_WATCHER="$BASE_DIR/wifi_file_watcher.py"
+WIFI_CREDENTIALS_FILE="/tmp/wifi_credentials.json"
 
 echo "[1/6] Updating package lists..."
 sudo apt-get update -y
@@ -35,7 +35,8 @@ python3 -m venv --system-site-packages "$VENV_DIR"
 "$VENV_DIR/bin/pip" install \
   requests \
   dbus-python \
-  watchdog
+  'watchdog>=2.1' \
+  cryptography
 # Note: pygobject (gi.repository) is provided by system package python3-gi
 # Using --system-site-packages allows venv to access system packages
 
@@ -53,6 +54,7 @@ Group=root
 WorkingDirectory=$BASE_DIR
 Environment="PYTHONPATH=$BASE_DIR"
 Environment="BLUETOOTH_DEVICE_NAME=OPTIX"
+Environment="OPTIX_LOG_LEVEL=INFO"
 ExecStart=$VENV_DIR/bin/python $ENTRYPOINT
 Restart=always
 RestartSec=3
@@ -64,42 +66,19 @@ ReadWritePaths=$BASE_DIR
 WantedBy=multi-user.target
 EOF
 
-echo "[5/7] Writing WiFi watcher service to $WIFI_WATCHER_SERVICE_DST ..."
-sudo tee "$WIFI_WATCHER_SERVICE_DST" >/dev/null <<EOF
-[Unit]
-Description=OPTIX WiFi Credentials File Watcher
-After=network.target
-
-[Service]
-Type=simple
-User=root
-Group=root
-WorkingDirectory=$BASE_DIR
-Environment="PYTHONPATH=$BASE_DIR"
-ExecStart=$VENV_DIR/bin/python $WIFI_WATCHER
-Restart=always
-RestartSec=3
-StandardOutput=journal
-StandardError=journal
-ReadWritePaths=/tmp /etc/wpa_supplicant
-
-[Install]
-WantedBy=multi-user.target
-EOF
+echo "[5/7] Disabling the standalone WiFi watcher (the daemon handles $WIFI_CREDENTIALS_FILE)..."
+# The daemon and wifi_file_watcher.py take the same lock; only one of them applies the credentials file
+sudo systemctl disable --now wifi-watcher.service 2>/dev/null || true
+sudo rm -f "$WIFI_WATCHER_SERVICE_DST"
 
 echo "[6/7] Enabling and starting services..."
 sudo systemctl daemon-reload
 sudo systemctl enable smart-glasses.service
-sudo systemctl enable wifi-watcher.service
 sudo systemctl restart smart-glasses.service
-sudo systemctl restart wifi-watcher.service
 
 echo "[7/7] Status:"
 sudo systemctl status smart-glasses.service --no-pager || true
-echo ""
-sudo systemctl status wifi-watcher.service --no-pager || true
 
 echo ""
 echo "Done. Logs:"
-echo "  Smart Glasses: journalctl -u smart-glasses.service -f"
-echo "  WiFi Watcher: journalctl -u wifi-watcher.service -f"
\ No newline at end of file
+echo "  Smart Glasses: journalctl -u smart-glasses.service -f"
\ No newline at end of file
@@ -63,7 +63,9 @@ log_info "Installing Python packages..."
 pip3 install --user \
     requests \
     PyGObject \
-    dbus-python
+    dbus-python \
+    'watchdog>=2.1' \
+    cryptography
 
 # Check if camera is enabled
 log_info "Checking camera configuration..."
@@ -94,6 +96,23 @@ else
     exit 1
 fi
 
+# Copy shared modules
+if [ -f "supabase_client.py" ]; then
+    cp supabase_client.py "$OPTIX_DIR/"
+    log_success "Supabase client installed"
+else
+    log_error "supabase_client.py not found in current directory"
+    exit 1
+fi
+
+if [ -f "wifi_provisioning.py" ]; then
+    cp wifi_provisioning.py "$OPTIX_DIR/"
+    log_success "WiFi provisioning helpers installed"
+else
+    log_error "wifi_provisioning.py not found in current directory"
+    exit 1
+fi
+
 # Create configuration file
 log_info "Creating configuration file..."
 cat > "$OPTIX_DIR/config.json" << EOF
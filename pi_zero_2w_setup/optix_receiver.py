@@ -0,0 +1,423 @@
+#!/usr/bin/env python3
+"""
+TR: OPTIX referans alıcı - gözlüklerden gelen kareleri (TCP 5000) çok süreçli, aşamalı OCR hattında işler | EN: OPTIX reference receiver - runs frames from the glasses (TCP 5000) through a multi-process, staged OCR pipeline | RU: Эталонный приемник OPTIX — обрабатывает кадры с очков (TCP 5000) в многопроцессном поэтапном OCR-конвейере
+TR: raw -> character_corrected -> meaning_corrected; aşamalar arasında sınırlı kuyruklar, aşama başına yığınlama ve eşzamanlılık | EN: raw -> character_corrected -> meaning_corrected; bounded queues between stages, per-stage batching and concurrency | RU: raw -> character_corrected -> meaning_corrected; ограниченные очереди между стадиями, пакетирование и параллелизм на стадию
+"""
+
+import argparse
+import hashlib
+import importlib
+import json
+import logging
+import multiprocessing
+import os
+import queue
+import signal
+import socketserver
+import threading
+import time
+from typing import Optional
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - [OPTIX] - %(message)s')
+logger = logging.getLogger('OPTIX')
+
+# =======================
+#  CONFIG
+# =======================
+
+RECEIVER_HOST = '0.0.0.0'
+RECEIVER_PORT = 5000
+MAX_FRAME_BYTES = 16 * 1024 * 1024
+STAGE_ORDER = ('raw', 'character_corrected', 'meaning_corrected')
+QUEUE_SIZE = 64
+BATCH_SIZE = 4
+BATCH_WAIT_SEC = 0.02
+ENQUEUE_TIMEOUT_SEC = 1.0
+STATS_INTERVAL_SEC = 10.0
+STANDIN_ROUNDS = 20000
+
+# =======================
+#  STAGES
+# =======================
+
+class Stage:
+    """TR: Aşama arayüzü: setup() işçi sürecinde bir kez, process() her yığın için | EN: Stage interface: setup() once in the worker process, process() per batch | RU: Интерфейс стадии: setup() один раз в рабочем процессе, process() на каждый пакет"""
+    name = None
+
+    def __init__(self, **options):
+        self.options = options
+
+    def setup(self):
+        """TR: Modelleri burada yükle (ana süreçte değil) | EN: Load models here (not in the parent process) | RU: Загружать модели здесь (не в родительском процессе)"""
+
+    def process(self, items: list) -> list:
+        """TR: Her öğenin 'blocks' listesindeki text alanlarını güncelle ve öğeleri döndür | EN: Update the text of every item's 'blocks' and return the items | RU: Обновить text в 'blocks' каждого элемента и вернуть элементы"""
+        raise NotImplementedError
+
+def burn(data: bytes, rounds: int) -> bytes:
+    """TR: Gerçek modelin CPU maliyetini taklit et | EN: Stand in for a real model's CPU cost | RU: Имитировать затраты CPU настоящей модели"""
+    digest = hashlib.sha256(data).digest()
+    for _ in range(rounds):
+        digest = hashlib.sha256(digest).digest()
+    return digest
+
+STANDIN_WORDS = ('bir', 'zamanlar', 'orman', 'fidan', 'güneş', 'ağaç', 'rüzgâr', 'dal', 'kök', 'yaprak',
+                 'turtle', 'river', 'light', 'stone', 'book', 'page')
+STANDIN_CONFUSABLES = str.maketrans({'0': 'o', '1': 'l', '5': 's', '|': 'l', '8': 'B'})
+
+class StandInOcr(Stage):
+    """TR: Görüntü baytlarından belirlenimci sahte metin blokları üretir | EN: Produces deterministic fake text blocks from the image bytes | RU: Порождает детерминированные фиктивные текстовые блоки из байтов изображения"""
+    name = 'raw'
+
+    def process(self, items: list) -> list:
+        rounds = self.options.get('rounds', STANDIN_ROUNDS)
+        for item in items:
+            digest = burn(item['image'], rounds)
+            blocks = []
+            for index in range(1 + digest[0] % 4):
+                words = [STANDIN_WORDS[b % len(STANDIN_WORDS)] for b in digest[index * 6:index * 6 + 6]]
+                # TR: OCR'a benzer karakter hataları | EN: OCR-like character errors | RU: Ошибки символов, как у OCR
+                text = ' '.join(words).replace('o', '0', 1).replace('l', '1', 1)
+                x, y = 100 + digest[index] * 10, 100 + index * 80
+                blocks.append({'text_index': index, 'text': text, 'confidence': digest[index + 8] / 255,
+                               'box': [[x, y], [x + 600, y], [x + 600, y + 60], [x, y + 60]]})
+            item['blocks'] = blocks
+        return items
+
+class StandInCharacterCorrector(Stage):
+    """TR: Karıştırılan karakterleri düzeltir (0->o, 1->l, ...) | EN: Fixes confusable characters (0->o, 1->l, ...) | RU: Исправляет путаемые символы (0->o, 1->l, ...)"""
+    name = 'character_corrected'
+
+    def process(self, items: list) -> list:
+        rounds = self.options.get('rounds', STANDIN_ROUNDS)
+        for item in items:
+            for block in item['blocks']:
+                burn(block['text'].encode('utf-8'), rounds)
+                block['text'] = block['text'].translate(STANDIN_CONFUSABLES)
+        return items
+
+class StandInMeaningCorrector(Stage):
+    """TR: Boşlukları toparlar, cümleyi büyük harfle başlatır ve noktalar | EN: Normalises spacing, capitalises and terminates the sentence | RU: Нормализует пробелы, начинает предложение с заглавной и ставит точку"""
+    name = 'meaning_corrected'
+
+    def process(self, items: list) -> list:
+        rounds = self.options.get('rounds', STANDIN_ROUNDS)
+        for item in items:
+            for block in item['blocks']:
+                burn(block['text'].encode('utf-8'), rounds)
+                text = ' '.join(block['text'].split())
+                block['text'] = text[:1].upper() + text[1:] + ('' if text.endswith('.') else '.')
+        return items
+
+DEFAULT_STAGES = {
+    'raw': 'optix_receiver:StandInOcr',
+    'character_corrected': 'optix_receiver:StandInCharacterCorrector',
+    'meaning_corrected': 'optix_receiver:StandInMeaningCorrector',
+}
+
+def load_stage(spec: str, options: dict) -> Stage:
+    """TR: 'modül:Sınıf' biçimindeki aşamayı yükle | EN: Load a stage given as 'module:Class' | RU: Загрузить стадию, заданную как 'module:Class'"""
+    module_name, _, class_name = spec.partition(':')
+    if not class_name:
+        raise ValueError(f"Stage must be module:Class, got {spec!r}")
+    return getattr(importlib.import_module(module_name), class_name)(**options)
+
+# =======================
+#  PIPELINE
+# =======================
+
+def result_rows(item: dict, stage: str) -> list:
+    """TR: Bir aşamanın çıktısını results satırlarına çevir | EN: Turn one stage's output into results rows | RU: Преобразовать вывод стадии в строки results"""
+    return [{'created_by': item['created_by'], 'file': item['file'], 'ts': item['ts'],
+             'text_index': block['text_index'], 'text_type': stage, 'text': block['text'],
+             'confidence': block.get('confidence'), 'box': block.get('box')}
+            for block in item.get('blocks', ())]
+
+def next_batch(inbox, size: int, wait: float) -> tuple:
+    """TR: İlk öğeyi bekle, sonra yığın dolana ya da süre bitene kadar topla; (öğeler, kapanış) | EN: Block for the first item, then gather until the batch is full or the wait runs out; (items, closing) | RU: Ждать первый элемент, затем собирать до заполнения пакета или истечения ожидания; (элементы, закрытие)"""
+    first = inbox.get()
+    if first is None:
+        return [], True
+    items = [first]
+    deadline = time.monotonic() + wait
+    while len(items) < size:
+        remaining = deadline - time.monotonic()
+        try:
+            item = inbox.get(timeout=remaining) if remaining > 0 else inbox.get_nowait()
+        except queue.Empty:
+            break
+        if item is None:
+            return items, True
+        items.append(item)
+    return items, False
+
+def process_batch(stage: Stage, stage_name: str, items: list, failed) -> list:
+    """TR: Yığını işle; hata olursa öğe öğe yeniden dene, yalnızca bozuk öğeler düşer | EN: Process a batch; on failure retry item by item so only the bad items are lost | RU: Обработать пакет; при ошибке повторить поэлементно, теряются только плохие элементы"""
+    try:
+        return stage.process(items)
+    except Exception as e:
+        if len(items) == 1:
+            logger.error(f"Stage {stage_name} failed on {items[0].get('file')}: {e}")
+            with failed.get_lock():
+                failed.value += 1
+            return []
+        logger.warning(f"Stage {stage_name} failed on a batch of {len(items)}, retrying one by one: {e}")
+    survivors = []
+    for item in items:
+        try:
+            survivors.extend(stage.process([item]))
+        except Exception as e:
+            logger.error(f"Stage {stage_name} failed on {item.get('file')}: {e}")
+            with failed.get_lock():
+                failed.value += 1
+    return survivors
+
+def stage_worker(stage_name: str, spec: str, options: dict, inbox, outbox, results,
+                 batch_size: int, batch_wait: float, processed, busy_ns, failed):
+    """TR: İşçi süreci: yığın al, işle, satırları gönder, sonraki aşamaya aktar | EN: Worker process: take a batch, process it, emit rows, pass it downstream | RU: Рабочий процесс: взять пакет, обработать, выдать строки, передать дальше"""
+    # TR: Ctrl-C yalnızca ana süreçte; işçiler close() ile boşaltılarak durur | EN: Ctrl-C is for the parent only; workers stop by being drained through close() | RU: Ctrl-C только для родителя; рабочие останавливаются через close() после опустошения
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    stage = load_stage(spec, options)
+    stage.setup()
+    closing = False
+    while not closing:
+        items, closing = next_batch(inbox, batch_size, batch_wait)
+        if not items:
+            continue
+        started = time.perf_counter_ns()
+        items = process_batch(stage, stage_name, items, failed)
+        rows = []
+        for item in items:
+            # TR: Görüntü yalnızca ilk aşamada gerekir; kuyruklar arasında taşınmaz | EN: The image is only needed by the first stage; it is not carried across queues | RU: Изображение нужно только первой стадии; между очередями не передается
+            item.pop('image', None)
+            rows.extend(result_rows(item, stage_name))
+        with busy_ns.get_lock():
+            busy_ns.value += time.perf_counter_ns() - started
+        with processed.get_lock():
+            processed.value += len(items)
+        if rows:
+            results.put(rows)
+        if outbox is not None:
+            for item in items:
+                outbox.put(item)
+
+class StagedPipeline:
+    """TR: Aşama başına süreç havuzu; aşamalar sınırlı kuyruklarla bağlı | EN: One process pool per stage, stages linked by bounded queues | RU: Пул процессов на стадию, стадии связаны ограниченными очередями"""
+
+    def __init__(self, on_rows, stages: Optional[dict] = None, workers: Optional[dict] = None,
+                 batch: Optional[dict] = None, queue_size: int = QUEUE_SIZE,
+                 batch_wait: float = BATCH_WAIT_SEC, options: Optional[dict] = None):
+        self.on_rows = on_rows  # on_rows(rows) in the parent process
+        self.stages = {**DEFAULT_STAGES, **(stages or {})}
+        self.workers = {name: max(1, (workers or {}).get(name, 1)) for name in STAGE_ORDER}
+        self.batch = {name: max(1, (batch or {}).get(name, BATCH_SIZE)) for name in STAGE_ORDER}
+        self.batch_wait = batch_wait
+        self.options = options or {}
+        # TR: spawn: ana süreçteki iş parçacıkları ve soketler işçilere kopyalanmaz | EN: spawn: the parent's threads and sockets are not copied into the workers | RU: spawn: потоки и сокеты родителя не копируются в рабочие процессы
+        self.ctx = multiprocessing.get_context('spawn')
+        self.inboxes = [self.ctx.Queue(maxsize=queue_size) for _ in STAGE_ORDER]
+        self.results = self.ctx.Queue(maxsize=queue_size)
+        self.processed = {name: self.ctx.Value('q', 0) for name in STAGE_ORDER}
+        self.busy_ns = {name: self.ctx.Value('q', 0) for name in STAGE_ORDER}
+        self.failed = {name: self.ctx.Value('q', 0) for name in STAGE_ORDER}  # Items lost to stage errors
+        self.pools = {}
+        self.collector = None
+        self.dropped = 0
+        self.submitted = 0
+
+    def start(self):
+        for index, name in enumerate(STAGE_ORDER):
+            outbox = self.inboxes[index + 1] if index + 1 < len(STAGE_ORDER) else None
+            self.pools[name] = [
+                self.ctx.Process(target=stage_worker, name=f'optix-{name}-{n}', daemon=True,
+                                 args=(name, self.stages[name], self.options, self.inboxes[index], outbox,
+                                       self.results, self.batch[name], self.batch_wait,
+                                       self.processed[name], self.busy_ns[name], self.failed[name]))
+                for n in range(self.workers[name])]
+            for process in self.pools[name]:
+                process.start()
+        self.collector = threading.Thread(target=self._collect, name='optix-results', daemon=True)
+        self.collector.start()
+        logger.info("Pipeline started: " + ', '.join(
+            f"{name} x{self.workers[name]} (batch {self.batch[name]})" for name in STAGE_ORDER))
+
+    def submit(self, item: dict, timeout: float = ENQUEUE_TIMEOUT_SEC) -> bool:
+        """TR: Kareyi ilk aşamaya ver; kuyruk dolu kalırsa kareyi düşür | EN: Hand a frame to the first stage; drop it if the queue stays full | RU: Передать кадр первой стадии; отбросить, если очередь остается заполненной"""
+        try:
+            self.inboxes[0].put(item, timeout=timeout)
+        except queue.Full:
+            self.dropped += 1
+            return False
+        self.submitted += 1
+        return True
+
+    def close(self):
+        """TR: Aşamaları sırayla boşalt: her havuz bitince sonrakine kapanış işareti gönderilir | EN: Drain stage by stage: each pool is told to stop once the previous one has finished | RU: Опустошать по стадиям: каждому пулу сигнал остановки после завершения предыдущего"""
+        for index, name in enumerate(STAGE_ORDER):
+            for _ in self.pools.get(name, ()):
+                self.inboxes[index].put(None)
+            for process in self.pools.get(name, ()):
+                process.join()
+        self.results.put(None)
+        if self.collector:
+            self.collector.join()
+
+    def _collect(self):
+        while True:
+            rows = self.results.get()
+            if rows is None:
+                return
+            try:
+                self.on_rows(rows)
+            except Exception as e:
+                logger.error(f"Result sink error: {e}")
+
+    def stats(self) -> dict:
+        out = {'submitted': self.submitted, 'dropped': self.dropped}
+        for index, name in enumerate(STAGE_ORDER):
+            out[name] = {'processed': self.processed[name].value,
+                         'failed': self.failed[name].value,
+                         'busy_sec': self.busy_ns[name].value / 1e9,
+                         'queued': self.inboxes[index].qsize()}
+        return out
+
+# =======================
+#  RECEIVER
+# =======================
+
+def read_exact(stream, size: int) -> Optional[bytes]:
+    data = stream.read(size)
+    return data if data is not None and len(data) == size else None
+
+def frame_file_name(ts: float, address: tuple, seq: int) -> str:
+    """TR: Blok anahtarındaki (created_by, file, text_index) dosya adı; aynı milisaniyedeki iki eş birleşmesin diye eş adresi ve sıra numarası eklenir | EN: File name in the block key (created_by, file, text_index); the peer address and a sequence number keep two peers in the same millisecond apart | RU: Имя файла в ключе блока (created_by, file, text_index); адрес пира и порядковый номер разделяют два пира в одну миллисекунду"""
+    host, port = address[:2]
+    return f"image_{int(ts * 1000)}_{host.replace(':', '-')}_{port}_{seq}.jpg"
+
+class FrameHandler(socketserver.StreamRequestHandler):
+    """TR: Çerçeve: 4 bayt büyük-endian uzunluk + JPEG (optix_smart_glasses.camera_stream_loop) | EN: Framing: 4-byte big-endian length + JPEG (optix_smart_glasses.camera_stream_loop) | RU: Кадрирование: 4 байта длины (big-endian) + JPEG (optix_smart_glasses.camera_stream_loop)"""
+
+    def handle(self):
+        peer = self.client_address[0]
+        owner = self.server.owners.get(peer, self.server.default_owner)
+        if not owner:
+            logger.warning(f"No created_by for {peer}; closing (use --created-by or --owner)")
+            return
+        logger.info(f"Glasses connected: {peer}")
+        frames = 0
+        while True:
+            header = read_exact(self.rfile, 4)
+            if header is None:
+                break
+            size = int.from_bytes(header, 'big')
+            if not 0 < size <= MAX_FRAME_BYTES:
+                logger.warning(f"Bad frame size {size} from {peer}; closing")
+                break
+            image = read_exact(self.rfile, size)
+            if image is None:
+                break
+            ts = time.time()
+            frames += 1
+            self.server.pipeline.submit({'created_by': owner, 'file': frame_file_name(ts, self.client_address, frames),
+                                         'ts': ts, 'image': image})
+        logger.info(f"Glasses disconnected: {peer} ({frames} frames)")
+
+class FrameServer(socketserver.ThreadingTCPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+
+    def __init__(self, address, pipeline: StagedPipeline, owners: dict, default_owner: Optional[str]):
+        super().__init__(address, FrameHandler)
+        self.pipeline = pipeline
+        self.owners = owners
+        self.default_owner = default_owner
+
+class JsonlSink:
+    """TR: Supabase yoksa satırları JSON Lines olarak yaz | EN: Write rows as JSON Lines when there is no Supabase | RU: Записывать строки в формате JSON Lines, если Supabase нет"""
+
+    def __init__(self, path: str):
+        self.file = open(path, 'a', encoding='utf-8')
+
+    def add_many(self, rows: list):
+        for row in rows:
+            self.file.write(json.dumps(row, ensure_ascii=False) + '\n')
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+# =======================
+#  MAIN
+# =======================
+
+def parse_pairs(values: list, kind=str) -> dict:
+    """TR: ['ad=değer', ...] -> {ad: değer} | EN: ['name=value', ...] -> {name: value} | RU: ['имя=значение', ...] -> {имя: значение}"""
+    out = {}
+    for value in values or ():
+        name, sep, raw = value.partition('=')
+        if not sep:
+            raise SystemExit(f"Expected name=value, got {value!r}")
+        out[name] = kind(raw)
+    return out
+
+def main():
+    cores = os.cpu_count() or 1
+    parser = argparse.ArgumentParser(description='OPTIX reference receiver with a staged OCR worker pool')
+    parser.add_argument('--host', default=RECEIVER_HOST)
+    parser.add_argument('--port', type=int, default=RECEIVER_PORT)
+    parser.add_argument('--created-by', help='Owner UUID for frames from unknown peers')
+    parser.add_argument('--owner', action='append', help='PEER_IP=UUID (repeatable)')
+    parser.add_argument('--stage', action='append', help='STAGE=module:Class to replace a stand-in (repeatable)')
+    parser.add_argument('--workers', action='append',
+                        help=f'STAGE=N processes (repeatable; default raw={max(1, cores // 2)}, others 1)')
+    parser.add_argument('--batch', action='append', help=f'STAGE=N items per batch (default {BATCH_SIZE})')
+    parser.add_argument('--queue', type=int, default=QUEUE_SIZE, help='Bound of every inter-stage queue')
+    parser.add_argument('--work-rounds', type=int, default=STANDIN_ROUNDS, help='CPU cost of the stand-in stages')
+    parser.add_argument('--url', default=os.environ.get('SUPABASE_URL'), help='Supabase URL (env SUPABASE_URL)')
+    parser.add_argument('--key', default=os.environ.get('SUPABASE_KEY'), help='Service key (env SUPABASE_KEY)')
+    parser.add_argument('--output', default='optix_results.jsonl', help='JSON Lines file used without --url/--key')
+    args = parser.parse_args()
+
+    stages = parse_pairs(args.stage)
+    unknown = set(stages) - set(STAGE_ORDER)
+    if unknown:
+        raise SystemExit(f"Unknown stage(s): {', '.join(sorted(unknown))}; stages are {', '.join(STAGE_ORDER)}")
+    workers = {'raw': max(1, cores // 2), **parse_pairs(args.workers, int)}
+
+    client = None
+    if args.url and args.key:
+        from results_uploader import ResultsUploader
+        from supabase_client import SupabaseClient
+        client = SupabaseClient(args.url, args.key)
+        sink = ResultsUploader(client)
+        sink.start()
+    else:
+        logger.info(f"No Supabase credentials; writing rows to {args.output}")
+        sink = JsonlSink(args.output)
+
+    pipeline = StagedPipeline(sink.add_many, stages, workers, parse_pairs(args.batch, int), args.queue,
+                              options={'rounds': args.work_rounds})
+    pipeline.start()
+    server = FrameServer((args.host, args.port), pipeline, parse_pairs(args.owner), args.created_by)
+    threading.Thread(target=server.serve_forever, name='optix-receiver', daemon=True).start()
+    logger.info(f"Receiver listening on {args.host}:{args.port}")
+    stop = threading.Event()
+    signal.signal(signal.SIGTERM, lambda signum, frame: stop.set())
+    try:
+        while not stop.wait(STATS_INTERVAL_SEC):
+            stats = pipeline.stats()
+            logger.info(f"frames {stats['submitted']} (dropped {stats['dropped']}); " + ', '.join(
+                f"{name} {stats[name]['processed']} done, {stats[name]['failed']} failed, "
+                f"{stats[name]['queued']} queued" for name in STAGE_ORDER))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        logger.info("Shutting down receiver")
+        server.shutdown()
+        pipeline.close()
+        sink.close()
+        if client:
+            client.close()
+
+if __name__ == "__main__":
+    main()
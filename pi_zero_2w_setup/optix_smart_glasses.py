@@ -16,16 +16,35 @@ import shutil
 import hashlib
 import uuid
 import threading
-import requests
-from dataclasses import dataclass
+import signal
+import collections
+import contextlib
+import functools
+import bisect
+import queue
+import atexit
+import logging.handlers
+import resource
+import itertools
+import concurrent.futures
+import struct
+import codecs
+import base64
+import hmac
+from dataclasses import dataclass, field
 from typing import Optional, Tuple
 from pathlib import Path
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 
 import dbus
 import dbus.exceptions
 import dbus.mainloop.glib
 import dbus.service
-import requests
+
+from supabase_client import SupabaseClient
+from wifi_provisioning import (CREDENTIALS_OWNER_LOCK, STATE_DIR, WIFI_CONNECT_TIMEOUT_SEC, WIFI_CREDENTIALS_DIGEST,
+                               WIFI_CREDENTIALS_FILE, WIFI_INTERFACE, CredentialsDigest, WpaCtrl, WpaProvisioner,
+                               claim_credentials_file, read_credentials_file, wait_for_address, wpa_psk)
 
 try:
     from gi.repository import GLib
@@ -63,10 +82,103 @@ except ImportError:
     class FileSystemEventHandler:
         pass
 
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - [%(name)s] - %(message)s'
-)
+try:
+    from cryptography.fernet import Fernet, InvalidToken
+    HAS_CRYPTOGRAPHY = True
+except ImportError:
+    HAS_CRYPTOGRAPHY = False
+
+# =======================
+#  LOGGING
+# =======================
+
+LOG_FORMAT = '%(asctime)s - %(levelname)s - [%(name)s] - %(message)s'
+LOG_LEVEL_ENV = 'OPTIX_LOG_LEVEL'
+LOG_DEFAULT_LEVEL = 'INFO'
+LOG_CONSOLE_LEVEL = logging.INFO
+LOG_RING_SIZE = 500
+LOG_RATE_LIMIT_SEC = 30.0
+
+def rate_limited(key: str, interval: float = LOG_RATE_LIMIT_SEC) -> dict:
+    """TR: Log çağrısı için hız sınırı anahtarı (extra=) | EN: Rate-limit key for a log call (extra=) | RU: Ключ ограничения частоты для вызова лога (extra=)"""
+    return {'rate_key': key, 'rate_interval': interval}
+
+class RateLimitFilter(logging.Filter):
+    """TR: Aynı anahtarlı kayıtları aralık başına bire indir | EN: Let one record per key through per interval | RU: Пропускать одну запись на ключ за интервал"""
+
+    def __init__(self):
+        super().__init__()
+        self.state = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        key = getattr(record, 'rate_key', None)
+        if key is None:
+            return True
+        now = record.created
+        last, suppressed = self.state.get(key, (0.0, 0))
+        if now - last < record.rate_interval:
+            self.state[key] = (last, suppressed + 1)
+            return False
+        self.state[key] = (now, 0)
+        record.suppressed = suppressed
+        return True
+
+class LazyQueueHandler(logging.handlers.QueueHandler):
+    """TR: Kaydı biçimlendirmeden kuyruğa koy | EN: Enqueue the record without formatting it | RU: Ставить запись в очередь без форматирования"""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # TR: Biçimlendirme dinleyici thread'inde yapılır | EN: Formatting happens on the listener thread | RU: Форматирование выполняется в потоке слушателя
+        return record
+
+class ErrorFlushRingHandler(logging.Handler):
+    """TR: Ayrıntılı kayıtları RAM'de tut, sadece hata olunca yaz | EN: Keep verbose records in RAM, write them out only on error | RU: Хранить подробные записи в RAM и выводить их только при ошибке"""
+
+    def __init__(self, target: logging.Handler, console_level: int = LOG_CONSOLE_LEVEL,
+                 size: int = LOG_RING_SIZE):
+        super().__init__(logging.DEBUG)
+        self.target = target
+        self.console_level = console_level
+        self.ring = collections.deque(maxlen=size)
+
+    def emit(self, record: logging.LogRecord):
+        if getattr(record, 'suppressed', 0):
+            # TR: Kaydın kopyasına ekle; aynı kayıt başka işleyicilere de gider | EN: Annotate a copy; the same record also reaches other handlers | RU: Дополнять копию; та же запись попадает и в другие обработчики
+            record = logging.makeLogRecord(record.__dict__)
+            record.msg = f"{record.msg} (+{record.suppressed} suppressed)"
+        if record.levelno < self.console_level:
+            self.ring.append(record)
+            return
+        if record.levelno >= logging.ERROR and self.ring:
+            self.target.handle(logging.makeLogRecord({
+                'name': record.name, 'levelno': logging.INFO, 'levelname': 'INFO',
+                'msg': f"--- {len(self.ring)} recent verbose log lines ---"}))
+            while self.ring:
+                self.target.handle(self.ring.popleft())
+        self.target.handle(record)
+
+def log_level_from_env() -> int:
+    """TR: Kök log seviyesini OPTIX_LOG_LEVEL'dan oku (DEBUG hata halkasını doldurur) | EN: Read the root log level from OPTIX_LOG_LEVEL (DEBUG fills the error-flush ring) | RU: Прочитать корневой уровень лога из OPTIX_LOG_LEVEL (DEBUG заполняет кольцо ошибок)"""
+    name = os.environ.get(LOG_LEVEL_ENV, LOG_DEFAULT_LEVEL).strip().upper()
+    level = logging.getLevelName(name)
+    return level if isinstance(level, int) else logging.getLevelName(LOG_DEFAULT_LEVEL)
+
+def setup_logging(level: Optional[int] = None) -> logging.handlers.QueueListener:
+    """TR: Kuyruk tabanlı, bloklamayan loglamayı kur | EN: Set up queue-based, non-blocking logging | RU: Настроить неблокирующее логирование через очередь"""
+    console = logging.StreamHandler()
+    console.setFormatter(logging.Formatter(LOG_FORMAT))
+    log_queue = queue.SimpleQueue()
+    queue_handler = LazyQueueHandler(log_queue)
+    queue_handler.addFilter(RateLimitFilter())
+
+    root = logging.getLogger()
+    root.handlers[:] = [queue_handler]
+    root.setLevel(log_level_from_env() if level is None else level)
+
+    listener = logging.handlers.QueueListener(log_queue, ErrorFlushRingHandler(console))
+    listener.start()
+    atexit.register(listener.stop)
+    return listener
+
 logger = logging.getLogger('OPTIX')
 
 WIFI_SERVICE_UUID = "12345678-1234-5678-9abc-123456789abc"
@@ -76,16 +188,27 @@ COMMAND_CHAR_UUID = "66666666-7777-8888-9999-aaaaaaaaaaaa"
 
 SUPABASE_URL = "your-supabase-url"
 SUPABASE_ANON_KEY = "your-supabase-anon-key"
+# TR: register_device_user çakışma sonuçları -> status mesajı | EN: register_device_user conflict outcomes -> status message | RU: Результаты конфликтов register_device_user -> статусное сообщение
+REGISTRATION_CONFLICTS = {
+    'username_taken': "Registration Failed: username taken",
+    'email_taken': "Registration Failed: email taken",
+    'device_taken': "Registration Failed: device linked to another account",
+    'invalid': "Registration Failed: invalid fields",
+    'conflict': "Registration Failed: account conflict",  # Any other UNIQUE violation
+}
 
 BLUEZ_SERVICE_NAME = 'org.bluez'
 GATT_MANAGER_IFACE = 'org.bluez.GattManager1'
 LE_ADVERTISING_MANAGER_IFACE = 'org.bluez.LEAdvertisingManager1'
 LE_ADVERTISEMENT_IFACE = 'org.bluez.LEAdvertisement1'
+ADAPTER_IFACE = 'org.bluez.Adapter1'
 DBUS_OM_IFACE = 'org.freedesktop.DBus.ObjectManager'
 DBUS_PROP_IFACE = 'org.freedesktop.DBus.Properties'
 GATT_SERVICE_IFACE = 'org.bluez.GattService1'
 GATT_CHRC_IFACE = 'org.bluez.GattCharacteristic1'
 
+PROVISIONED_MARKER = os.path.join(STATE_DIR, 'provisioned')
+
 DEFAULT_SERVER_HOST = '192.168.1.122'
 DEFAULT_SERVER_PORT = 5000
 CAMERA_INTERVAL_SEC = 3
@@ -124,6 +247,319 @@ PROFILE_MOTION = Profile(
     exposure_mode="sport", denoise=None
 )
 
+# =======================
+#  TRACING
+# =======================
+
+TRACE_BUFFER_SIZE = 4096
+TRACE_DUMP_DIR = '/tmp'
+PROFILE_DEFAULT_SEC = 10
+PROFILE_MAX_SEC = 120
+PROFILE_INTERVAL_SEC = 0.01
+
+class TraceBuffer:
+    """TR: Sabit boyutlu bellek içi iz halkası | EN: Fixed-size in-memory ring of trace spans | RU: Кольцевой буфер трассировки фиксированного размера в памяти"""
+
+    def __init__(self, size: int = TRACE_BUFFER_SIZE):
+        # TR: deque.append GIL altında atomik, kilit gerekmez | EN: deque.append is atomic under the GIL, no lock needed | RU: deque.append атомарен под GIL, блокировка не нужна
+        self.events = collections.deque(maxlen=size)
+        self.pid = os.getpid()
+
+    @contextlib.contextmanager
+    def span(self, name: str, **args):
+        """TR: Bir kod bloğunun süresini kaydet | EN: Record the duration of a code block | RU: Записать длительность блока кода"""
+        start = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            self.events.append((name, start, time.perf_counter_ns() - start,
+                                threading.get_ident(), args))
+
+    def traced(self, name: str):
+        """TR: Fonksiyonu span ile saran dekoratör | EN: Decorator that wraps a function in a span | RU: Декоратор, оборачивающий функцию в span"""
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.span(name):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def to_chrome_trace(self) -> dict:
+        """TR: Halkayı Chrome trace formatına çevir | EN: Convert the ring to Chrome trace format | RU: Преобразовать буфер в формат Chrome trace"""
+        events = []
+        for name, start_ns, dur_ns, tid, args in list(self.events):
+            events.append({
+                'name': name, 'ph': 'X', 'pid': self.pid, 'tid': tid,
+                'ts': start_ns / 1000.0, 'dur': dur_ns / 1000.0,
+                'args': {k: str(v) for k, v in args.items()}
+            })
+        return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+    def dump(self, directory: str = TRACE_DUMP_DIR) -> Optional[str]:
+        """TR: Halkayı diske yaz, dosya yolunu döndür | EN: Write the ring to disk and return the file path | RU: Записать буфер на диск и вернуть путь к файлу"""
+        path = os.path.join(directory, f"optix_trace_{int(time.time())}.json")
+        try:
+            with open(path, 'w') as f:
+                json.dump(self.to_chrome_trace(), f)
+            logger.info(f"Trace dumped: {path} ({len(self.events)} spans)")
+            return path
+        except Exception as e:
+            logger.error(f"Trace dump failed: {e}")
+            return None
+
+class SamplingProfiler:
+    """TR: Tüm thread'lerin yığınlarını örnekleyen profilleyici | EN: Profiler that samples the stacks of all threads | RU: Профилировщик, сэмплирующий стеки всех потоков"""
+
+    def __init__(self, interval: float = PROFILE_INTERVAL_SEC):
+        self.interval = interval
+        self.thread = None
+
+    def is_running(self) -> bool:
+        return bool(self.thread and self.thread.is_alive())
+
+    def start(self, duration: float = PROFILE_DEFAULT_SEC, directory: str = TRACE_DUMP_DIR) -> bool:
+        """TR: N saniyelik örneklemeyi arka planda başlat | EN: Start sampling for N seconds in the background | RU: Запустить сэмплирование на N секунд в фоне"""
+        if self.is_running():
+            logger.warning("Profiler already running")
+            return False
+        duration = max(1.0, min(float(duration), PROFILE_MAX_SEC))
+        self.thread = threading.Thread(target=self._run, args=(duration, directory), daemon=True)
+        self.thread.start()
+        logger.info(f"Profiler started for {duration:.0f}s")
+        return True
+
+    def _run(self, duration: float, directory: str):
+        own_id = threading.get_ident()
+        stacks = collections.Counter()
+        samples = 0
+        deadline = time.monotonic() + duration
+        while time.monotonic() < deadline:
+            for tid, frame in sys._current_frames().items():
+                if tid == own_id:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                    frame = frame.f_back
+                stacks[';'.join(reversed(stack))] += 1
+            samples += 1
+            time.sleep(self.interval)
+
+        # TR: flamegraph.pl / speedscope ile açılabilen katlanmış yığın formatı | EN: Folded stack format readable by flamegraph.pl / speedscope | RU: Свернутый формат стеков для flamegraph.pl / speedscope
+        path = os.path.join(directory, f"optix_profile_{int(time.time())}.folded")
+        try:
+            with open(path, 'w') as f:
+                for stack, count in stacks.most_common():
+                    f.write(f"{stack} {count}\n")
+            logger.info(f"Profile written: {path} ({samples} samples)")
+        except Exception as e:
+            logger.error(f"Profile write failed: {e}")
+
+tracer = TraceBuffer()
+profiler = SamplingProfiler()
+
+# =======================
+#  METRICS
+# =======================
+
+METRICS_HOST = '127.0.0.1'
+METRICS_PORT = 9105
+CPU_TEMP_PATH = '/sys/class/thermal/thermal_zone0/temp'
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+class Counter:
+    """TR: Monoton artan sayaç | EN: Monotonically increasing counter | RU: Монотонно возрастающий счетчик"""
+    kind = 'counter'
+
+    def __init__(self, name: str, help_text: str, labels: Optional[dict] = None):
+        self.name = name
+        self.help_text = help_text
+        self.labels = labels or {}
+        self.value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1):
+        with self._lock:
+            self.value += amount
+
+    def samples(self):
+        return [(self.name, self.labels, self.value)]
+
+class Gauge(Counter):
+    """TR: Anlık değer; isteğe bağlı olarak okuma anında hesaplanır | EN: Point-in-time value, optionally computed at scrape time | RU: Мгновенное значение, опционально вычисляемое при чтении"""
+    kind = 'gauge'
+
+    def __init__(self, name: str, help_text: str, labels: Optional[dict] = None, callback=None):
+        super().__init__(name, help_text, labels)
+        self.callback = callback
+
+    def set(self, value: float):
+        self.value = value
+
+    def samples(self):
+        if self.callback:
+            try:
+                self.value = self.callback()
+            except Exception:
+                pass
+        return [(self.name, self.labels, self.value)]
+
+class Histogram:
+    """TR: Sabit kovalı histogram | EN: Fixed-bucket histogram | RU: Гистограмма с фиксированными корзинами"""
+    kind = 'histogram'
+
+    def __init__(self, name: str, help_text: str, labels: Optional[dict] = None,
+                 buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.labels = labels or {}
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+            self.count += 1
+
+    @contextlib.contextmanager
+    def time(self):
+        """TR: Bloğun süresini saniye olarak gözlemle | EN: Observe the block duration in seconds | RU: Замерить длительность блока в секундах"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start)
+
+    def mean(self) -> float:
+        return self.sum / self.count if self.count else 0.0
+
+    def samples(self):
+        with self._lock:
+            counts, total, count = list(self.counts), self.sum, self.count
+        result = []
+        cumulative = 0
+        for bound, bucket_count in zip(self.buckets + (float('inf'),), counts):
+            cumulative += bucket_count
+            le = '+Inf' if bound == float('inf') else repr(bound)
+            result.append((f"{self.name}_bucket", {**self.labels, 'le': le}, cumulative))
+        result.append((f"{self.name}_sum", self.labels, total))
+        result.append((f"{self.name}_count", self.labels, count))
+        return result
+
+class MetricsRegistry:
+    """TR: Tüm metriklerin kaydı ve Prometheus metin çıktısı | EN: Registry of all metrics with Prometheus text output | RU: Реестр всех метрик с выводом в текстовом формате Prometheus"""
+
+    def __init__(self):
+        self.metrics = {}
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, cls, name: str, help_text: str, labels: Optional[dict], **kwargs):
+        key = (name, tuple(sorted((labels or {}).items())))
+        with self._lock:
+            metric = self.metrics.get(key)
+            if metric is None:
+                metric = cls(name, help_text, labels, **kwargs)
+                self.metrics[key] = metric
+            return metric
+
+    def counter(self, name: str, help_text: str, labels: Optional[dict] = None) -> Counter:
+        return self._get_or_create(Counter, name, help_text, labels)
+
+    def gauge(self, name: str, help_text: str, labels: Optional[dict] = None, callback=None) -> Gauge:
+        return self._get_or_create(Gauge, name, help_text, labels, callback=callback)
+
+    def histogram(self, name: str, help_text: str, labels: Optional[dict] = None,
+                  buckets: Tuple[float, ...] = LATENCY_BUCKETS) -> Histogram:
+        return self._get_or_create(Histogram, name, help_text, labels, buckets=buckets)
+
+    def render_prometheus(self) -> str:
+        """TR: Prometheus metin formatı | EN: Prometheus text exposition format | RU: Текстовый формат Prometheus"""
+        with self._lock:
+            metrics = sorted(self.metrics.values(), key=lambda m: m.name)
+        lines = []
+        seen = set()
+        for metric in metrics:
+            if metric.name not in seen:
+                seen.add(metric.name)
+                lines.append(f"# HELP {metric.name} {metric.help_text}")
+                lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for name, labels, value in metric.samples():
+                if labels:
+                    label_str = ','.join(f'{k}="{v}"' for k, v in labels.items())
+                    lines.append(f"{name}{{{label_str}}} {value}")
+                else:
+                    lines.append(f"{name} {value}")
+        return '\n'.join(lines) + '\n'
+
+def read_cpu_temperature() -> float:
+    """TR: CPU sıcaklığını °C olarak oku | EN: Read CPU temperature in °C | RU: Прочитать температуру CPU в °C"""
+    with open(CPU_TEMP_PATH, 'r') as f:
+        return int(f.read().strip()) / 1000.0
+
+metrics = MetricsRegistry()
+FRAMES_CAPTURED = metrics.counter('optix_frames_captured_total', 'Frames captured by the camera')
+FRAMES_SENT = metrics.counter('optix_frames_sent_total', 'Frames sent to the streaming server')
+FRAMES_DROPPED = metrics.counter('optix_frames_dropped_total', 'Frames lost to capture or send failures')
+BYTES_SENT = metrics.counter('optix_bytes_sent_total', 'Image bytes sent to the streaming server')
+CAPTURE_SECONDS = metrics.histogram('optix_capture_seconds', 'Camera capture latency')
+SEND_SECONDS = metrics.histogram('optix_send_seconds', 'Frame send latency')
+STREAM_RECONNECTS = metrics.counter('optix_stream_reconnects_total', 'Streaming server reconnect attempts')
+BLE_READS = metrics.counter('optix_ble_reads_total', 'GATT ReadValue calls')
+BLE_WRITES = metrics.counter('optix_ble_writes_total', 'GATT WriteValue calls')
+STATUS_NOTIFICATIONS = metrics.counter('optix_status_notifications_total', 'Status messages notified over BLE')
+STATUS_COALESCED = metrics.counter('optix_status_coalesced_total', 'Status progress updates superseded before sending')
+STATUS_OVERSIZE = metrics.counter('optix_status_oversize_total', 'Status messages dropped for needing more than 255 fragments')
+WIFI_PROVISION_SECONDS = metrics.histogram('optix_wifi_provision_seconds', 'Time from credentials to WiFi connected')
+WIFI_PROVISION_FAILURES = metrics.counter('optix_wifi_provision_failures_total', 'Failed WiFi provisioning attempts')
+WIFI_ASSOCIATE_SECONDS = metrics.histogram('optix_wifi_associate_seconds', 'Time from SELECT_NETWORK to CTRL-EVENT-CONNECTED')
+WIFI_DHCP_SECONDS = metrics.histogram('optix_wifi_dhcp_seconds', 'Time from association to an IPv4 address')
+AUTH_CACHE_HITS = metrics.counter('optix_auth_cache_hits_total', 'Authentication requests answered from the on-device cache')
+SUPABASE_ERRORS = metrics.counter('optix_supabase_errors_total', 'Supabase calls that failed in transport or with HTTP 5xx')
+CPU_TEMPERATURE = metrics.gauge('optix_cpu_temperature_celsius', 'SoC temperature', callback=read_cpu_temperature)
+
+def observe_supabase(method: str, path: str, status, seconds: float):
+    """TR: Supabase çağrı gecikmesini kaydet | EN: Record Supabase call latency | RU: Записать задержку вызова Supabase"""
+    metrics.histogram('optix_supabase_request_seconds', 'Supabase REST call latency',
+                      {'method': method, 'path': path}).observe(seconds)
+    if status == 'error' or status >= 500:
+        SUPABASE_ERRORS.inc()
+
+def metrics_summary() -> str:
+    """TR: Status karakteristiği için kısa özet | EN: Compact summary for the status characteristic | RU: Краткая сводка для характеристики статуса"""
+    try:
+        temp = f"{read_cpu_temperature():.1f}"
+    except Exception:
+        temp = "?"
+    return (f"M cap={FRAMES_CAPTURED.value} sent={FRAMES_SENT.value} drop={FRAMES_DROPPED.value} "
+            f"kb={BYTES_SENT.value // 1024} cap_ms={CAPTURE_SECONDS.mean() * 1000:.0f} "
+            f"send_ms={SEND_SECONDS.mean() * 1000:.0f} rc={STREAM_RECONNECTS.value} "
+            f"ble={BLE_READS.value}r/{BLE_WRITES.value}w prov_s={WIFI_PROVISION_SECONDS.mean():.1f} t={temp}")
+
+class MetricsRequestHandler(BaseHTTPRequestHandler):
+    """TR: /metrics uç noktası | EN: /metrics endpoint | RU: Эндпоинт /metrics"""
+
+    def do_GET(self):
+        if self.path != '/metrics':
+            self.send_error(404)
+            return
+        body = metrics.render_prometheus().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # TR: Her scrape için log yazma | EN: Don't log every scrape | RU: Не логировать каждый запрос
+        pass
+
 class SystemUtils:
     @staticmethod
     def which(cmd: str) -> Optional[str]:
@@ -152,6 +588,11 @@ class SystemUtils:
     @staticmethod
     def hash_serial(serial: str) -> str:
         return hashlib.sha256(f"OPTIX-{serial}".encode()).hexdigest()
+
+    @staticmethod
+    def hash_password(password: str) -> str:
+        # TR: Uygulamadaki AuthService.hashPassword ile aynı | EN: Same as AuthService.hashPassword in the app | RU: То же, что AuthService.hashPassword в приложении
+        return hashlib.sha256(password.encode('utf-8')).hexdigest()
     
     @staticmethod
     def is_wifi_connected() -> bool:
@@ -160,24 +601,791 @@ class SystemUtils:
             return result.returncode == 0 and result.stdout.strip()
         except Exception:
             return False
-    
-    @staticmethod
-    def get_wifi_networks() -> list:
+
+# =======================
+#  WIFI SCANNING
+# =======================
+
+WIFI_SCAN_INTERVAL_SEC = 60
+WIFI_SCAN_TTL_SEC = 120
+WIFI_SCAN_TIMEOUT_SEC = 10  # Upper bound; results are read as soon as CTRL-EVENT-SCAN-RESULTS arrives
+WIFI_SCAN_MAX_RESULTS = 20
+
+@dataclass
+class ScanResult:
+    ssid: str
+    bssid: str
+    rssi: int
+    channel: int
+    security: str
+
+def frequency_to_channel(freq: int) -> int:
+    """TR: MHz frekansını kanal numarasına çevir | EN: Convert MHz frequency to channel number | RU: Преобразовать частоту в МГц в номер канала"""
+    if freq == 2484:
+        return 14
+    if 2412 <= freq <= 2472:
+        return (freq - 2407) // 5
+    if 5955 <= freq <= 7115:
+        return (freq - 5950) // 5
+    if 5000 <= freq <= 5900:
+        return (freq - 5000) // 5
+    return 0
+
+def security_from_flags(flags: str) -> str:
+    if 'SAE' in flags:
+        return 'WPA3'
+    if 'WPA2' in flags or 'RSN' in flags:
+        return 'WPA2'
+    if 'WPA' in flags:
+        return 'WPA'
+    if 'WEP' in flags:
+        return 'WEP'
+    return 'OPEN'
+
+def parse_scan_results(text: str) -> list:
+    """TR: SCAN_RESULTS tablosunu ayrıştır | EN: Parse the SCAN_RESULTS table | RU: Разобрать таблицу SCAN_RESULTS"""
+    results = []
+    # TR: İlk satır başlıktır: bssid / frequency / signal level / flags / ssid | EN: First line is the header: bssid / frequency / signal level / flags / ssid | RU: Первая строка — заголовок: bssid / frequency / signal level / flags / ssid
+    for line in text.splitlines()[1:]:
+        fields = line.split('\t', 4)
+        if len(fields) < 5 or not fields[4]:
+            continue
+        bssid, freq, level, flags, ssid = fields
+        # TR: wpa_supplicant UTF-8 SSID'leri \xNN olarak kaçışlar | EN: wpa_supplicant escapes UTF-8 SSIDs as \xNN | RU: wpa_supplicant экранирует UTF-8 SSID как \xNN
+        if '\\' in ssid:
+            ssid = codecs.escape_decode(ssid.encode('utf-8'))[0].decode('utf-8', 'replace')
         try:
-            result = subprocess.run(['iwlist', 'wlan0', 'scan'], 
-                                  capture_output=True, text=True)
-            networks = []
-            if result.returncode == 0:
-                lines = result.stdout.split('\n')
-                for line in lines:
-                    if 'ESSID:' in line:
-                        ssid = line.split('ESSID:')[1].strip().strip('"')
-                        if ssid and ssid != '<hidden>':
-                            networks.append(ssid)
-            return networks
+            results.append(ScanResult(ssid, bssid, int(level), frequency_to_channel(int(freq)),
+                                      security_from_flags(flags)))
+        except ValueError:
+            continue
+    return results
+
+def parse_iwlist(text: str) -> list:
+    """TR: iwlist çıktısını ayrıştır (wpa_supplicant yoksa yedek) | EN: Parse iwlist output (fallback without wpa_supplicant) | RU: Разобрать вывод iwlist (резерв без wpa_supplicant)"""
+    results = []
+    for cell in text.split('Cell ')[1:]:
+        try:
+            result = parse_iwlist_cell(cell)
+        except (ValueError, IndexError) as e:
+            # TR: Bozuk hücreyi atla, diğerleri geçerli kalır | EN: Skip the malformed cell; the others stay valid | RU: Пропустить поврежденную ячейку; остальные остаются в силе
+            logger.debug(f"Skipping malformed iwlist cell: {e}")
+            continue
+        if result:
+            results.append(result)
+    return results
+
+def parse_iwlist_cell(cell: str) -> Optional[ScanResult]:
+    """TR: Tek bir iwlist hücresini ayrıştır; gizli ağlar için None | EN: Parse one iwlist cell; None for hidden networks | RU: Разобрать одну ячейку iwlist; None для скрытых сетей"""
+    bssid = ssid = ''
+    rssi = channel = 0
+    security = 'OPEN'
+    for line in cell.splitlines():
+        line = line.strip()
+        if 'Address:' in line:
+            bssid = line.split('Address:')[1].strip().lower()
+        elif line.startswith('Channel:'):
+            channel = int(line.split(':')[1])
+        elif 'Signal level=' in line:
+            rssi = int(line.split('Signal level=')[1].split()[0].split('/')[0])
+        elif line.startswith('ESSID:'):
+            ssid = line.split('ESSID:')[1].strip('"')
+        elif line == 'Encryption key:on' and security == 'OPEN':
+            security = 'WEP'
+        elif 'WPA2' in line:
+            security = 'WPA2'
+        elif 'WPA Version' in line and security != 'WPA2':
+            security = 'WPA'
+    if ssid and ssid != '<hidden>':
+        return ScanResult(ssid, bssid, rssi, channel, security)
+    return None
+
+class WiFiScanner:
+    """TR: Arka planda tarayan, TTL'li WiFi sonuç önbelleği | EN: Background scanner with a TTL cache of WiFi results | RU: Фоновый сканер с TTL-кэшем результатов WiFi"""
+
+    def __init__(self, optix_system, interval: float = WIFI_SCAN_INTERVAL_SEC):
+        self.optix_system = optix_system
+        self.interval = interval
+        self.results = []
+        self.updated_at = 0.0
+        self.lock = threading.Lock()
+        self.wakeup = threading.Event()
+        self.running = False
+        self.thread = None
+
+    def start(self):
+        if self.running:
+            return
+        self.running = True
+        self.thread = threading.Thread(target=self._loop, daemon=True)
+        self.thread.start()
+        logger.info("WiFi scanner started")
+
+    def stop(self):
+        self.running = False
+        self.wakeup.set()
+
+    def get(self, max_age: float = WIFI_SCAN_TTL_SEC) -> Optional[list]:
+        """TR: Önbellek tazeyse sonuçları döndür | EN: Return cached results if still fresh | RU: Вернуть кэшированные результаты, если они свежие"""
+        with self.lock:
+            if self.updated_at and time.monotonic() - self.updated_at <= max_age:
+                return self.results
+        return None
+
+    @tracer.traced('wifi.scan')
+    def refresh(self) -> list:
+        """TR: Hemen tara ve önbelleği güncelle | EN: Scan now and update the cache | RU: Сканировать сейчас и обновить кэш"""
+        try:
+            if WpaCtrl.available():
+                results = self._scan_wpa()
+            else:
+                output = subprocess.run(['iwlist', WIFI_INTERFACE, 'scan'],
+                                        capture_output=True, text=True, timeout=15).stdout
+                results = parse_iwlist(output)
         except Exception as e:
             logger.error(f"WiFi scan failed: {e}")
-            return []
+            return self.results
+
+        # TR: SSID başına en güçlü BSSID, sinyale göre sıralı | EN: Strongest BSSID per SSID, sorted by signal | RU: Самый сильный BSSID на SSID, отсортировано по сигналу
+        best = {}
+        for result in results:
+            if result.ssid not in best or result.rssi > best[result.ssid].rssi:
+                best[result.ssid] = result
+        results = sorted(best.values(), key=lambda r: r.rssi, reverse=True)
+        with self.lock:
+            self.results = results
+            self.updated_at = time.monotonic()
+        logger.debug("WiFi scan: %d networks", len(results))
+        return results
+
+    def _scan_wpa(self) -> list:
+        with WpaCtrl() as ctrl:
+            ctrl.attach()
+            # TR: FAIL-BUSY: zaten bir tarama sürüyor, onun bitişini bekle | EN: FAIL-BUSY means a scan is already running; wait for it to finish | RU: FAIL-BUSY — сканирование уже идет; дождаться его завершения
+            ctrl.request('SCAN')
+            event = ctrl.wait_event(('CTRL-EVENT-SCAN-RESULTS', 'CTRL-EVENT-SCAN-FAILED'), WIFI_SCAN_TIMEOUT_SEC)
+            if event is None or 'SCAN-FAILED' in event:
+                # TR: wpa_supplicant'ın önceki sonuçları yine de kullanılabilir | EN: wpa_supplicant's previous results are still usable | RU: Предыдущие результаты wpa_supplicant все еще пригодны
+                logger.debug(f"WiFi scan did not complete: {event or 'timeout'}")
+            return parse_scan_results(ctrl.request('SCAN_RESULTS'))
+
+    def _loop(self):
+        while self.running:
+            # TR: Akış sırasında tarama yapma; tarama radyoyu meşgul eder | EN: Skip background scans while streaming; scans tie up the radio | RU: Не сканировать в фоне во время стрима; сканирование занимает радио
+            if not self.optix_system.streaming_active:
+                self.refresh()
+            self.wakeup.wait(self.interval)
+            self.wakeup.clear()
+
+# =======================
+#  WIFI CREDENTIAL STORE
+# =======================
+
+WIFI_STORE_FILE = os.path.join(STATE_DIR, 'wifi_networks.json')
+ROAM_MIN_RSSI = -80
+ROAM_PRIORITY_DB = 3  # One priority step is worth 3 dB of signal
+ROAM_RETRY_SEC = 120
+CREDENTIAL_SYNC_INTERVAL_SEC = 3600
+
+class CredentialStore:
+    """TR: Öncelikli, çoklu WiFi ağı deposu (yalnızca PSK saklanır) | EN: Multi-network WiFi store with priorities (only PSKs are kept) | RU: Хранилище нескольких сетей WiFi с приоритетами (хранятся только PSK)"""
+
+    def __init__(self, path: str = WIFI_STORE_FILE):
+        self.path = path
+        self.lock = threading.Lock()
+        self.networks = {}  # ssid -> {'psk', 'priority', 'last_success'}
+        self.last_attempt = {}  # ssid -> monotonic time of the last roam attempt
+        self.load()
+
+    def load(self):
+        try:
+            with open(self.path) as f:
+                self.networks = {n['ssid']: n for n in json.load(f).get('networks', [])}
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"WiFi store unreadable, starting empty: {e}")
+
+    def save(self):
+        """TR: Atomik yaz, yalnızca sahibi okuyabilir | EN: Write atomically, readable by the owner only | RU: Атомарная запись, чтение только владельцем"""
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = self.path + '.tmp'
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, 'w') as f:
+            json.dump({'networks': list(self.networks.values())}, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+    def remember(self, ssid: str, psk: str, priority: Optional[int] = None):
+        """TR: Başarılı bağlantıyı kaydet | EN: Record a successful connection | RU: Записать успешное подключение"""
+        with self.lock:
+            network = self.networks.setdefault(ssid, {'ssid': ssid, 'priority': 0})
+            network['psk'] = psk
+            if priority is not None:
+                network['priority'] = priority
+            network['last_success'] = int(time.time())
+            self.last_attempt.pop(ssid, None)
+            self.save()
+
+    def sync(self, entries: list) -> int:
+        """TR: users.preferred_wifi_networks listesini birleştir | EN: Merge the users.preferred_wifi_networks list | RU: Объединить список users.preferred_wifi_networks"""
+        changed = 0
+        with self.lock:
+            for rank, entry in enumerate(entries):
+                # TR: Eleman bir SSID dizgesi ya da {ssid, password|psk, priority} olabilir; sıra öncelik verir | EN: An entry is an SSID string or {ssid, password|psk, priority}; order implies priority | RU: Элемент — строка SSID или {ssid, password|psk, priority}; порядок задает приоритет
+                if isinstance(entry, str):
+                    entry = {'ssid': entry}
+                ssid = entry.get('ssid') if isinstance(entry, dict) else None
+                if not ssid:
+                    continue
+                network = self.networks.get(ssid, {'ssid': ssid})
+                try:
+                    network['priority'] = int(entry.get('priority', len(entries) - rank))
+                except (TypeError, ValueError):
+                    logger.warning(f"Invalid priority for {ssid}, using list order")
+                    network['priority'] = len(entries) - rank
+                try:
+                    secret = entry.get('psk') or entry.get('password')
+                    if secret:
+                        network['psk'] = wpa_psk(ssid, secret)
+                except ValueError as e:
+                    logger.warning(f"Skipping credentials for {ssid}: {e}")
+                # TR: PSK'sız kayıtlar yalnızca önceliği taşır; ağ burada bir kez bağlanınca kullanılır | EN: Entries without a PSK only carry priority; they are used once the network connects here | RU: Записи без PSK несут только приоритет; используются после первого подключения здесь
+                self.networks[ssid] = network
+                changed += 1
+            if changed:
+                self.save()
+        return changed
+
+    def config_blocks(self, ssid: str, psk: str) -> str:
+        """TR: wpa_supplicant.conf için network={} blokları | EN: network={} blocks for wpa_supplicant.conf | RU: Блоки network={} для wpa_supplicant.conf"""
+        with self.lock:
+            networks = [n for n in self.networks.values() if n['ssid'] != ssid and n.get('psk')]
+        top = max([n.get('priority', 0) for n in networks] + [0]) + 1
+        networks.append({'ssid': ssid, 'psk': psk, 'priority': top})
+        # TR: ssid onaltılık yazılır: tırnak/kaçış sorunu yok | EN: ssid is written as hex: no quoting/escaping issues | RU: ssid пишется в hex: нет проблем с кавычками/экранированием
+        return ''.join(f"""
+network={{
+    ssid={n['ssid'].encode('utf-8').hex()}
+    psk={n['psk']}
+    key_mgmt=WPA-PSK
+    priority={max(0, n.get('priority', 0))}
+}}
+""" for n in networks)
+
+    def choose(self, scan_results: list) -> Optional[dict]:
+        """TR: Görünür bilinen ağlardan en iyisini seç | EN: Pick the best visible known network | RU: Выбрать лучшую из видимых известных сетей"""
+        now = time.monotonic()
+        best, best_score = None, None
+        with self.lock:
+            for result in scan_results:
+                network = self.networks.get(result.ssid)
+                if not network or not network.get('psk') or result.rssi < ROAM_MIN_RSSI:
+                    continue
+                if now - self.last_attempt.get(result.ssid, -ROAM_RETRY_SEC) < ROAM_RETRY_SEC:
+                    continue
+                # TR: En güçlü sinyal; öncelik ve son başarı eşitliği bozar | EN: Strongest signal; priority and last success break near-ties | RU: Самый сильный сигнал; приоритет и последний успех решают при равенстве
+                score = (result.rssi + ROAM_PRIORITY_DB * network.get('priority', 0),
+                         network.get('last_success', 0))
+                if best_score is None or score > best_score:
+                    best, best_score = network, score
+            if best:
+                self.last_attempt[best['ssid']] = now
+        return dict(best) if best else None
+
+# =======================
+#  AUTH CACHE
+# =======================
+
+AUTH_CACHE_FILE = os.path.join(STATE_DIR, 'auth_cache.bin')
+AUTH_CACHE_KEY_FILE = os.path.join(STATE_DIR, 'auth_cache.key')
+AUTH_CACHE_TTL_SEC = 7 * 24 * 3600
+AUTH_CACHE_MAX_ENTRIES = 16
+AUTH_CACHE_KEY_BYTES = 32  # Fernet takes the urlsafe-base64 form of exactly 32 bytes
+
+class AuthCache:
+    """TR: Yakın zamanda doğrulanmış kullanıcıların şifreli, TTL'li önbelleği | EN: Encrypted, TTL-bound cache of recently verified users | RU: Зашифрованный кэш недавно проверенных пользователей с TTL"""
+
+    def __init__(self, path: str = AUTH_CACHE_FILE, key_path: str = AUTH_CACHE_KEY_FILE,
+                 ttl: float = AUTH_CACHE_TTL_SEC):
+        self.path = path
+        self.key_path = key_path
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.entries = {}  # username -> {'verifier', 'is_active', 'verified_at'}
+        self.secret = self._load_secret()
+        self.load()
+
+    def _load_secret(self) -> bytes:
+        """TR: Cihaza özgü rastgele anahtar; yoksa oluştur | EN: Device-local random key; created on first use | RU: Локальный случайный ключ устройства; создается при первом использовании"""
+        try:
+            with open(self.key_path, 'rb') as f:
+                secret = f.read()
+            if len(secret) == AUTH_CACHE_KEY_BYTES:
+                return secret
+            # TR: Bozuk/kısaltılmış anahtar: yenisini üret; eski önbellek okunamaz ve boş başlar | EN: Corrupt or truncated key: regenerate; the old cache can't be read and starts empty | RU: Поврежденный или усеченный ключ: создать новый; старый кэш не читается и начинается пустым
+            logger.warning(f"Auth cache key is {len(secret)} bytes, expected {AUTH_CACHE_KEY_BYTES}; regenerating")
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.warning(f"Auth cache key unreadable, regenerating: {e}")
+        secret = os.urandom(AUTH_CACHE_KEY_BYTES)
+        try:
+            os.makedirs(os.path.dirname(self.key_path), exist_ok=True)
+            tmp_path = self.key_path + '.tmp'
+            fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, 'wb') as f:
+                f.write(secret)
+            os.replace(tmp_path, self.key_path)
+        except OSError as e:
+            logger.warning(f"Auth cache key not persisted, cache is memory-only: {e}")
+        return secret
+
+    def _fernet(self):
+        return Fernet(base64.urlsafe_b64encode(self.secret))
+
+    def _verifier(self, username: str, password_hash: str) -> str:
+        # TR: Parola hash'i değil, anahtarlı HMAC'i saklanır | EN: A keyed HMAC is stored, not the password hash | RU: Хранится HMAC с ключом, а не хеш пароля
+        return hmac.new(self.secret, f"{username}\0{password_hash}".encode('utf-8'), hashlib.sha256).hexdigest()
+
+    def load(self):
+        # TR: cryptography yoksa önbellek yalnızca bellekte tutulur | EN: Without cryptography the cache stays in memory only | RU: Без cryptography кэш хранится только в памяти
+        if not HAS_CRYPTOGRAPHY:
+            return
+        try:
+            with open(self.path, 'rb') as f:
+                self.entries = json.loads(self._fernet().decrypt(f.read()))
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, InvalidToken) as e:
+            logger.warning(f"Auth cache unreadable, starting empty: {e}")
+
+    def save(self):
+        """TR: Şifreli ve atomik yaz | EN: Write encrypted and atomically | RU: Записать зашифрованно и атомарно"""
+        if not HAS_CRYPTOGRAPHY:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp_path = self.path + '.tmp'
+            fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, 'wb') as f:
+                f.write(self._fernet().encrypt(json.dumps(self.entries).encode('utf-8')))
+            os.replace(tmp_path, self.path)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Auth cache not saved: {e}")
+
+    def lookup(self, username: str, password_hash: str) -> Optional[bool]:
+        """TR: Önbellekteki karar: True/False, bilinmiyor veya süresi dolmuşsa None | EN: Cached verdict: True/False, None if unknown or expired | RU: Решение из кэша: True/False, None если неизвестно или истекло"""
+        with self.lock:
+            entry = self.entries.get(username)
+        if entry is None or time.time() - entry['verified_at'] > self.ttl:
+            return None
+        if not hmac.compare_digest(entry['verifier'], self._verifier(username, password_hash)):
+            # TR: Farklı parola: değişmiş olabilir, Supabase karar verir | EN: Different password: it may have changed, Supabase decides | RU: Другой пароль: мог измениться, решает Supabase
+            return None
+        return entry['is_active']
+
+    def store(self, username: str, password_hash: str, is_active: bool = True):
+        with self.lock:
+            self.entries[username] = {'verifier': self._verifier(username, password_hash),
+                                      'is_active': is_active, 'verified_at': time.time()}
+            # TR: En eski doğrulananları at | EN: Evict the least recently verified | RU: Удалить давно проверенные
+            while len(self.entries) > AUTH_CACHE_MAX_ENTRIES:
+                oldest = min(self.entries, key=lambda name: self.entries[name]['verified_at'])
+                del self.entries[oldest]
+            self.save()
+
+    def invalidate(self, username: Optional[str] = None) -> int:
+        """TR: Bir kullanıcıyı ya da tüm önbelleği sil | EN: Drop one user or the whole cache | RU: Удалить одного пользователя или весь кэш"""
+        with self.lock:
+            if username is None:
+                dropped = len(self.entries)
+                self.entries = {}
+            else:
+                dropped = 1 if self.entries.pop(username, None) else 0
+            self.save()
+        return dropped
+
+# =======================
+#  BLE FRAMING
+# =======================
+
+# TR: 0xA5 bir UTF-8 devam baytıdır, çerçevesiz metin/JSON asla onunla başlamaz | EN: 0xA5 is a UTF-8 continuation byte, so unframed text/JSON never starts with it | RU: 0xA5 — байт продолжения UTF-8, поэтому текст/JSON без фрейма никогда с него не начинается
+FRAME_MAGIC = 0xA5
+FRAME_HEADER = struct.Struct('>BBBB')  # magic, sequence, fragment index, fragment total
+ATT_OVERHEAD = 3
+ATT_DEFAULT_MTU = 23  # Until a client reports its negotiated MTU
+MAX_FRAGMENTS = 255
+REASSEMBLY_TIMEOUT_SEC = 10.0
+
+def fragment_message(payload: bytes, seq: int, mtu: int) -> list:
+    """TR: Yükü MTU boyutlu çerçevelere böl | EN: Split a payload into MTU-sized frames | RU: Разбить данные на фреймы размером MTU"""
+    chunk_size = mtu - ATT_OVERHEAD - FRAME_HEADER.size
+    if chunk_size <= 0:
+        raise ValueError(f"MTU too small for framing: {mtu}")
+    total = max(1, -(-len(payload) // chunk_size))
+    if total > MAX_FRAGMENTS:
+        raise ValueError(f"Payload too large: {len(payload)} bytes")
+    view = memoryview(payload)
+    return [FRAME_HEADER.pack(FRAME_MAGIC, seq & 0xFF, index, total)
+            + view[index * chunk_size:(index + 1) * chunk_size]
+            for index in range(total)]
+
+class Reassembler:
+    """TR: Çerçeveli yazmaları birleştir; çerçevesiz yazmalar olduğu gibi geçer | EN: Reassemble framed writes; unframed writes pass through as-is | RU: Собирать фреймированные записи; записи без фрейма проходят как есть"""
+
+    def __init__(self, timeout: float = REASSEMBLY_TIMEOUT_SEC):
+        self.timeout = timeout
+        self.pending = {}  # seq -> [deadline, parts, received]
+
+    def feed(self, data: bytes) -> Optional[bytes]:
+        """TR: Tam mesaj hazırsa döndür, değilse None | EN: Return the full message once complete, otherwise None | RU: Вернуть полное сообщение, когда оно собрано, иначе None"""
+        if not data or data[0] != FRAME_MAGIC:
+            return data
+        if len(data) < FRAME_HEADER.size:
+            raise ValueError("Truncated frame header")
+        _, seq, index, total = FRAME_HEADER.unpack_from(data)
+        if total == 0 or index >= total:
+            raise ValueError(f"Invalid fragment {index}/{total}")
+
+        now = time.monotonic()
+        for stale in [k for k, entry in self.pending.items() if entry[0] < now]:
+            logger.warning(f"Dropping incomplete message seq={stale}")
+            del self.pending[stale]
+
+        entry = self.pending.get(seq)
+        if entry is None or len(entry[1]) != total:
+            entry = [now + self.timeout, [None] * total, 0]
+            self.pending[seq] = entry
+        parts = entry[1]
+        if parts[index] is None:
+            entry[2] += 1
+        parts[index] = data[FRAME_HEADER.size:]
+        if entry[2] < total:
+            return None
+        del self.pending[seq]
+        # TR: Tek birleştirme, O(n) | EN: Single join, O(n) | RU: Одно объединение, O(n)
+        return b''.join(parts)
+
+# =======================
+#  BLE COMMAND PROTOCOL
+# =======================
+
+# TR: 0xC1 hiçbir UTF-8 dizisinde geçmez; metin komutlarla ve 0xA5 çerçevelerle karışmaz | EN: 0xC1 never appears in UTF-8, so it can't collide with text commands or 0xA5 frames | RU: 0xC1 не встречается в UTF-8 и не пересекается с текстовыми командами и фреймами 0xA5
+CMD_MAGIC = 0xC1
+CMD_VERSION = 1
+CMD_HEADER = struct.Struct('>BBBH')  # magic, version, opcode, request id
+CMD_FIELD = struct.Struct('>BH')     # tag, length
+
+OP_SCAN_WIFI = 0x01
+OP_GET_SERIAL = 0x02
+OP_AUTH = 0x03
+OP_REGISTER = 0x04
+OP_METRICS = 0x05
+OP_TRACE_DUMP = 0x06
+OP_PROFILE = 0x07
+OP_LOGOUT = 0x08
+OP_STATUS = 0x80  # device -> app reply
+
+# TR: etiket -> (alan adı, tip) | EN: tag -> (field name, type) | RU: тег -> (имя поля, тип)
+CMD_FIELDS = {
+    0x01: ('username', str),
+    0x02: ('password', str),
+    0x03: ('email', str),
+    0x04: ('device_serial', str),
+    0x05: ('seconds', int),
+    0x06: ('message', str),
+}
+CMD_FIELD_TAGS = {name: (tag, kind) for tag, (name, kind) in CMD_FIELDS.items()}
+
+# TR: Geriye uyumlu metin komutları | EN: Backward-compatible text commands | RU: Обратно совместимые текстовые команды
+TEXT_COMMANDS = {
+    'scan_wifi': OP_SCAN_WIFI,
+    'get_serial': OP_GET_SERIAL,
+    'auth': OP_AUTH,
+    'register': OP_REGISTER,
+    'metrics': OP_METRICS,
+    'trace_dump': OP_TRACE_DUMP,
+    'profile': OP_PROFILE,
+    'logout': OP_LOGOUT,
+}
+
+@dataclass
+class CommandRequest:
+    opcode: int
+    fields: dict
+    request_id: Optional[int] = None  # None for text commands
+    session: Optional['BleSession'] = None
+    jobs: int = 0  # Holders still working on this request: the GATT handler and its jobs
+    lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    def hold(self):
+        with self.lock:
+            self.jobs += 1
+
+    def release(self):
+        """TR: Son tutucu bırakınca isteği oturumda bitir (GLib ve iş thread'lerinden güvenli) | EN: Finish the request in its session when the last holder lets go (safe from the GLib and job threads) | RU: Завершить запрос в сессии, когда его отпустит последний держатель (безопасно из потоков GLib и задач)"""
+        with self.lock:
+            self.jobs -= 1
+            done = self.jobs == 0
+        if done and self.session is not None:
+            self.session.finish(self)
+
+def encode_command(opcode: int, fields: dict, request_id: int = 0) -> bytes:
+    """TR: Komutu ikili TLV olarak kodla | EN: Encode a command as binary TLV | RU: Закодировать команду в двоичный TLV"""
+    parts = [CMD_HEADER.pack(CMD_MAGIC, CMD_VERSION, opcode, request_id & 0xFFFF)]
+    for name, value in fields.items():
+        tag, kind = CMD_FIELD_TAGS[name]
+        if kind is int:
+            value = int(value)
+            if value < 0:
+                raise ValueError(f"Negative value for unsigned field: {name}")
+            raw = value.to_bytes(max(1, (value.bit_length() + 7) // 8), 'big')
+        else:
+            raw = str(value).encode('utf-8')
+        if len(raw) > 0xFFFF:
+            raise ValueError(f"Field too long: {name}")
+        parts.append(CMD_FIELD.pack(tag, len(raw)))
+        parts.append(raw)
+    return b''.join(parts)
+
+def decode_command(data: bytes) -> CommandRequest:
+    """TR: İkili TLV komutunu çöz | EN: Decode a binary TLV command | RU: Декодировать двоичную TLV-команду"""
+    if len(data) < CMD_HEADER.size:
+        raise ValueError("Truncated command header")
+    magic, version, opcode, request_id = CMD_HEADER.unpack_from(data)
+    if magic != CMD_MAGIC or version != CMD_VERSION:
+        raise ValueError(f"Unsupported command version {version}")
+    fields = {}
+    offset = CMD_HEADER.size
+    while offset < len(data):
+        if offset + CMD_FIELD.size > len(data):
+            raise ValueError("Truncated field header")
+        tag, length = CMD_FIELD.unpack_from(data, offset)
+        offset += CMD_FIELD.size
+        raw = data[offset:offset + length]
+        if len(raw) != length:
+            raise ValueError("Truncated field value")
+        offset += length
+        # TR: Bilinmeyen etiketler atlanır (ileri uyumluluk) | EN: Unknown tags are skipped (forward compatibility) | RU: Неизвестные теги пропускаются (прямая совместимость)
+        if tag in CMD_FIELDS:
+            name, kind = CMD_FIELDS[tag]
+            fields[name] = int.from_bytes(raw, 'big') if kind is int else raw.decode('utf-8')
+    return CommandRequest(opcode, fields, request_id)
+
+def parse_text_command(text: str) -> CommandRequest:
+    """TR: Eski metin komutunu ("auth:{json}", "profile:10" ...) çöz | EN: Parse a legacy text command ("auth:{json}", "profile:10" ...) | RU: Разобрать старую текстовую команду ("auth:{json}", "profile:10" ...)"""
+    name, _, argument = text.partition(':')
+    opcode = TEXT_COMMANDS.get(name)
+    if opcode is None:
+        raise ValueError(f"Unknown command: {name}")
+    if not argument:
+        return CommandRequest(opcode, {})
+    if opcode == OP_PROFILE:
+        return CommandRequest(opcode, {'seconds': float(argument)})
+    return CommandRequest(opcode, json.loads(argument))
+
+def read_command(payload: bytes) -> CommandRequest:
+    if payload[:1] == bytes((CMD_MAGIC,)):
+        return decode_command(payload)
+    return parse_text_command(payload.decode('utf-8'))
+
+# =======================
+#  BLE SESSIONS
+# =======================
+
+DEVICE_IFACE = 'org.bluez.Device1'
+SESSION_OUTBOX_SIZE = 32
+SESSION_IDLE_SEC = 600
+
+class BleSession:
+    """TR: Bağlı bir istemcinin (BlueZ cihaz yolu) durumu | EN: State of one connected client (BlueZ device path) | RU: Состояние одного подключенного клиента (путь устройства BlueZ)"""
+
+    def __init__(self, device: str):
+        self.device = device
+        self.mtu = None
+        self.reassemblers = {}  # characteristic UUID -> Reassembler
+        self.outbox = collections.deque(maxlen=SESSION_OUTBOX_SIZE)
+        self.read_value = None  # Message being served by a (long) read
+        self.in_flight = set()  # Binary request IDs still being handled
+        self.last_seen = time.monotonic()
+        self.lock = threading.Lock()
+
+    def reassembler(self, uuid: str) -> Reassembler:
+        if uuid not in self.reassemblers:
+            self.reassemblers[uuid] = Reassembler()
+        return self.reassemblers[uuid]
+
+    def push(self, message_bytes: bytes):
+        """TR: Bu oturuma yönelik yanıtı kuyruğa ekle | EN: Queue a reply addressed to this session | RU: Поставить в очередь ответ этой сессии"""
+        with self.lock:
+            self.outbox.append(message_bytes)
+
+    def read(self, offset: int = 0) -> Optional[bytes]:
+        """TR: Kuyruktaki sıradaki yanıtı oku; uzun okumalar aynı mesajda devam eder | EN: Read the next queued reply; long reads continue on the same message | RU: Прочитать следующий ответ из очереди; длинное чтение продолжается на том же сообщении"""
+        with self.lock:
+            if offset == 0:
+                self.read_value = self.outbox.popleft() if self.outbox else None
+            if self.read_value is None:
+                return None
+            return self.read_value[offset:]
+
+    def begin(self, request: CommandRequest) -> bool:
+        """TR: Aynı kimlikli istek hâlâ sürüyorsa False | EN: False if a request with the same ID is still in flight | RU: False, если запрос с тем же ID еще выполняется"""
+        if request.request_id is None:
+            return True
+        with self.lock:
+            if request.request_id in self.in_flight:
+                return False
+            self.in_flight.add(request.request_id)
+            return True
+
+    def finish(self, request: CommandRequest):
+        with self.lock:
+            self.in_flight.discard(request.request_id)
+
+class SessionManager:
+    """TR: BlueZ cihaz yoluna göre oturumlar | EN: Sessions keyed by BlueZ device path | RU: Сессии по пути устройства BlueZ"""
+
+    def __init__(self, idle_timeout: float = SESSION_IDLE_SEC):
+        self.idle_timeout = idle_timeout
+        self.sessions = {}
+        self.lock = threading.Lock()
+
+    def get(self, options) -> BleSession:
+        """TR: Okuma/yazma seçeneklerindeki 'device' için oturumu döndür | EN: Return the session for the 'device' in read/write options | RU: Вернуть сессию для 'device' из опций чтения/записи"""
+        device = str(options.get('device', '')) if options else ''
+        now = time.monotonic()
+        with self.lock:
+            session = self.sessions.get(device)
+            if session is None:
+                # TR: Bağlantı kopma sinyali kaçırıldıysa boşta kalanları temizle | EN: Drop idle sessions in case a disconnect signal was missed | RU: Удалить простаивающие сессии на случай пропущенного сигнала отключения
+                for stale in [k for k, v in self.sessions.items() if now - v.last_seen > self.idle_timeout]:
+                    del self.sessions[stale]
+                session = self.sessions[device] = BleSession(device)
+                logger.info(f"BLE session opened: {device or 'unknown'}")
+            session.last_seen = now
+            mtu = options.get('mtu') if options else None
+            if mtu:
+                session.mtu = int(mtu)
+            return session
+
+    def drop(self, device: str):
+        with self.lock:
+            if self.sessions.pop(device, None):
+                logger.info(f"BLE session closed: {device}")
+
+    def min_mtu(self) -> int:
+        """TR: Bildirimler herkese gider; en küçük MTU'ya göre parçala (bilinmiyorsa ATT varsayılanı 23) | EN: Notifications reach every client, so fragment for the smallest MTU (ATT default 23 when unknown) | RU: Уведомления получают все клиенты, поэтому фрагментировать по наименьшему MTU (по умолчанию ATT 23)"""
+        with self.lock:
+            mtus = [session.mtu for session in self.sessions.values() if session.mtu]
+        return min(mtus) if mtus else ATT_DEFAULT_MTU
+
+    def watch(self, bus):
+        """TR: Cihaz bağlantı kopmalarını dinle | EN: Listen for device disconnects | RU: Слушать отключения устройств"""
+        bus.add_signal_receiver(self._on_device_changed,
+                                signal_name='PropertiesChanged',
+                                dbus_interface=DBUS_PROP_IFACE,
+                                arg0=DEVICE_IFACE,
+                                path_keyword='path')
+
+    def _on_device_changed(self, interface, changed, invalidated, path=None):
+        if 'Connected' in changed and not changed['Connected']:
+            self.drop(str(path))
+
+# =======================
+#  STATUS PUBLISHER
+# =======================
+
+STATUS_COALESCE_MS = 100
+STATUS_PACKETS_PER_INTERVAL = 4
+# TR: BlueZ varsayılan en büyük bağlantı aralığı 50 ms (0x28 x 1.25 ms) | EN: BlueZ default max connection interval is 50 ms (0x28 x 1.25 ms) | RU: Максимальный интервал соединения BlueZ по умолчанию 50 мс (0x28 x 1,25 мс)
+STATUS_CONN_INTERVAL_MS = 50
+CONN_INTERVAL_PATH = '/sys/kernel/debug/bluetooth/hci0/conn_max_interval'
+
+def read_connection_interval() -> int:
+    """TR: Bağlantı aralığını (ms) debugfs'ten oku, yoksa varsayılan | EN: Read the connection interval (ms) from debugfs, else the default | RU: Прочитать интервал соединения (мс) из debugfs, иначе значение по умолчанию"""
+    try:
+        with open(CONN_INTERVAL_PATH) as f:
+            return max(8, int(int(f.read().strip(), 0) * 1.25))
+    except (OSError, ValueError):
+        return STATUS_CONN_INTERVAL_MS
+
+def status_key(message: str) -> Tuple[Optional[str], bool]:
+    """TR: (birleştirme anahtarı, son durum mu) | EN: (coalescing key, is terminal) | RU: (ключ объединения, конечное ли состояние)"""
+    if message.startswith('Job '):
+        head, _, state = message.partition(': ')
+        return ' '.join(head.split()[:2]), state in ('done', 'failed')
+    if message.startswith('Provisioning: '):
+        # TR: Adım ilerlemesi birleştirilir | EN: Step progress is coalesced | RU: Прогресс шагов объединяется
+        return 'Provisioning', False
+    if message.startswith(('Provisioning Complete', 'Provisioning Failed', 'Provisioning Cancelled')):
+        # TR: Complete/Failed/Cancelled son durumdur ve bekleyen adımı geçersiz kılar | EN: Complete/Failed/Cancelled are terminal and supersede the pending step | RU: Complete/Failed/Cancelled — конечные и отменяют ожидающий шаг
+        return 'Provisioning', True
+    # TR: Yanıtlar ve sonuçlar ("Authentication Success", "Serial: ...") asla düşürülmez | EN: Answers and results ("Authentication Success", "Serial: ...") are never dropped | RU: Ответы и результаты ("Authentication Success", "Serial: ...") никогда не отбрасываются
+    return None, True
+
+class StatusPublisher:
+    """TR: Durum bildirimlerini birleştirip bağlantı aralığına göre yayınla | EN: Coalesce status notifications and pace them to the connection interval | RU: Объединять статусные уведомления и отправлять их в темпе интервала соединения"""
+
+    def __init__(self, packetize, send, window_ms: int = STATUS_COALESCE_MS,
+                 packets_per_interval: int = STATUS_PACKETS_PER_INTERVAL):
+        self.packetize = packetize  # packetize(message_bytes) -> ATT packets; runs on the GLib loop
+        self.send = send  # send(packet) notifies one ATT packet; runs on the GLib loop
+        self.window_ms = window_ms
+        self.interval_ms = read_connection_interval()
+        self.packets_per_interval = packets_per_interval
+        self.terminal = collections.deque()
+        self.progress = collections.OrderedDict()  # key -> latest message bytes
+        self.fragments = collections.deque()  # Unsent packets of the message being sent; GLib loop only
+        self.lock = threading.Lock()
+        self.scheduled = False
+
+    def publish(self, message: str, message_bytes: bytes):
+        key, terminal = status_key(message)
+        with self.lock:
+            if terminal:
+                # TR: Son durum aynı işin bekleyen ilerlemesini geçersiz kılar | EN: A terminal state supersedes pending progress of the same job | RU: Конечное состояние отменяет ожидающий прогресс той же задачи
+                if key is not None and self.progress.pop(key, None) is not None:
+                    STATUS_COALESCED.inc()
+                self.terminal.append(message_bytes)
+            else:
+                if key in self.progress:
+                    STATUS_COALESCED.inc()
+                self.progress[key] = message_bytes
+            if self.scheduled:
+                return
+            self.scheduled = True
+        GLib.idle_add(self._schedule, self.window_ms)
+
+    def _schedule(self, delay_ms: int):
+        GLib.timeout_add(delay_ms, self._flush)
+        return False
+
+    def _flush(self):
+        budget = self.packets_per_interval
+        while budget > 0:
+            if not self.fragments:
+                with self.lock:
+                    if self.terminal:
+                        message_bytes = self.terminal.popleft()
+                    elif self.progress:
+                        _, message_bytes = self.progress.popitem(last=False)
+                    else:
+                        self.scheduled = False
+                        return False
+                STATUS_NOTIFICATIONS.inc()
+                self.fragments.extend(self.packetize(message_bytes))
+                continue
+            # TR: Bütçe parça başına harcanır; uzun mesaj sonraki aralıklarda kaldığı yerden sürer | EN: The budget is spent per fragment; a long message resumes where it left off on later intervals | RU: Бюджет расходуется на фрагмент; длинное сообщение продолжается с того же места в следующих интервалах
+            self.send(self.fragments.popleft())
+            budget -= 1
+        # TR: Kalanlar bir sonraki bağlantı aralığında | EN: The rest goes out on the next connection interval | RU: Остальное уйдет в следующем интервале соединения
+        with self.lock:
+            if not self.fragments and not self.terminal and not self.progress:
+                self.scheduled = False
+                return False
+        GLib.timeout_add(self.interval_ms, self._flush)
+        return False
 
 class InvalidArgsException(dbus.exceptions.DBusException):
     _dbus_error_name = 'org.freedesktop.DBus.Error.InvalidArgs'
@@ -204,17 +1412,17 @@ class Application(dbus.service.Object):
     @dbus.service.method(DBUS_OM_IFACE, out_signature='a{oa{sa{sv}}}')
     def GetManagedObjects(self):
         response = {}
-        logger.info(f"GetManagedObjects - {len(self.services)} services")
+        logger.info("GetManagedObjects - %d services", len(self.services))
         
         for service in self.services:
             service_path = service.get_path()
             response[service_path] = service.get_properties()
-            logger.info(f"Service: {service.uuid}")
+            logger.debug("Service: %s", service.uuid)
             
             for chrc in service.get_characteristics():
                 chrc_path = chrc.get_path()
                 response[chrc_path] = chrc.get_properties()
-                logger.info(f"Characteristic: {chrc.uuid}")
+                logger.debug("Characteristic: %s", chrc.uuid)
         
         return response
 
@@ -264,6 +1472,18 @@ class Characteristic(dbus.service.Object):
         self.value = []
         dbus.service.Object.__init__(self, bus, self.path)
 
+    def receive_bytes(self, value, options) -> Optional[bytes]:
+        """TR: Yazılan değeri istemcinin kendi oturumunda birleştir | EN: Reassemble a written value within the client's own session | RU: Собрать записанное значение в собственной сессии клиента"""
+        session = self.service.optix_system.sessions.get(options)
+        return session.reassembler(self.uuid).feed(bytes(value))
+
+    def receive(self, value, options) -> Optional[str]:
+        """TR: Yazılan değeri birleştir ve UTF-8 olarak çöz | EN: Reassemble a written value and decode it as UTF-8 | RU: Собрать записанное значение и декодировать как UTF-8"""
+        payload = self.receive_bytes(value, options)
+        if payload is None:
+            return None
+        return payload.decode('utf-8')
+
     def get_properties(self):
         return {
             GATT_CHRC_IFACE: {
@@ -279,13 +1499,17 @@ class Characteristic(dbus.service.Object):
 
     @dbus.service.method(GATT_CHRC_IFACE, in_signature='a{sv}', out_signature='ay')
     def ReadValue(self, options):
-        logger.info(f'Read: {self.uuid}')
-        return self.value
+        with tracer.span('gatt.read', uuid=self.uuid):
+            BLE_READS.inc()
+            logger.debug('Read: %s', self.uuid)
+            return self.value[int(options.get('offset', 0)):]
 
     @dbus.service.method(GATT_CHRC_IFACE, in_signature='aya{sv}')
     def WriteValue(self, value, options):
-        logger.info(f'Write: {self.uuid}')
-        self.value = value
+        with tracer.span('gatt.write', uuid=self.uuid):
+            BLE_WRITES.inc()
+            logger.debug('Write: %s', self.uuid)
+            self.value = value
 
     @dbus.service.method(GATT_CHRC_IFACE)
     def StartNotify(self):
@@ -295,6 +1519,11 @@ class Characteristic(dbus.service.Object):
     def StopNotify(self):
         logger.info(f'Notify stop: {self.uuid}')
 
+    @dbus.service.signal(DBUS_PROP_IFACE, signature='sa{sv}as')
+    def PropertiesChanged(self, interface, changed, invalidated):
+        # TR: BlueZ bu sinyali bildirim olarak iletir | EN: BlueZ forwards this signal as a GATT notification | RU: BlueZ передает этот сигнал как GATT-уведомление
+        pass
+
 class WiFiService(Service):
     def __init__(self, bus, index, optix_system):
         super().__init__(bus, index, WIFI_SERVICE_UUID, True, optix_system)
@@ -316,10 +1545,14 @@ class CredentialCharacteristic(Characteristic):
             service)
         logger.info(f"Credential: {CREDENTIAL_CHAR_UUID}")
 
+    @tracer.traced('gatt.write')
     def WriteValue(self, value, options):
+        BLE_WRITES.inc()
         logger.info('WiFi credentials received')
         try:
-            data_str = ''.join([chr(byte) for byte in value])
+            data_str = self.receive(value, options)
+            if data_str is None:
+                return
             credential_data = json.loads(data_str)
             
             ssid = credential_data.get('ssid', '')
@@ -327,13 +1560,9 @@ class CredentialCharacteristic(Characteristic):
             
             logger.info(f'SSID: {ssid}')
             
-            # Configure WiFi
+            # TR: WiFi'yi arka planda yapılandır, GLib döngüsünü bloklama | EN: Configure WiFi in the background, don't block the GLib loop | RU: Настроить WiFi в фоне, не блокируя цикл GLib
             if ssid and password:
-                success = self.service.optix_system.configure_wifi(ssid, password)
-                if success:
-                    logger.info("WiFi configured successfully")
-                else:
-                    logger.error("WiFi configuration failed")
+                self.service.optix_system.provisioning.submit(ssid, password)
                     
         except Exception as e:
             logger.error(f'Credential processing error: {e}')
@@ -350,16 +1579,22 @@ class StatusCharacteristic(Characteristic):
         logger.info(f"Status: {STATUS_CHAR_UUID}")
 
     def update_value(self):
-        self.value = [ord(c) for c in self.status_value]
+        self.value = list(self.status_value.encode('utf-8'))
 
+    @tracer.traced('gatt.read')
     def ReadValue(self, options):
+        BLE_READS.inc()
+        # TR: Bu istemciye yönelik bekleyen yanıt varsa önce o okunur | EN: A reply queued for this client is served first | RU: Сначала отдается ответ, поставленный в очередь для этого клиента
+        queued = self.service.optix_system.sessions.get(options).read(int(options.get('offset', 0)))
+        if queued is not None:
+            return list(queued)
         wifi_connected = SystemUtils.is_wifi_connected()
         status = "WiFi Connected" if wifi_connected else "WiFi Disconnected"
         self.status_value = status
         self.update_value()
         
-        logger.info(f'Status: {self.status_value}')
-        return self.value
+        logger.debug('Status: %s', self.status_value)
+        return self.value[int(options.get('offset', 0)):]
 
 class CommandCharacteristic(Characteristic):
     def __init__(self, bus, index, service):
@@ -368,100 +1603,134 @@ class CommandCharacteristic(Characteristic):
             COMMAND_CHAR_UUID,
             ['write', 'write-without-response'],
             service)
+        # TR: Opcode -> işleyici tablosu; metin ve ikili komutlar aynı tabloyu kullanır | EN: Opcode -> handler table shared by text and binary commands | RU: Таблица opcode -> обработчик, общая для текстовых и двоичных команд
+        self.handlers = {
+            OP_SCAN_WIFI: self.cmd_scan_wifi,
+            OP_GET_SERIAL: self.cmd_get_serial,
+            OP_AUTH: self.cmd_auth,
+            OP_REGISTER: self.cmd_register,
+            OP_METRICS: self.cmd_metrics,
+            OP_TRACE_DUMP: self.cmd_trace_dump,
+            OP_PROFILE: self.cmd_profile,
+            OP_LOGOUT: self.cmd_logout,
+        }
         logger.info(f"⚡ Command: {COMMAND_CHAR_UUID}")
 
+    @tracer.traced('gatt.write')
     def WriteValue(self, value, options):
+        BLE_WRITES.inc()
         logger.info('Command received')
+        optix_system = self.service.optix_system
         try:
-            data_str = ''.join([chr(byte) for byte in value])
-            logger.info(f'Command: {data_str}')
-            
-            # Process commands
-            if data_str == "scan_wifi":
-                networks = SystemUtils.get_wifi_networks()
-                logger.info(f"Found {len(networks)} networks")
-            elif data_str == "get_serial":
-                serial = SystemUtils.get_serial_number()
-                logger.info(f"Serial detected: {serial}")
-                # Send serial back to mobile app
-                self.service.optix_system.send_status(f"Serial: {serial}")
-            elif data_str.startswith("auth:"):
-                # Handle authentication request
-                self.service.optix_system.handle_authentication(data_str)
-            elif data_str.startswith("register:"):
-                # Handle device registration
-                self.service.optix_system.handle_registration(data_str)
-                
+            payload = self.receive_bytes(value, options)
+            if payload is None:
+                return
+            request = read_command(payload)
+            request.session = optix_system.sessions.get(options)
+            logger.info("Command: opcode=0x%02x id=%s device=%s",
+                        request.opcode, request.request_id, request.session.device)
+            handler = self.handlers.get(request.opcode)
+            if handler is None:
+                raise ValueError(f"Unknown opcode 0x{request.opcode:02x}")
+
+            # TR: Yanıtlar (iş thread'lerinden gelenler dahil) isteğin kimliğini taşır | EN: Replies, including those from job threads, carry the request ID | RU: Ответы, включая ответы из потоков задач, несут ID запроса
+            optix_system.request_local.request = request
+            try:
+                if not request.session.begin(request):
+                    optix_system.send_status("Duplicate Request")
+                    return
+                # TR: İşleyici de bir tutucudur; erken biten iş isteği işleyici dönmeden bitiremez | EN: The handler is a holder too, so a job that ends early can't finish the request before the handler returns | RU: Обработчик тоже держатель, поэтому рано завершившаяся задача не завершит запрос до возврата обработчика
+                request.hold()
+                try:
+                    handler(optix_system, request.fields)
+                finally:
+                    request.release()
+            finally:
+                optix_system.request_local.request = None
+
         except Exception as e:
             logger.error(f'Command processing error: {e}')
 
+    # TR: Bloklayan işler iş havuzuna gider; yazma hemen döner | EN: Blocking work goes to the job pool; the write returns immediately | RU: Блокирующая работа уходит в пул задач; запись возвращается сразу
+
+    def cmd_scan_wifi(self, optix_system, fields: dict):
+        # TR: Önbellek tazeyse anında yanıtla | EN: Answer instantly from a fresh cache | RU: Ответить сразу из свежего кэша
+        if optix_system.wifi_scanner.get() is not None:
+            optix_system.scan_wifi()
+        else:
+            optix_system.jobs.submit('scan', optix_system.scan_wifi)
+
+    def cmd_get_serial(self, optix_system, fields: dict):
+        serial = optix_system.serial_number
+        logger.info(f"Serial detected: {serial}")
+        # Send serial back to mobile app
+        optix_system.send_status(f"Serial: {serial}")
+
+    def cmd_auth(self, optix_system, fields: dict):
+        # TR: Önbellekte varsa ağ beklemeden yanıtla | EN: Answer without waiting on the network when cached | RU: При наличии в кэше ответить без ожидания сети
+        if optix_system.authenticate_cached(fields):
+            return
+        optix_system.jobs.submit('auth', optix_system.handle_authentication, fields)
+
+    def cmd_register(self, optix_system, fields: dict):
+        optix_system.jobs.submit('register', optix_system.handle_registration, fields)
+
+    def cmd_metrics(self, optix_system, fields: dict):
+        optix_system.send_status(metrics_summary())
+
+    def cmd_trace_dump(self, optix_system, fields: dict):
+        optix_system.jobs.submit('trace', optix_system.dump_trace)
+
+    def cmd_profile(self, optix_system, fields: dict):
+        optix_system.start_profiler(float(fields.get('seconds') or PROFILE_DEFAULT_SEC))
+
+    def cmd_logout(self, optix_system, fields: dict):
+        # TR: Kullanıcı adı yoksa tüm önbellek silinir | EN: Without a username the whole cache is dropped | RU: Без имени пользователя удаляется весь кэш
+        dropped = optix_system.auth_cache.invalidate(fields.get('username') or None)
+        logger.info(f"Auth cache invalidated: {dropped} entries")
+        optix_system.send_status("Logout Complete")
+
 # =======================
 #  WIFI FILE WATCHER
 # =======================
 
-WIFI_CREDENTIALS_FILE = '/tmp/wifi_credentials.json'
+WATCH_DEBOUNCE_SEC = 0.05
 
 class WiFiCredentialsHandler(FileSystemEventHandler):
-    """TR: WiFi credentials dosya değişikliklerini izle | EN: Monitor WiFi credentials file changes | RU: Мониторинг изменений файла учетных данных WiFi"""
+    """TR: WiFi credentials dosyasının yazılıp kapatılmasını / atomik taşınmasını izle | EN: Watch the WiFi credentials file for close-after-write / atomic rename | RU: Следить за закрытием после записи / атомарным переименованием файла учетных данных WiFi"""
     
     def __init__(self, optix_system):
         self.optix_system = optix_system
-        self.last_hash = self._get_file_hash()
+        self.digest = CredentialsDigest(WIFI_CREDENTIALS_DIGEST)
+        self.timer = None
+        self.lock = threading.Lock()
         logger.info(f"📁 Watching {WIFI_CREDENTIALS_FILE}")
     
-    def _get_file_hash(self):
-        """TR: Dosya hash'ini al (değişiklik tespiti için) | EN: Get file hash (for change detection) | RU: Получить хэш файла (для обнаружения изменений)"""
-        try:
-            if os.path.exists(WIFI_CREDENTIALS_FILE):
-                with open(WIFI_CREDENTIALS_FILE, 'r') as f:
-                    content = f.read()
-                    return hash(content)
-        except Exception as e:
-            logger.debug(f"Error getting file hash: {e}")
-        return None
-    
-    def _read_credentials(self):
-        """TR: WiFi credentials dosyasını oku | EN: Read WiFi credentials from file | RU: Прочитать учетные данные WiFi из файла"""
-        try:
-            if not os.path.exists(WIFI_CREDENTIALS_FILE):
-                return None
-            
-            with open(WIFI_CREDENTIALS_FILE, 'r') as f:
-                data = json.load(f)
-                return {
-                    'ssid': data.get('ssid', ''),
-                    'password': data.get('password', ''),
-                    'timestamp': data.get('timestamp', '')
-                }
-        except Exception as e:
-            logger.error(f"Error reading credentials: {e}")
-            return None
-    
-    def on_modified(self, event):
-        """TR: Dosya değişikliği işle | EN: Handle file modification | RU: Обработать изменение файла"""
+    def on_closed(self, event):
+        """TR: IN_CLOSE_WRITE: yazan dosyayı kapattı | EN: IN_CLOSE_WRITE: the writer closed the file | RU: IN_CLOSE_WRITE: писатель закрыл файл"""
         if event.src_path == WIFI_CREDENTIALS_FILE:
-            logger.info("WiFi credentials file modified")
-            self._process_credentials()
+            self._schedule()
     
-    def on_created(self, event):
-        """TR: Dosya oluşturma işle | EN: Handle file creation | RU: Обработать создание файла"""
-        if event.src_path == WIFI_CREDENTIALS_FILE:
-            logger.info("WiFi credentials file created")
-            self._process_credentials()
+    def on_moved(self, event):
+        """TR: IN_MOVED_TO: geçici dosya hedefe taşındı (atomik yazma) | EN: IN_MOVED_TO: a temp file was renamed onto the target (atomic write) | RU: IN_MOVED_TO: временный файл переименован в целевой (атомарная запись)"""
+        if event.dest_path == WIFI_CREDENTIALS_FILE:
+            self._schedule()
+
+    def _schedule(self):
+        # TR: Art arda gelen olayları tek işleme indir | EN: Collapse bursts of events into one run | RU: Сводить серию событий к одному запуску
+        with self.lock:
+            if self.timer:
+                self.timer.cancel()
+            self.timer = threading.Timer(WATCH_DEBOUNCE_SEC, self._process_credentials)
+            self.timer.daemon = True
+            self.timer.start()
     
     def _process_credentials(self):
         """TR: WiFi credentials dosyasını işle | EN: Process WiFi credentials from file | RU: Обработать учетные данные WiFi из файла"""
-        # TR: Dosyanın tamamen yazılması için bekle | EN: Wait for file to be fully written | RU: Ждать полной записи файла
-        time.sleep(0.5)
-        
-        current_hash = self._get_file_hash()
-        if current_hash == self.last_hash:
-            logger.debug("File hash unchanged, skipping")
+        digest, credentials = read_credentials_file(WIFI_CREDENTIALS_FILE)
+        if digest is None or digest == self.digest.value:
+            logger.debug("Credentials digest unchanged, skipping")
             return
-        
-        self.last_hash = current_hash
-        
-        credentials = self._read_credentials()
         if not credentials:
             logger.warning("No credentials found in file")
             return
@@ -471,16 +1740,23 @@ class WiFiCredentialsHandler(FileSystemEventHandler):
         
         if not ssid or not password:
             logger.warning("Invalid credentials (missing SSID or password)")
+            self.digest.save(digest)
             return
         
+        # TR: Yeni dosya açık bir istektir; bağlı olsa bile uygulanır (aynı deneme sürüyorsa boru hattı yok sayar) | EN: A new file is an explicit request; apply it even when connected (the pipeline ignores a duplicate in flight) | RU: Новый файл — явный запрос; применять даже при подключении (конвейер игнорирует дубликат в процессе)
         logger.info(f"Processing WiFi credentials for: {ssid}")
-        # TR: Zaten WiFi bağlıysa tekrar deneme | EN: If already connected, skip reconnect | RU: Если уже подключено к WiFi, не переподключаться
-        if SystemUtils.is_wifi_connected():
-            logger.info("WiFi already connected, skipping reconfigure")
-            return
-
-        # TR: Mevcut configure_wifi metodunu kullan | EN: Use existing configure_wifi method | RU: Использовать существующий метод configure_wifi
-        self.optix_system.configure_wifi(ssid, password)
+        # TR: Özet yalnızca başarıda kaydedilir; başarısızlıkta silinir ki aynı bilgiler yeniden gönderilebilsin | EN: The digest is saved only on success and cleared on failure, so the same credentials can be sent again | RU: Хэш сохраняется только при успехе и сбрасывается при неудаче, чтобы те же данные можно было отправить снова
+        if self.optix_system.configure_wifi(ssid, password):
+            self.digest.save(digest)
+        else:
+            self.digest.clear()
+
+# TR: 0xFFFF test/atanmamış şirket kimliğidir | EN: 0xFFFF is the test/unassigned company ID | RU: 0xFFFF — тестовый/неназначенный ID компании
+ADV_COMPANY_ID = 0xFFFF
+ADV_HASH_BYTES = 4  # Truncated device_hash; keeps the legacy 31-byte payload within budget
+ADV_STATE_WIFI = 0x01
+ADV_STATE_STREAMING = 0x02
+ADV_STATE_PROVISIONED = 0x04
 
 class Advertisement(dbus.service.Object):
     PATH_BASE = '/org/bluez/optix/advertisement'
@@ -501,9 +1777,28 @@ class Advertisement(dbus.service.Object):
                 'ServiceUUIDs': dbus.Array(self.service_uuids, signature='s'),
                 'LocalName': dbus.String(self.local_name),
                 'IncludeTxPower': dbus.Boolean(False),
+                'ManufacturerData': self.manufacturer_data(),
             }
         }
 
+    def manufacturer_data(self):
+        """TR: [durum baytı, device_hash'in ilk 4 baytı] | EN: [state byte, first 4 bytes of device_hash] | RU: [байт состояния, первые 4 байта device_hash]"""
+        payload = bytes((self.optix_system.adv_state,)) + \
+            bytes.fromhex(self.optix_system.device_hash[:ADV_HASH_BYTES * 2])
+        return dbus.Dictionary({dbus.UInt16(ADV_COMPANY_ID): dbus.Array(payload, signature='y')},
+                               signature='qv')
+
+    def refresh(self):
+        """TR: BlueZ'e yeni üretici verisini bildir | EN: Tell BlueZ about new manufacturer data | RU: Сообщить BlueZ о новых данных производителя"""
+        self.PropertiesChanged(LE_ADVERTISEMENT_IFACE,
+                               {'ManufacturerData': self.manufacturer_data()}, [])
+        # TR: idle_add geri çağrısı olarak tekrar çalışmasın | EN: Don't repeat when used as an idle_add callback | RU: Не повторять при вызове через idle_add
+        return False
+
+    @dbus.service.signal(DBUS_PROP_IFACE, signature='sa{sv}as')
+    def PropertiesChanged(self, interface, changed, invalidated):
+        pass
+
     def get_path(self):
         return dbus.ObjectPath(self.path)
 
@@ -517,14 +1812,193 @@ class Advertisement(dbus.service.Object):
     def Release(self):
         logger.info('Advertisement released')
 
+class AdvertisingMonitor:
+    """TR: Adaptör ve reklam durumunu D-Bus özelliklerinden izle | EN: Track adapter and advertising state from D-Bus properties | RU: Отслеживать состояние адаптера и рекламы по свойствам D-Bus"""
+
+    def __init__(self, optix_system, bus, adapter_path: str):
+        self.optix_system = optix_system
+        self.props = dbus.Interface(bus.get_object(BLUEZ_SERVICE_NAME, adapter_path), DBUS_PROP_IFACE)
+        self.discoverable = None
+        self.pairable = None
+        self.active_instances = None
+        bus.add_signal_receiver(self._on_properties_changed,
+                                signal_name='PropertiesChanged',
+                                dbus_interface=DBUS_PROP_IFACE,
+                                path=adapter_path)
+
+    def refresh(self):
+        """TR: Özellikleri BlueZ'den oku (alt süreç yok) | EN: Read properties from BlueZ (no subprocess) | RU: Прочитать свойства из BlueZ (без подпроцессов)"""
+        adapter = self.props.GetAll(ADAPTER_IFACE)
+        self.discoverable = bool(adapter.get('Discoverable', False))
+        self.pairable = bool(adapter.get('Pairable', False))
+        try:
+            manager = self.props.GetAll(LE_ADVERTISING_MANAGER_IFACE)
+            self.active_instances = int(manager.get('ActiveInstances', 0))
+        except dbus.exceptions.DBusException as e:
+            logger.debug(f"LEAdvertisingManager1 properties unavailable: {e}")
+
+    def configure(self, alias: str = 'OPTIX'):
+        """TR: Ad, keşfedilebilirlik ve eşleşebilirliği ayarla | EN: Set alias, discoverability and pairability | RU: Установить имя, обнаруживаемость и возможность сопряжения"""
+        # TR: DiscoverableTimeout=0: BlueZ varsayılanı 180 s sonra keşfedilebilirliği kapatır | EN: DiscoverableTimeout=0: BlueZ's default turns discoverability off after 180 s | RU: DiscoverableTimeout=0: по умолчанию BlueZ выключает обнаруживаемость через 180 с
+        self._set('Alias', dbus.String(alias))
+        self._set('DiscoverableTimeout', dbus.UInt32(0))
+        self._set('Discoverable', dbus.Boolean(True))
+        self._set('Pairable', dbus.Boolean(True))
+
+    def _set(self, name: str, value):
+        self.props.Set(ADAPTER_IFACE, name, value,
+                       reply_handler=lambda: logger.debug("Adapter %s set", name),
+                       error_handler=lambda e: logger.warning(f"Adapter {name} set failed: {e}"))
+
+    def _on_properties_changed(self, interface, changed, invalidated):
+        if interface == ADAPTER_IFACE:
+            if 'Pairable' in changed:
+                self.pairable = bool(changed['Pairable'])
+            if 'Discoverable' in changed:
+                self.discoverable = bool(changed['Discoverable'])
+                if not self.discoverable:
+                    logger.warning('Adapter no longer discoverable - re-enabling')
+                    self._set('Discoverable', dbus.Boolean(True))
+        elif interface == LE_ADVERTISING_MANAGER_IFACE and 'ActiveInstances' in changed:
+            self.active_instances = int(changed['ActiveInstances'])
+            logger.debug("Active advertising instances: %d", self.active_instances)
+            if self.active_instances == 0:
+                self.optix_system.restart_advertising()
+
 # =======================
 #  CAMERA SYSTEM
 # =======================
 
+# TR: Kalite 100, 4608x2592 JPEG birkaç MB; 8 MB slot en büyük profili karşılar | EN: A quality-100 4608x2592 JPEG is a few MB; 8 MB slots cover the largest profile | RU: JPEG 4608x2592 с качеством 100 весит несколько МБ; слота 8 МБ хватает для самого большого профиля
+FRAME_SLOT_BYTES = 8 * 1024 * 1024
+FRAME_POOL_BUDGET_BYTES = 2 * FRAME_SLOT_BYTES
+FRAME_ACQUIRE_TIMEOUT_SEC = 5.0
+STAGE_RSS_SAMPLE_SEC = 0.01  # A capture reads a few MB from disk in tens of milliseconds
+
+FRAME_POOL_IN_USE = metrics.gauge('optix_frame_pool_in_use_bytes', 'Frame pool bytes currently borrowed')
+FRAME_POOL_PEAK = metrics.gauge('optix_frame_pool_peak_bytes', 'Highest frame pool bytes borrowed at once')
+FRAME_POOL_WAITS = metrics.counter('optix_frame_pool_exhausted_total', 'Acquires that timed out on an exhausted pool')
+PROCESS_PEAK_RSS = metrics.gauge('optix_process_peak_rss_bytes', 'Process peak RSS',
+                                 callback=lambda: resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024)
+
+class FrameBuffer:
+    """TR: Havuzdan ödünç alınan yeniden kullanılabilir kare tamponu | EN: Reusable frame buffer borrowed from the pool | RU: Повторно используемый буфер кадра, взятый из пула"""
+
+    def __init__(self, pool, capacity: int):
+        self.pool = pool
+        self.data = bytearray(capacity)
+        self.length = 0
+
+    def view(self) -> memoryview:
+        """TR: Geçerli baytlara kopyasız görünüm | EN: Zero-copy view of the valid bytes | RU: Представление действительных байтов без копирования"""
+        return memoryview(self.data)[:self.length]
+
+    def __len__(self):
+        return self.length
+
+    def release(self):
+        self.pool.release(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+
+class FramePool:
+    """TR: Sabit bellek bütçeli kare tampon havuzu | EN: Frame buffer pool with a fixed memory budget | RU: Пул буферов кадров с фиксированным бюджетом памяти"""
+
+    def __init__(self, budget_bytes: int = FRAME_POOL_BUDGET_BYTES, slot_bytes: int = FRAME_SLOT_BYTES):
+        self.slot_bytes = slot_bytes
+        self.max_slots = max(1, budget_bytes // slot_bytes)
+        self.free = []
+        self.allocated = 0
+        self.in_use = 0
+        self.cond = threading.Condition()
+        logger.info("Frame pool: %d x %d MB slots", self.max_slots, slot_bytes // (1024 * 1024))
+
+    def acquire(self, timeout: float = FRAME_ACQUIRE_TIMEOUT_SEC) -> Optional[FrameBuffer]:
+        """TR: Tampon al; havuz doluysa bekle (geri basınç) | EN: Borrow a buffer, waiting while the pool is exhausted (backpressure) | RU: Взять буфер, ожидая при исчерпании пула (обратное давление)"""
+        with self.cond:
+            if not self.cond.wait_for(lambda: self.free or self.allocated < self.max_slots, timeout):
+                FRAME_POOL_WAITS.inc()
+                return None
+            if self.free:
+                buf = self.free.pop()
+            else:
+                # TR: Slotlar ilk ihtiyaçta ayrılır | EN: Slots are allocated on first use | RU: Слоты выделяются при первом использовании
+                buf = FrameBuffer(self, self.slot_bytes)
+                self.allocated += 1
+            buf.length = 0
+            self.in_use += 1
+            in_use_bytes = self.in_use * self.slot_bytes
+            FRAME_POOL_IN_USE.set(in_use_bytes)
+            if in_use_bytes > FRAME_POOL_PEAK.value:
+                FRAME_POOL_PEAK.set(in_use_bytes)
+            return buf
+
+    def release(self, buf: FrameBuffer):
+        with self.cond:
+            self.free.append(buf)
+            self.in_use -= 1
+            FRAME_POOL_IN_USE.set(self.in_use * self.slot_bytes)
+            self.cond.notify()
+
+class StageMemory:
+    """TR: Aşama başına anlık ve tepe RSS muhasebesi | EN: Per-stage current and peak RSS accounting | RU: Учет текущего и пикового RSS по этапам"""
+
+    PAGE_SIZE = os.sysconf('SC_PAGE_SIZE')
+
+    def __init__(self, interval: float = STAGE_RSS_SAMPLE_SEC):
+        self.interval = interval
+        self.stages = {}
+
+    @classmethod
+    def current_rss(cls) -> int:
+        try:
+            with open('/proc/self/statm', 'r') as f:
+                return int(f.read().split()[1]) * cls.PAGE_SIZE
+        except OSError:
+            return 0
+
+    @contextlib.contextmanager
+    def stage(self, name: str):
+        """TR: Aşama sürerken RSS'i aralıklarla örnekle; tepe en yüksek örnektir | EN: Sample RSS periodically while the stage runs; the peak is the highest sample | RU: Периодически замерять RSS во время этапа; пик — наибольший замер"""
+        gauges = self.stages.get(name)
+        if gauges is None:
+            gauges = (metrics.gauge('optix_stage_rss_bytes', 'RSS at the end of a pipeline stage', {'stage': name}),
+                      metrics.gauge('optix_stage_peak_rss_bytes', 'Peak RSS sampled during a pipeline stage', {'stage': name}))
+            self.stages[name] = gauges
+        current, peak = gauges
+        highest = [self.current_rss()]
+        done = threading.Event()
+
+        def sample():
+            while not done.wait(self.interval):
+                highest[0] = max(highest[0], self.current_rss())
+
+        sampler = threading.Thread(target=sample, name=f'optix-rss-{name}', daemon=True)
+        sampler.start()
+        try:
+            yield
+        finally:
+            done.set()
+            sampler.join()
+            after = self.current_rss()
+            current.set(after)
+            peak.set(max(peak.value, highest[0], after))
+
+    def report(self) -> dict:
+        return {name: {'rss': current.value, 'peak': peak.value}
+                for name, (current, peak) in self.stages.items()}
+
+stage_memory = StageMemory()
+
 class CameraSystem:
     def __init__(self):
         self.camera_tool = self.find_camera_tool()
         self.probe_tool = self.find_probe_tool()
+        self.frame_pool = FramePool()
         
     def find_camera_tool(self) -> Optional[str]:
         """TR: Kullanılabilir kamera aracını bul | EN: Find available camera tool | RU: Найди доступный инструмент камеры"""
@@ -539,6 +2013,7 @@ class CameraSystem:
         """TR: Metadata için probe aracını bul | EN: Find probe tool for metadata | RU: Найди probe-инструмент для метаданных"""
         return SystemUtils.which('rpicam-hello')
     
+    @tracer.traced('camera.probe')
     def probe_environment(self) -> Tuple[float, float, float]:
         """TR: Kamera ortamını yokla | EN: Probe camera environment | RU: Опросить параметры среды камеры"""
         if not self.probe_tool:
@@ -573,12 +2048,20 @@ class CameraSystem:
             return PROFILE_MOTION
         return PROFILE_QUALITY
     
-    def capture_image(self, profile: Profile) -> Optional[bytes]:
-        """TR: Verilen profille görüntü yakala | EN: Capture image with given profile | RU: Захвати изображение с заданным профилем"""
+    @tracer.traced('camera.capture')
+    def capture_image(self, profile: Profile) -> Optional[FrameBuffer]:
+        """TR: Verilen profille görüntüyü havuz tamponuna yakala | EN: Capture image with given profile into a pooled buffer | RU: Захвати изображение с заданным профилем в буфер из пула"""
         if not self.camera_tool:
             logger.debug("No camera available - skipping capture")
             return None
-            
+
+        # TR: Kamerayı çalıştırmadan önce tampon al; havuz doluysa çekim yapma | EN: Borrow the buffer before running the camera; don't capture if the pool is exhausted | RU: Взять буфер до запуска камеры; не снимать, если пул исчерпан
+        frame = self.frame_pool.acquire()
+        if frame is None:
+            logger.warning("Frame pool exhausted - skipping capture", extra=rate_limited('camera.pool_exhausted'))
+            return None
+
+        tmp_path = None
         try:
             with tempfile.NamedTemporaryFile(suffix='.jpg', delete=False) as tmp:
                 tmp_path = tmp.name
@@ -588,19 +2071,27 @@ class CameraSystem:
             result = subprocess.run(cmd, capture_output=True, timeout=15)
             
             if result.returncode == 0 and os.path.exists(tmp_path):
+                size = os.path.getsize(tmp_path)
+                if size > len(frame.data):
+                    logger.error(f"Capture too large for frame slot: {size} > {len(frame.data)} bytes")
+                    frame.release()
+                    return None
+                # TR: Dosyayı doğrudan havuz tamponuna oku, ara bytes kopyası yok | EN: Read straight into the pooled buffer, no intermediate bytes copy | RU: Читать прямо в буфер пула без промежуточной копии bytes
                 with open(tmp_path, 'rb') as f:
-                    data = f.read()
-                os.unlink(tmp_path)
-                return data
+                    frame.length = f.readinto(frame.data)
+                return frame
             else:
                 logger.error(f"Capture failed: {result.stderr.decode() if result.stderr else 'Unknown error'}")
-                if os.path.exists(tmp_path):
-                    os.unlink(tmp_path)
+                frame.release()
                 return None
                 
         except Exception as e:
             logger.error(f"Capture error: {e}")
+            frame.release()
             return None
+        finally:
+            if tmp_path and os.path.exists(tmp_path):
+                os.unlink(tmp_path)
     
     def build_capture_cmd(self, tmp_path: str, profile: Profile) -> list[str]:
         """TR: Kamera çekim komutunu oluştur | EN: Build camera capture command | RU: Сформировать команду съемки"""
@@ -635,6 +2126,255 @@ class CameraSystem:
             '-t', '1000', '-n', '-o', tmp_path
         ]
 
+# =======================
+#  BACKGROUND JOBS
+# =======================
+
+JOB_WORKERS = 2
+
+class JobDispatcher:
+    """TR: GATT işleyicilerinden gelen bloklayan işleri çalıştıran havuz | EN: Worker pool that runs blocking work handed off by GATT handlers | RU: Пул потоков для блокирующей работы из обработчиков GATT"""
+
+    def __init__(self, optix_system, workers: int = JOB_WORKERS):
+        self.optix_system = optix_system
+        self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=workers,
+                                                              thread_name_prefix='optix-job')
+        self.ids = itertools.count(1)
+        self.current = threading.local()
+
+    def submit(self, kind: str, func, *args, silent: bool = False) -> int:
+        """TR: İşi kuyruğa al ve kimliğini döndür; sessiz işler Status'a yazmaz ve isteğe bağlanmaz | EN: Queue a job and return its ID; silent jobs stay off the status characteristic and aren't tied to the request | RU: Поставить задачу в очередь и вернуть ее ID; тихие задачи не пишут в Status и не привязаны к запросу"""
+        job_id = next(self.ids)
+        self._status(job_id, kind, 'queued', silent)
+        request = None if silent else getattr(self.optix_system.request_local, 'request', None)
+        if request is not None:
+            request.hold()
+        self.executor.submit(self._run, job_id, kind, func, args, request, silent)
+        return job_id
+
+    def _status(self, job_id: int, kind: str, state: str, silent: bool):
+        if silent:
+            logger.debug(f"Job {job_id} {kind}: {state}")
+        else:
+            self.optix_system.send_status(f"Job {job_id} {kind}: {state}")
+
+    def progress(self, message: str):
+        """TR: Çalışan işin ilerlemesini bildir | EN: Report progress of the running job | RU: Сообщить о ходе выполнения текущей задачи"""
+        job = getattr(self.current, 'job', None)
+        if job:
+            self._status(job[0], job[1], message, job[2])
+
+    def _run(self, job_id: int, kind: str, func, args, request=None, silent: bool = False):
+        self.current.job = (job_id, kind, silent)
+        self.optix_system.request_local.request = request
+        self._status(job_id, kind, 'running', silent)
+        try:
+            result = func(*args)
+            self._status(job_id, kind, 'failed' if result is False else 'done', silent)
+        except Exception as e:
+            logger.error(f"Job {job_id} {kind} error: {e}")
+            self._status(job_id, kind, 'failed', silent)
+        finally:
+            self.current.job = None
+            self.optix_system.request_local.request = None
+            if request is not None:
+                request.release()
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+# =======================
+#  PROVISIONING PIPELINE
+# =======================
+
+PROVISION_CONNECTIVITY_TIMEOUT_SEC = 3.0
+PROVISION_STEP_POLL_SEC = 0.5
+
+class ProvisioningCancelled(Exception):
+    """TR: Daha yeni kimlik bilgileri geldiği için deneme iptal edildi | EN: Attempt cancelled because newer credentials arrived | RU: Попытка отменена, так как пришли новые учетные данные"""
+
+class ProvisioningAttempt:
+    """TR: Tek bir kimlik bilgisi denemesinin durumu ve adım süreleri | EN: State and per-step timings of one credentials attempt | RU: Состояние и время шагов одной попытки с учетными данными"""
+
+    def __init__(self, ssid: str, password: str, silent: bool = False):
+        self.ssid = ssid
+        self.password = password
+        self.silent = silent  # Started by the daemon (roaming), not by a client: progress stays off Status
+        self.state = 'pending'
+        self.timings = {}
+        self.cancelled = threading.Event()
+        self.started = time.monotonic()
+        self.result = None  # True/False once the attempt ran; stays None if it was superseded
+
+    def same_credentials(self, ssid: str, password: str) -> bool:
+        return self.ssid == ssid and self.password == password
+
+    def summary(self) -> str:
+        steps = ' '.join(f"{step}={seconds:.1f}s" for step, seconds in self.timings.items())
+        return f"{steps} total={time.monotonic() - self.started:.1f}s"
+
+class ProvisioningPipeline:
+    """TR: Kimlik bilgilerinden yayına kadar açık durum makinesi | EN: Explicit state machine from credentials to streaming | RU: Явный конечный автомат от учетных данных до трансляции"""
+
+    def __init__(self, optix_system):
+        self.optix_system = optix_system
+        self.current = None  # Attempt in flight, if any
+        self.lock = threading.Lock()  # Guards self.current, self.pending and self.draining
+        self.pending = None  # Latest attempt waiting for the drainer; older ones are replaced
+        self.draining = False  # One drainer touches the network at a time
+
+    def _enqueue(self, attempt: ProvisioningAttempt) -> Optional[bool]:
+        """TR: Denemeyi sıraya koy: True ise çağıran boşaltır, False ise mevcut boşaltıcıya katıldı, None ise yinelenen | EN: Queue an attempt: True if the caller must drain, False if merged into the running drainer, None if a duplicate | RU: Поставить попытку в очередь: True — вызывающий обрабатывает, False — объединена с текущим обработчиком, None — дубликат"""
+        with self.lock:
+            for other in (self.pending, self.current):
+                if other and not other.cancelled.is_set() and other.same_credentials(attempt.ssid, attempt.password):
+                    logger.info(f"Provisioning for {attempt.ssid} already queued; duplicate ignored")
+                    return None
+            current = self.current
+            if current and not current.cancelled.is_set():
+                # TR: Eski denemeyi iptal et; bir sonraki adım sınırında durur | EN: Cancel the stale attempt; it stops at the next step boundary | RU: Отменить устаревшую попытку; она остановится на границе следующего шага
+                logger.info(f"Cancelling provisioning for {current.ssid} in favour of {attempt.ssid}")
+                current.cancelled.set()
+            if self.pending:
+                logger.info(f"Provisioning for {self.pending.ssid} superseded by {attempt.ssid} before it started")
+            self.pending = attempt
+            if self.draining:
+                return False
+            self.draining = True
+            return True
+
+    @tracer.traced('wifi.provision')
+    def _drain(self) -> Optional[bool]:
+        """TR: Bekleyen en son denemeyi kalmayana kadar çalıştır | EN: Run the latest pending attempt until none is left | RU: Выполнять последнюю ожидающую попытку, пока они не закончатся"""
+        result = None
+        while True:
+            with self.lock:
+                attempt = self.pending
+                self.pending = None
+                if attempt is None:
+                    self.draining = False
+                    return result
+                self.current = attempt
+            try:
+                result = attempt.result = self._run(attempt)
+            finally:
+                with self.lock:
+                    if self.current is attempt:
+                        self.current = None
+
+    def submit(self, ssid: str, password: str, kind: str = 'wifi', silent: bool = False) -> Optional[int]:
+        """TR: Denemeyi gönderim anında birleştir; iş yalnızca boşaltıcı yoksa kuyruğa girer. Sessiz denemeler Status'a yazmaz | EN: Coalesce at submit time; a job is queued only when no drainer is active. Silent attempts stay off Status | RU: Объединять при отправке; задача ставится в очередь, только если нет активного обработчика. Тихие попытки не пишут в Status"""
+        claimed = self._enqueue(ProvisioningAttempt(ssid, password, silent))
+        if not claimed:
+            return None
+        return self.optix_system.jobs.submit(kind, self._drain, silent=silent)
+
+    def run(self, ssid: str, password: str) -> Optional[bool]:
+        """TR: Denemeyi bu thread'de çalıştır ve kendi sonucunu döndür; yinelenen, geçersiz kılınan ya da çalışan boşaltıcıya katıldıysa None | EN: Run an attempt on this thread and return its own result; None if it was a duplicate, superseded or merged into a running drainer | RU: Выполнить попытку в этом потоке и вернуть ее собственный результат; None, если дубликат, вытеснена или объединена с текущим обработчиком"""
+        attempt = ProvisioningAttempt(ssid, password)
+        if self._enqueue(attempt):
+            self._drain()
+        return attempt.result
+
+    @contextlib.contextmanager
+    def step(self, attempt: ProvisioningAttempt, name: str):
+        """TR: Adıma geç, ilerlemeyi yayınla ve süreyi kaydet | EN: Enter a step, publish progress and record its duration | RU: Перейти к шагу, опубликовать прогресс и записать длительность"""
+        if attempt.cancelled.is_set():
+            raise ProvisioningCancelled()
+        attempt.state = name
+        self._status(attempt, f"Provisioning: {name}")
+        started = time.monotonic()
+        yield
+        elapsed = time.monotonic() - started
+        attempt.timings[name] = elapsed
+        metrics.histogram('optix_provision_step_seconds', 'Duration of each provisioning step',
+                          {'step': name}).observe(elapsed)
+        if attempt.cancelled.is_set():
+            raise ProvisioningCancelled()
+
+    def _run(self, attempt: ProvisioningAttempt) -> bool:
+        try:
+            with self.step(attempt, 'parse'):
+                psk = wpa_psk(attempt.ssid, attempt.password)
+            if WpaCtrl.available():
+                self._connect_wpa(attempt, psk)
+            else:
+                self._connect_legacy(attempt, psk)
+            WIFI_PROVISION_SECONDS.observe(time.monotonic() - attempt.started)
+            self.optix_system.credential_store.remember(attempt.ssid, psk)
+            with self.step(attempt, 'connectivity'):
+                reachable = self._check_connectivity()
+            with self.step(attempt, 'stream'):
+                self.optix_system.start_camera_streaming()
+        except ProvisioningCancelled:
+            logger.info(f"Provisioning for {attempt.ssid} cancelled during {attempt.state}")
+            self._status(attempt, "Provisioning Cancelled")
+            return False
+        except Exception as e:
+            WIFI_PROVISION_FAILURES.inc()
+            logger.error(f"WiFi provisioning for {attempt.ssid} failed at {attempt.state}: {e}")
+            self._status(attempt, f"Provisioning Failed: {attempt.state}")
+            return False
+        summary = attempt.summary() + ('' if reachable else ' server=unreachable')
+        logger.info(f"WiFi provisioned for {attempt.ssid}: {summary}")
+        self._status(attempt, f"Provisioning Complete: {summary}")
+        return True
+
+    def _status(self, attempt: ProvisioningAttempt, message: str):
+        if attempt.silent:
+            logger.debug(message)
+        else:
+            self.optix_system.send_status(message)
+
+    def _connect_wpa(self, attempt: ProvisioningAttempt, psk: str):
+        with WpaProvisioner(attempt.ssid, psk) as wpa:
+            with self.step(attempt, 'configure'):
+                wpa.configure()
+            with self.step(attempt, 'associate'):
+                wpa.associate(attempt.cancelled)
+            WIFI_ASSOCIATE_SECONDS.observe(attempt.timings['associate'])
+            with self.step(attempt, 'dhcp'):
+                address = wait_for_address(attempt.cancelled)
+            WIFI_DHCP_SECONDS.observe(attempt.timings['dhcp'])
+            with self.step(attempt, 'save'):
+                wpa.commit()
+        logger.info(f"WiFi connected to {attempt.ssid} ({address})")
+
+    def _connect_legacy(self, attempt: ProvisioningAttempt, psk: str):
+        """TR: Kontrol soketi yoksa: yapılandırmayı yaz ve dhcpcd'yi yeniden başlat | EN: Without a control socket: write the config and restart dhcpcd | RU: Без управляющего сокета: записать конфиг и перезапустить dhcpcd"""
+        with self.step(attempt, 'configure'):
+            # TR: Bilinen tüm ağlar korunur; yeni ağ en yüksek önceliği alır | EN: All known networks are kept; the new one gets the highest priority | RU: Все известные сети сохраняются; новая получает наивысший приоритет
+            config = """
+country=TR
+ctrl_interface=DIR=/var/run/wpa_supplicant GROUP=netdev
+update_config=1
+""" + self.optix_system.credential_store.config_blocks(attempt.ssid, psk)
+            with open('/tmp/wpa_supplicant.conf', 'w') as f:
+                f.write(config)
+            subprocess.run(['sudo', 'cp', '/tmp/wpa_supplicant.conf',
+                            '/etc/wpa_supplicant/wpa_supplicant.conf'], check=True)
+        with self.step(attempt, 'restart'):
+            subprocess.run(['sudo', 'systemctl', 'restart', 'dhcpcd'], check=True)
+        with self.step(attempt, 'associate'):
+            # TR: Sabit 5 sn uyku yerine bağlanana kadar yokla | EN: Poll until connected instead of a fixed 5 s sleep | RU: Опрашивать до подключения вместо фиксированной паузы 5 с
+            deadline = time.monotonic() + WIFI_CONNECT_TIMEOUT_SEC
+            while not SystemUtils.is_wifi_connected():
+                if attempt.cancelled.wait(PROVISION_STEP_POLL_SEC):
+                    raise ProvisioningCancelled()
+                if time.monotonic() > deadline:
+                    raise OSError(f"no association within {WIFI_CONNECT_TIMEOUT_SEC}s")
+
+    def _check_connectivity(self) -> bool:
+        """TR: Yayın sunucusuna TCP ile ulaşılabiliyor mu; başarısızlık ölümcül değildir | EN: Is the streaming server reachable over TCP; failure is not fatal | RU: Доступен ли сервер трансляции по TCP; сбой не фатален"""
+        try:
+            with socket.create_connection((DEFAULT_SERVER_HOST, DEFAULT_SERVER_PORT),
+                                          timeout=PROVISION_CONNECTIVITY_TIMEOUT_SEC):
+                return True
+        except OSError as e:
+            # TR: WiFi hazır; yayın döngüsü sunucuya yeniden bağlanmayı kendisi dener | EN: WiFi is up; the streaming loop retries the server itself | RU: WiFi готов; цикл трансляции сам повторяет подключение к серверу
+            logger.warning(f"Streaming server {DEFAULT_SERVER_HOST}:{DEFAULT_SERVER_PORT} unreachable: {e}")
+            return False
+
 # =======================
 #  MAIN OPTIX SYSTEM
 # =======================
@@ -653,7 +2393,25 @@ class OptixSystem:
         self.bus = None  # Will be set by BLE service
         self.adapter = None  # Will be set by BLE service
         self.wifi_watcher = None  # WiFi file watcher observer
+        self.credentials_owner = None  # Lock file held while this process owns the credentials file
         self.wifi_watcher_thread = None  # WiFi watcher thread
+        self.metrics_server = None  # Local Prometheus endpoint
+        self.jobs = JobDispatcher(self)  # Background work for GATT handlers
+        self.sessions = SessionManager()  # Per-client BLE state keyed by device path
+        self.status_publisher = StatusPublisher(self._status_packets, self._notify_status)  # Coalesced, paced notifications
+        self.status_seq = itertools.count()  # Sequence numbers for framed notifications
+        self.request_local = threading.local()  # Command request being handled on this thread
+        self.wifi_scanner = WiFiScanner(self)  # Background WiFi scan cache
+        self.wifi_connected = False
+        self.provisioned = os.path.exists(PROVISIONED_MARKER)
+        self.adv_state = 0  # State byte published in manufacturer data
+        self.adv_monitor = None  # Adapter/advertising state from BlueZ properties
+        self.credential_store = CredentialStore()  # Known networks for roaming
+        self.provisioning = ProvisioningPipeline(self)  # Credentials -> WiFi -> streaming state machine
+        self.supabase = SupabaseClient(SUPABASE_URL, SUPABASE_ANON_KEY, observer=observe_supabase)  # Pooled REST client
+        self.auth_cache = AuthCache()  # Recently verified users for offline logins
+        self.last_credential_sync = 0.0
+        self.adv_registering = False  # RegisterAdvertisement call in flight
         
         logger.info("OPTIX System initialized")
         logger.info(f"Serial: {self.serial_number}")
@@ -661,90 +2419,109 @@ class OptixSystem:
 
     def ensure_advertising(self):
         """TR: Reklam (advertising) aktif mi kontrol et, gerekirse yeniden başlat | EN: Ensure LE advertising is active, restart if needed | RU: Проверить, активно ли рекламирование, и перезапустить при необходимости"""
-        if not self.bus or not self.adapter:
+        if not self.bus or not self.adapter or not self.adv_monitor:
             return
+        # TR: D-Bus çağrıları GLib döngüsünde yapılır | EN: D-Bus calls are made on the GLib loop | RU: Вызовы D-Bus выполняются в цикле GLib
+        if HAS_GLIB and self.ble_thread and threading.current_thread() is not self.ble_thread:
+            GLib.idle_add(self._check_advertising)
+        else:
+            self._check_advertising()
+
+    def _check_advertising(self):
+        # TR: Sinyaller kaçırılırsa yedek: özellikleri yeniden oku | EN: Fallback in case signals were missed: re-read the properties | RU: Резерв на случай пропущенных сигналов: перечитать свойства
         try:
-            result = subprocess.run(['bluetoothctl', 'show'], capture_output=True, text=True, timeout=3)
-            output = result.stdout or ''
-            # ActiveInstances: 0x0 → reklam yok
-            if 'Discoverable: no' in output:
-                try:
-                    subprocess.run(['bluetoothctl', 'discoverable', 'on'],
-                                   capture_output=True, text=True, timeout=5)
-                    subprocess.run(['bluetoothctl', 'pairable', 'on'],
-                                   capture_output=True, text=True, timeout=5)
-                    logger.info('Adapter set to discoverable/pairable for advertising')
-                except Exception as e:
-                    logger.warning(f'Failed to force discoverable/pairable: {e}')
-
-            if 'ActiveInstances: 0x0' in output:
-                logger.warning('No active advertising instances - restarting advertisement')
-                le_advertising_manager = dbus.Interface(
-                    self.bus.get_object(BLUEZ_SERVICE_NAME, self.adapter),
-                    LE_ADVERTISING_MANAGER_IFACE)
-                # Eski reklamı kaldırmayı dene (başarısız olsa da sorun değil)
-                if self.advertisement:
-                    try:
-                        le_advertising_manager.UnregisterAdvertisement(self.advertisement.get_path())
-                        logger.info('Unregistered previous advertisement')
-                    except Exception as e:
-                        logger.debug(f'UnregisterAdvertisement skipped: {e}')
-                # Yeni reklam oluştur ve kaydet
-                self.advertisement = Advertisement(self.bus, 0, self)
-                le_advertising_manager.RegisterAdvertisement(
-                    self.advertisement.get_path(),
-                    {},
-                    reply_handler=self.register_advertisement_cb,
-                    error_handler=self.register_advertisement_error_cb)
+            self.adv_monitor.refresh()
+            if not self.adv_monitor.discoverable:
+                logger.info('Adapter set to discoverable/pairable for advertising')
+                self.adv_monitor.configure()
+            if self.adv_monitor.active_instances == 0:
+                self.restart_advertising()
         except Exception as e:
             logger.debug(f'ensure_advertising check failed: {e}')
+        return False
+
+    def restart_advertising(self):
+        """TR: Reklamı yeniden kaydet | EN: Re-register the advertisement | RU: Перерегистрировать рекламу"""
+        if self.adv_registering:
+            return
+        logger.warning('No active advertising instances - restarting advertisement')
+        le_advertising_manager = dbus.Interface(
+            self.bus.get_object(BLUEZ_SERVICE_NAME, self.adapter),
+            LE_ADVERTISING_MANAGER_IFACE)
+        # Eski reklamı kaldırmayı dene (başarısız olsa da sorun değil)
+        if self.advertisement:
+            try:
+                le_advertising_manager.UnregisterAdvertisement(self.advertisement.get_path())
+                logger.info('Unregistered previous advertisement')
+            except Exception as e:
+                logger.debug(f'UnregisterAdvertisement skipped: {e}')
+            # TR: Aynı yolu yeniden dışa aktarabilmek için eski nesneyi bırak | EN: Release the old object so the same path can be exported again | RU: Освободить старый объект, чтобы снова экспортировать тот же путь
+            self.advertisement.remove_from_connection()
+        # Yeni reklam oluştur ve kaydet
+        self.advertisement = Advertisement(self.bus, 0, self)
+        self.adv_registering = True
+        le_advertising_manager.RegisterAdvertisement(
+            self.advertisement.get_path(),
+            {},
+            reply_handler=self.register_advertisement_cb,
+            error_handler=self.register_advertisement_error_cb)
     
-    def configure_wifi(self, ssid: str, password: str) -> bool:
+    @tracer.traced('wifi.configure')
+    def configure_wifi(self, ssid: str, password: str) -> Optional[bool]:
         """TR: WiFi bağlantısını yapılandır | EN: Configure WiFi connection | RU: Настроить подключение WiFi"""
+        return self.provisioning.run(ssid, password)
+
+    def roam(self):
+        """TR: Bağlantı yoksa görünür en iyi bilinen ağa geç | EN: When disconnected, switch to the best visible known network | RU: При отсутствии соединения перейти на лучшую видимую известную сеть"""
+        networks = self.wifi_scanner.get(WIFI_SCAN_INTERVAL_SEC)
+        if networks is None:
+            # TR: Önbellek bayat: hemen tara, sonraki turda dene | EN: Stale cache: scan now, try on the next round | RU: Кэш устарел: сканировать сейчас, попробовать в следующем цикле
+            self.wifi_scanner.wakeup.set()
+            return
+        candidate = self.credential_store.choose(networks)
+        if candidate:
+            logger.info(f"Roaming to known network {candidate['ssid']}")
+            self.provisioning.submit(candidate['ssid'], candidate['psk'], 'roam', silent=True)
+
+    @tracer.traced('supabase.sync_networks')
+    def sync_credentials(self) -> bool:
+        """TR: Kullanıcının tercih ettiği ağları Supabase'den çek | EN: Pull the user's preferred networks from Supabase | RU: Загрузить предпочтительные сети пользователя из Supabase"""
+        params = {'device_id': f'eq.{self.device_hash}', 'select': 'preferred_wifi_networks'}
         try:
-            # Create wpa_supplicant configuration
-            config = f"""
-country=TR
-ctrl_interface=DIR=/var/run/wpa_supplicant GROUP=netdev
-update_config=1
-
-network={{
-    ssid="{ssid}"
-    psk="{password}"
-    key_mgmt=WPA-PSK
-}}
-"""
-            # TR: Yapılandırmayı yaz | EN: Write configuration | RU: Запиши конфигурацию
-            with open('/tmp/wpa_supplicant.conf', 'w') as f:
-                f.write(config)
-            
-            # TR: Sisteme kopyala | EN: Copy to system location | RU: Скопируй в системное расположение
-            subprocess.run(['sudo', 'cp', '/tmp/wpa_supplicant.conf', 
-                          '/etc/wpa_supplicant/wpa_supplicant.conf'], check=True)
-            
-            # TR: Ağ servislerini yeniden başlat | EN: Restart networking | RU: Перезапусти сетевые службы
-            subprocess.run(['sudo', 'systemctl', 'restart', 'dhcpcd'], check=True)
-            
-            # TR: Bekle ve bağlantıyı kontrol et | EN: Wait and check connection | RU: Подожди и проверь соединение
-            time.sleep(5)
-            if SystemUtils.is_wifi_connected():
-                logger.info(f"WiFi connected to {ssid}")
-                return True
-            else:
-                logger.error(f"WiFi connection to {ssid} failed")
-                return False
-                
+            response = self.supabase.get('users', params=params)
+            response.raise_for_status()
+            rows = response.json()
         except Exception as e:
-            logger.error(f"WiFi configuration error: {e}")
+            logger.warning(f"Preferred network sync failed: {e}")
             return False
-    
-    def handle_authentication(self, auth_data: str):
+        entries = [entry for row in rows for entry in (row.get('preferred_wifi_networks') or [])]
+        logger.info(f"Synced {self.credential_store.sync(entries)} preferred networks")
+        return True
+
+    def authenticate_cached(self, auth_info: dict) -> bool:
+        """TR: Önbellekten anında yanıtla; yanıt verildiyse True | EN: Answer instantly from the cache; True if answered | RU: Ответить сразу из кэша; True, если ответ дан"""
+        username = auth_info.get('username', '')
+        password_hash = SystemUtils.hash_password(auth_info.get('password', ''))
+        verdict = self.auth_cache.lookup(username, password_hash)
+        if verdict is None:
+            return False
+        AUTH_CACHE_HITS.inc()
+        if verdict:
+            logger.info(f"Authentication successful for: {username} (cached)")
+            self.mark_provisioned()
+            self.send_status("Authentication Success")
+        else:
+            logger.warning(f"Authentication failed for: {username} (cached, deactivated)")
+            self.send_status("Authentication Failed")
+        # TR: Çevrimiçiyse arka planda Supabase ile yeniden doğrula | EN: When online, revalidate with Supabase in the background | RU: При наличии сети перепроверить через Supabase в фоне
+        if self.wifi_connected:
+            # TR: "failed" burada yalnızca iptal edilen önbellek kaydı demektir; uygulamaya yanıt zaten gitti | EN: "failed" here only means the cached entry was revoked; the app already has its answer | RU: "failed" здесь означает лишь отзыв записи в кэше; приложение уже получило ответ
+            self.jobs.submit('auth-revalidate', self.authenticate_with_supabase, username, password_hash, silent=True)
+        return True
+
+    def handle_authentication(self, auth_info: dict):
         """TR: Mobil uygulamadan gelen kimlik doğrulama isteğini işle | EN: Handle authentication request from mobile app | RU: Обработать запрос аутентификации из мобильного приложения"""
         try:
-            # TR: Kimlik doğrulama verilerini ayrıştır | EN: Parse authentication data | RU: Разбор данных аутентификации
-            auth_json = auth_data[5:] 
-            auth_info = json.loads(auth_json)
-            
             username = auth_info.get('username', '')
             password = auth_info.get('password', '')
             device_serial = auth_info.get('device_serial', '')
@@ -759,7 +2536,11 @@ network={{
             
             if success:
                 logger.info(f"Authentication successful for: {username}")
+                self.mark_provisioned()
                 self.send_status("Authentication Success")
+            elif success is None:
+                # TR: Çevrimdışı ve önbellekte yok | EN: Offline and not in the cache | RU: Нет сети и нет в кэше
+                self.send_status("Authentication Error")
             else:
                 logger.warning(f"Authentication failed for: {username}")
                 self.send_status("Authentication Failed")
@@ -768,12 +2549,8 @@ network={{
             logger.error(f"Authentication error: {e}")
             self.send_status("Authentication Error")
     
-    def handle_registration(self, reg_data: str):
+    def handle_registration(self, reg_info: dict):
         try:
-            # TR: Kayıt verilerini ayrıştır | EN: Parse registration data | RU: Разбор данных регистрации
-            reg_json = reg_data[9:] 
-            reg_info = json.loads(reg_json)
-            
             username = reg_info.get('username', '')
             email = reg_info.get('email', '')
             password = reg_info.get('password', '')
@@ -785,11 +2562,15 @@ network={{
             
             password_hash = SystemUtils.hash_password(password)
             
-            success = self.register_with_supabase(username, email, password_hash, device_serial)
+            outcome = self.register_with_supabase(username, email, password_hash, device_serial)
             
-            if success:
+            if outcome == 'registered':
                 logger.info(f"Registration successful for: {username}")
+                self.mark_provisioned()
                 self.send_status("Registration Complete")
+            elif outcome in REGISTRATION_CONFLICTS:
+                logger.warning(f"Registration rejected for {username}: {outcome}")
+                self.send_status(REGISTRATION_CONFLICTS[outcome])
             else:
                 logger.warning(f"Registration failed for: {username}")
                 self.send_status("Registration Failed")
@@ -798,29 +2579,26 @@ network={{
             logger.error(f"Registration error: {e}")
             self.send_status("Registration Error")
     
-    def authenticate_with_supabase(self, username: str, password_hash: str) -> bool:
-        """TR: Kullanıcıyı Supabase ile doğrula | EN: Authenticate user with Supabase | RU: Аутентифицировать пользователя через Supabase"""
+    @tracer.traced('supabase.authenticate')
+    def authenticate_with_supabase(self, username: str, password_hash: str) -> Optional[bool]:
+        """TR: Kullanıcıyı Supabase ile doğrula; ulaşılamazsa None | EN: Authenticate user with Supabase; None if unreachable | RU: Аутентифицировать пользователя через Supabase; None при недоступности"""
         try:
-            headers = {
-                'apikey': SUPABASE_ANON_KEY,
-                'Authorization': f'Bearer {SUPABASE_ANON_KEY}',
-                'Content-Type': 'application/json'
-            }
-            
-            url = f"{SUPABASE_URL}/rest/v1/users"
             params = {
                 'username': f'eq.{username}',
                 'password_hash': f'eq.{password_hash}',
                 'select': 'id,username,email,is_active'
             }
             
-            response = requests.get(url, headers=headers, params=params)
+            response = self.supabase.get('users', params=params)
             
             if response.status_code == 200:
                 users = response.json()
                 if users and len(users) > 0:
                     user = users[0]
-                    if user.get('is_active', True):
+                    is_active = user.get('is_active', True)
+                    # TR: Çevrimdışı girişler için sonucu önbelleğe al | EN: Cache the verdict for offline logins | RU: Кэшировать результат для входа без сети
+                    self.auth_cache.store(username, password_hash, is_active)
+                    if is_active:
                         logger.info(f"User authenticated: {user['username']}")
                         return True
                     else:
@@ -828,89 +2606,136 @@ network={{
                         return False
                 else:
                     logger.warning(f"User not found or invalid credentials: {username}")
+                    # TR: Silinmiş kullanıcı ya da değişmiş parola: önbellekteki kaydı at | EN: Deleted user or changed password: drop the cached entry | RU: Удаленный пользователь или смененный пароль: удалить запись из кэша
+                    self.auth_cache.invalidate(username)
                     return False
             else:
                 logger.error(f"Supabase query failed: {response.status_code}")
-                return False
+                return None
                 
         except Exception as e:
             logger.error(f"Supabase authentication error: {e}")
-            return False
+            return None
     
-    def register_with_supabase(self, username: str, email: str, password_hash: str, device_serial: str) -> bool:
-        """TR: Kullanıcıyı Supabase'e kaydet | EN: Register user with Supabase | RU: Зарегистрировать пользователя в Supabase"""
+    @tracer.traced('supabase.register')
+    def register_with_supabase(self, username: str, email: str, password_hash: str, device_serial: str) -> Optional[str]:
+        """TR: Kullanıcıyı tek RPC ile kaydet ve cihaza bağla | EN: Register the user and bind the device in a single RPC | RU: Зарегистрировать пользователя и привязать устройство одним RPC"""
         try:
-            headers = {
-                'apikey': SUPABASE_ANON_KEY,
-                'Authorization': f'Bearer {SUPABASE_ANON_KEY}',
-                'Content-Type': 'application/json'
-            }
-            
-            check_url = f"{SUPABASE_URL}/rest/v1/users"
-            check_params = {
-                'username': f'eq.{username}',
-                'select': 'id'
-            }
-            
-            check_response = requests.get(check_url, headers=headers, params=check_params)
-            
-            if check_response.status_code == 200:
-                existing_users = check_response.json()
-                if existing_users and len(existing_users) > 0:
-                    logger.warning(f"User already exists: {username}")
-                    return False
-            
-            user_data = {
-                'username': username,
-                'email': email,
-                'password_hash': password_hash,
-                'device_id': self.device_hash,
-                'device_serial': device_serial,
-                'login_method': 'ble',
-                'is_active': True,
-                'created_at': time.strftime('%Y-%m-%dT%H:%M:%S.%fZ'),
-                'updated_at': time.strftime('%Y-%m-%dT%H:%M:%S.%fZ')
-            }
-            
-            create_url = f"{SUPABASE_URL}/rest/v1/users"
-            create_response = requests.post(create_url, headers=headers, json=user_data)
+            # TR: Kontrol+ekleme yerine tek çağrı; çakışmaları UNIQUE kısıtları belirler | EN: One call instead of check-then-insert; UNIQUE constraints decide conflicts | RU: Один вызов вместо проверки и вставки; конфликты определяют ограничения UNIQUE
+            response = self.supabase.rpc('register_device_user', {
+                'p_username': username,
+                'p_email': email,
+                'p_password_hash': password_hash,
+                'p_device_id': self.device_hash,
+                'p_login_method': 'ble'
+            })
             
-            if create_response.status_code == 201:
-                logger.info(f"User registered successfully: {username}")
-                return True
+            if response.status_code == 200:
+                outcome = response.json().get('status')
+                if outcome == 'registered':
+                    logger.info(f"User registered successfully: {username} (device serial {device_serial})")
+                return outcome
             else:
-                logger.error(f"User registration failed: {create_response.status_code} - {create_response.text}")
-                return False
+                logger.error(f"User registration failed: {response.status_code} - {response.text}")
+                return None
                 
         except Exception as e:
             logger.error(f"Supabase registration error: {e}")
-            return False
+            return None
     
     def send_status(self, message: str):
         """TR: Durum mesajını mobil uygulamaya gönder | EN: Send status message back to mobile app | RU: Отправить статусное сообщение в мобильное приложение"""
+        logger.info(f"Status: {message}")
+        # TR: İkili isteklere ikili yanıt, metin isteklere eski düz metin | EN: Binary requests get a binary reply, text requests the legacy plain text | RU: Двоичным запросам — двоичный ответ, текстовым — прежний простой текст
+        request = getattr(self.request_local, 'request', None)
+        if request is not None and request.request_id is not None:
+            message_bytes = encode_command(OP_STATUS, {'message': message}, request.request_id)
+        else:
+            message_bytes = message.encode('utf-8')
+        # TR: Bildirimler tüm abonelere gider; isteği yapan istemci yanıtı kendi kuyruğundan da okuyabilir | EN: Notifications reach every subscriber; the requesting client can also read the reply from its own queue | RU: Уведомления получают все подписчики; запросивший клиент также может прочитать ответ из своей очереди
+        if request is not None and request.session is not None:
+            request.session.push(message_bytes)
+        # TR: D-Bus sinyalleri GLib döngüsünden, birleştirilip hız sınırıyla yayınlanır | EN: D-Bus signals are emitted from the GLib loop, coalesced and paced | RU: Сигналы D-Bus отправляются из цикла GLib, объединенными и с ограничением темпа
+        if HAS_GLIB and self.ble_thread:
+            self.status_publisher.publish(message, message_bytes)
+        else:
+            self._emit_status(message_bytes)
+
+    def _emit_status(self, message_bytes: bytes) -> int:
+        """TR: Yayıncı olmadan tüm parçaları hemen gönder | EN: Send every fragment right away, without the publisher | RU: Отправить все фрагменты сразу, без публикатора"""
+        packets = self._status_packets(message_bytes)
+        for packet in packets:
+            self._notify_status(packet)
+        return len(packets)
+
+    def _status_packets(self, message_bytes: bytes) -> list:
+        """TR: Karakteristik değerini güncelle ve mesajı ATT paketlerine böl | EN: Update the characteristic value and split the message into ATT packets | RU: Обновить значение характеристики и разбить сообщение на пакеты ATT"""
+        if not getattr(self, 'status_characteristic', None):
+            logger.warning("Status characteristic not available")
+            return []
+        self.status_characteristic.value = list(message_bytes)
+        # TR: MTU'ya sığmayan mesajlar çerçevelenir; kısa mesajlar eski formatta kalır | EN: Messages that don't fit the MTU are framed; short ones keep the legacy format | RU: Сообщения, не помещающиеся в MTU, фреймируются; короткие остаются в старом формате
+        mtu = self.sessions.min_mtu()
+        if len(message_bytes) <= mtu - ATT_OVERHEAD:
+            return [message_bytes]
         try:
-            logger.info(f"Status: {message}")
-            
-            if hasattr(self, 'status_characteristic') and self.status_characteristic:
-                message_bytes = message.encode('utf-8')
-                
-                # Update the characteristic value
-                self.status_characteristic.value = list(message_bytes)
-                
-                # TR: Bağlı cihazlara bildir | EN: Notify connected devices | RU: Уведомить подключенные устройства
-                self.status_characteristic.PropertiesChanged(
-                    'org.bluez.GattCharacteristic1',
-                    {'Value': dbus.Array(message_bytes, signature='y')},
-                    []
-                )
-                
-                logger.info(f"Status sent via BLE: {message}")
-            else:
-                logger.warning("Status characteristic not available")
-                
+            return fragment_message(message_bytes, next(self.status_seq), mtu)
+        except ValueError as e:
+            STATUS_OVERSIZE.inc()
+            logger.error(f"Status dropped ({len(message_bytes)} bytes at MTU {mtu}): {e}")
+            return []
+
+    def _notify_status(self, packet: bytes):
+        """TR: Bağlı cihazlara tek bir paket bildir | EN: Notify connected devices of one packet | RU: Уведомить подключенные устройства одним пакетом"""
+        try:
+            self.status_characteristic.PropertiesChanged(
+                'org.bluez.GattCharacteristic1',
+                {'Value': dbus.Array(packet, signature='y')},
+                []
+            )
+            logger.debug("Status packet sent via BLE: %d bytes", len(packet))
         except Exception as e:
             logger.error(f"Status send error: {e}")
+
+    def update_advertised_state(self, wifi_connected: Optional[bool] = None):
+        """TR: Reklamdaki durum baytını güncelle | EN: Update the state byte in the advertisement | RU: Обновить байт состояния в рекламе"""
+        if wifi_connected is not None:
+            self.wifi_connected = wifi_connected
+        state = ((ADV_STATE_WIFI if self.wifi_connected else 0)
+                 | (ADV_STATE_STREAMING if self.streaming_active else 0)
+                 | (ADV_STATE_PROVISIONED if self.provisioned else 0))
+        if state == self.adv_state:
+            return
+        self.adv_state = state
+        logger.debug("Advertised state: 0x%02x", state)
+        if self.advertisement and HAS_GLIB:
+            GLib.idle_add(self.advertisement.refresh)
+
+    def mark_provisioned(self):
+        """TR: Cihaza kullanıcı bağlandı; yeniden başlatmalarda korunur | EN: A user is linked to the device; persists across restarts | RU: К устройству привязан пользователь; сохраняется после перезапуска"""
+        if not self.provisioned:
+            self.provisioned = True
+            try:
+                os.makedirs(STATE_DIR, exist_ok=True)
+                open(PROVISIONED_MARKER, 'w').close()
+            except OSError as e:
+                logger.warning(f"Could not persist provisioned state: {e}")
+        self.update_advertised_state()
+
+    def scan_wifi(self) -> list:
+        """TR: WiFi ağlarını (önbellekten) bildir | EN: Report WiFi networks (from the cache) | RU: Сообщить сети WiFi (из кэша)"""
+        networks = self.wifi_scanner.get()
+        if networks is None:
+            networks = self.wifi_scanner.refresh()
+        logger.info(f"Found {len(networks)} networks")
+        payload = [{'ssid': n.ssid, 'bssid': n.bssid, 'rssi': n.rssi,
+                    'channel': n.channel, 'security': n.security}
+                   for n in networks[:WIFI_SCAN_MAX_RESULTS]]
+        # TR: Uzun liste çerçeveli bildirimlerle parça parça gider | EN: Long lists go out as framed notifications | RU: Длинные списки отправляются фреймированными уведомлениями
+        self.send_status("Networks: " + json.dumps(payload, ensure_ascii=False, separators=(',', ':')))
+        return networks
     
+    @tracer.traced('supabase.device_registration')
     def handle_device_registration(self, command: str):
         try:
             _, data = command.split(':', 1)
@@ -920,17 +2745,7 @@ network={{
             reg_data['device_serial'] = self.serial_number
             reg_data['device_type'] = 'OPTIX_GLASSES'
             
-            headers = {
-                'apikey': SUPABASE_KEY,
-                'Authorization': f'Bearer {SUPABASE_KEY}',
-                'Content-Type': 'application/json'
-            }
-            
-            response = requests.post(
-                f"{SUPABASE_URL}/rest/v1/users",
-                json=reg_data,
-                headers=headers
-            )
+            response = self.supabase.post('users', json=reg_data)
             
             if response.status_code in [200, 201]:
                 logger.info("Device registered successfully")
@@ -940,40 +2755,14 @@ network={{
         except Exception as e:
             logger.error(f"Registration error: {e}")
     
-    def setup_bluetooth(self) -> bool:
+    def setup_bluetooth(self, bus, adapter) -> bool:
         try:
             logger.info("Setting up Bluetooth...")
 
             # TR: Modern BlueZ: Adapter sıfırlama gerekmez - GATT kaydı reklamı işler | EN: Modern BlueZ: No need to reset adapter - GATT registration handles advertising | RU: Modern BlueZ: Не нужно сбрасывать адаптер - GATT регистрация обрабатывает рекламу
-            # TR: Cihaz adını bluetoothctl ile ayarla (kalıcı) | EN: Set device name using bluetoothctl (persistent) | RU: Установить имя устройства с помощью bluetoothctl (постоянное)
-            try:
-                result = subprocess.run(['bluetoothctl', 'system-alias', 'OPTIX'], 
-                                      capture_output=True, text=True, timeout=5)
-                if result.returncode == 0:
-                    logger.info("Device alias set to OPTIX")
-                else:
-                    logger.warning(f"bluetoothctl system-alias failed: {result.stderr}")
-            except (subprocess.TimeoutExpired, FileNotFoundError) as e:
-                logger.warning(f"bluetoothctl not available: {e}")
-            
-            # TR: Keşfedilebilir ve eşleşebilir yap (eski Bluetooth için) | EN: Make discoverable and pairable (for classic Bluetooth) | RU: Сделать обнаруживаемым и доступным для спаривания (для классического Bluetooth)
-            try:
-                result = subprocess.run(['bluetoothctl', 'discoverable', 'on'], 
-                                      capture_output=True, text=True, timeout=5)
-                if result.returncode == 0:
-                    logger.info("Bluetooth set to discoverable")
-                else:
-                    logger.warning(f"bluetoothctl discoverable failed: {result.stderr}")
-                
-                result = subprocess.run(['bluetoothctl', 'pairable', 'on'], 
-                                      capture_output=True, text=True, timeout=5)
-                if result.returncode == 0:
-                    logger.info("Bluetooth set to pairable")
-            except (subprocess.TimeoutExpired, FileNotFoundError) as e:
-                logger.warning(f"bluetoothctl commands failed: {e}")
-            
-                # TR: Not: LE reklamı BlueZ'da GATT servisi kaydedildiğinde otomatik olarak başlar | EN: Note: LE advertising is automatically started by BlueZ when GATT service is registered | RU: Примечание: LE реклама автоматически начинается в BlueZ, когда GATT сервис зарегистрирован
-                # Modern BlueZ handles this automatically - no need for hciconfig leadv
+            # TR: Ad, keşfedilebilirlik ve eşleşebilirlik Adapter1 özellikleriyle ayarlanır | EN: Alias, discoverable and pairable are set through Adapter1 properties | RU: Имя, обнаруживаемость и сопряжение задаются через свойства Adapter1
+            self.adv_monitor = AdvertisingMonitor(self, bus, adapter)
+            self.adv_monitor.configure('OPTIX')
             logger.info("Bluetooth setup complete - GATT service will start LE advertising automatically")
             
             return True
@@ -990,11 +2779,6 @@ network={{
             
         try:
             logger.info("Starting BLE service...")
-            
-            # TR: Bluetooth'u hazırla (ad, keşfedilebilir) | EN: Setup Bluetooth (name, discoverable) | RU: Настроить Bluetooth (имя, обнаруживаемый)
-            self.setup_bluetooth()
-            # TR: Setup'ta uyarı varsa devam et | EN: Continue even if setup has warnings | RU: Продолжать даже если setup имеет предупреждения | GATT регистрация будет работать
-            
 
             dbus.mainloop.glib.DBusGMainLoop(set_as_default=True)
             bus = dbus.SystemBus()
@@ -1004,6 +2788,11 @@ network={{
                 logger.error('No GATT manager found')
                 return
             
+            # TR: Bluetooth'u hazırla (ad, keşfedilebilir) | EN: Setup Bluetooth (name, discoverable) | RU: Настроить Bluetooth (имя, обнаруживаемый)
+            self.setup_bluetooth(bus, adapter)
+            self.sessions.watch(bus)
+            # TR: Setup'ta uyarı varsa devam et | EN: Continue even if setup has warnings | RU: Продолжать даже если setup имеет предупреждения | GATT регистрация будет работать
+            
             # TR: Uygulamayı oluştur ve kaydet | EN: Create and register application | RU: Создать и зарегистрировать приложение
             app = Application(bus, self)
             gatt_manager = dbus.Interface(
@@ -1020,6 +2809,7 @@ network={{
                 bus.get_object(BLUEZ_SERVICE_NAME, adapter),
                 LE_ADVERTISING_MANAGER_IFACE)
             
+            self.adv_registering = True
             le_advertising_manager.RegisterAdvertisement(
                 self.advertisement.get_path(),
                 {},
@@ -1071,32 +2861,32 @@ network={{
         logger.error(f'GATT registration failed: {error}')
     
     def register_advertisement_cb(self):
+        self.adv_registering = False
         logger.info('LE Advertisement registered!')
         logger.info('LE advertising should be active now')
         
-        # Verify advertising status
-        def verify_advertising():
-            time.sleep(2)  # TR: BlueZ'ın reklamı başlatması için bekle | EN: Give BlueZ time to start advertising | RU: Подождать, пока BlueZ начнет рекламу
-            try:
-                result = subprocess.run(['bluetoothctl', 'show'], capture_output=True, text=True, timeout=3)
-                output = result.stdout
-                if 'Discoverable: yes' in output:
-                    logger.info('Bluetooth discoverable confirmed')
-                if 'Advertising Features' in output:
-                    # TR: Aktif reklam örneklerini kontrol et | EN: Check for active advertising instances | RU: Проверить наличие активных экземпляров рекламы
-                    if ('ActiveInstances: 0x0' in output) or ('ActiveInstances: 0x00' in output) or ('ActiveInstances: 0x000' in output) or ('ActiveInstances: 0)' in output):
-                        logger.warning('No active advertising instances - advertising may not have started')
-                    elif 'ActiveInstances: 0x' in output:
-                        logger.info('LE advertising active (Advertisement registered)')
-                else:
-                    logger.warning('Could not verify advertising status')
-            except Exception as e:
-                logger.debug(f'Could not verify advertising status: {e}')
-        
-        # Verify in background thread
-        threading.Thread(target=verify_advertising, daemon=True).start()
+        # TR: BlueZ'ın reklamı başlatması için bekle, döngüyü bloklamadan | EN: Give BlueZ time to start advertising without blocking the loop | RU: Дать BlueZ время запустить рекламу, не блокируя цикл
+        if HAS_GLIB:
+            GLib.timeout_add_seconds(2, self.verify_advertising)
+
+    def verify_advertising(self):
+        """TR: Reklam durumunu D-Bus'tan doğrula | EN: Verify advertising state over D-Bus | RU: Проверить состояние рекламы через D-Bus"""
+        try:
+            self.adv_monitor.refresh()
+            if self.adv_monitor.discoverable:
+                logger.info('Bluetooth discoverable confirmed')
+            if self.adv_monitor.active_instances is None:
+                logger.warning('Could not verify advertising status')
+            elif self.adv_monitor.active_instances == 0:
+                logger.warning('No active advertising instances - advertising may not have started')
+            else:
+                logger.info('LE advertising active (Advertisement registered)')
+        except Exception as e:
+            logger.debug(f'Could not verify advertising status: {e}')
+        return False
     
     def register_advertisement_error_cb(self, error):
+        self.adv_registering = False
         logger.error(f'LE Advertisement registration failed: {error}')
         logger.warning('LE advertising may not work - devices may not be discoverable')
     
@@ -1127,16 +2917,17 @@ network={{
             try:
                 client_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
                 client_socket.settimeout(10.0)
-                logger.info(f"Connecting to {host}:{port}...")
-                client_socket.connect((host, port))
-                logger.info("Connected to streaming server!")
+                logger.info("Connecting to %s:%d...", host, port, extra=rate_limited('stream.connecting'))
+                with tracer.span('stream.connect'):
+                    client_socket.connect((host, port))
+                logger.info("Connected to streaming server!", extra=rate_limited('stream.connected'))
 
                 image_count = 0
 
                 while self.streaming_active:
                     try:
                         exp_us, again, fps = self.camera_system.probe_environment()
-                        logger.debug(f"exp={exp_us:.0f}us ag={again:.1f} fps~{fps:.1f}")
+                        logger.debug("exp=%.0fus ag=%.1f fps~%.1f", exp_us, again, fps)
 
                         suggested = self.camera_system.suggest_profile(exp_us, again, fps)
                         if last_suggestion and suggested.name == last_suggestion:
@@ -1146,35 +2937,54 @@ network={{
                             stable_hits = 1
 
                         if suggested.name != current_profile.name and stable_hits >= HYSTERESIS_HITS:
-                            logger.info(f"Profile switch: {current_profile.name} -> {suggested.name}")
+                            logger.info("Profile switch: %s -> %s", current_profile.name, suggested.name,
+                                        extra=rate_limited('stream.profile_switch'))
                             current_profile = suggested
                             stable_hits = 0
 
-                        image_data = self.camera_system.capture_image(current_profile)
-                        if image_data:
-                            try:
-                                size = len(image_data)
-                                client_socket.sendall(size.to_bytes(4, byteorder='big'))
-
-                                total_sent = 0
-                                chunk_size = 64 * 1024
-                                while total_sent < size:
-                                    chunk = image_data[total_sent:total_sent + chunk_size]
-                                    sent = client_socket.send(chunk)
-                                    if sent == 0:
-                                        raise socket.error("Connection broken during send")
-                                    total_sent += sent
-
-                                image_count += 1
-                                logger.info(f"Image {image_count} sent successfully ({size} bytes)")
-                            except socket.error as e:
-                                logger.error(f"Image send error: {e}")
-                                break
-                            except Exception as e:
-                                logger.error(f"Unexpected error during send: {e}")
-                                break
+                        with CAPTURE_SECONDS.time(), stage_memory.stage('capture'):
+                            frame = self.camera_system.capture_image(current_profile)
+                        if frame is not None:
+                            FRAMES_CAPTURED.inc()
+                            # TR: Kare tamponu her çıkışta havuza döner | EN: The frame buffer returns to the pool on every exit path | RU: Буфер кадра возвращается в пул при любом выходе
+                            with frame:
+                                try:
+                                    size = len(frame)
+                                    image_data = frame.view()
+                                    with tracer.span('stream.send', bytes=size), SEND_SECONDS.time(), \
+                                            stage_memory.stage('send'):
+                                        client_socket.sendall(size.to_bytes(4, byteorder='big'))
+
+                                        total_sent = 0
+                                        chunk_size = 64 * 1024
+                                        while total_sent < size:
+                                            # TR: memoryview dilimi kopya oluşturmaz | EN: memoryview slices don't copy | RU: Срезы memoryview не копируют данные
+                                            chunk = image_data[total_sent:total_sent + chunk_size]
+                                            sent = client_socket.send(chunk)
+                                            if sent == 0:
+                                                raise socket.error("Connection broken during send")
+                                            total_sent += sent
+
+                                    image_count += 1
+                                    FRAMES_SENT.inc()
+                                    BYTES_SENT.inc(size)
+                                    logger.debug("Image %d sent successfully (%d bytes)", image_count, size)
+                                    logger.info("Streaming: %d images sent", image_count,
+                                                extra=rate_limited('stream.progress', 60.0))
+                                except socket.error as e:
+                                    FRAMES_DROPPED.inc()
+                                    logger.error(f"Image send error: {e}")
+                                    break
+                                except Exception as e:
+                                    FRAMES_DROPPED.inc()
+                                    logger.error(f"Unexpected error during send: {e}")
+                                    break
+                                finally:
+                                    image_data.release()
                         else:
-                            logger.warning("Capture failed - skipping this frame")
+                            FRAMES_DROPPED.inc()
+                            logger.warning("Capture failed - skipping this frame",
+                                           extra=rate_limited('stream.capture_failed'))
 
                         time.sleep(CAMERA_INTERVAL_SEC)
 
@@ -1204,6 +3014,7 @@ network={{
                 break
 
             reconnect_attempts += 1
+            STREAM_RECONNECTS.inc()
             if reconnect_attempts >= max_reconnect_attempts:
                 logger.error(f"Max reconnection attempts reached ({max_reconnect_attempts})")
                 break
@@ -1221,6 +3032,15 @@ network={{
             return
         
         try:
+            # TR: wifi-watcher.service dosyanın sahibiyse iki süreç aynı ağı eklemesin | EN: If wifi-watcher.service owns the file, don't have two processes provisioning the same network | RU: Если файлом владеет wifi-watcher.service, два процесса не должны настраивать одну сеть
+            try:
+                self.credentials_owner = claim_credentials_file()
+                if self.credentials_owner is None:
+                    logger.info("WiFi credentials file is handled by wifi-watcher.service")
+                    return
+            except OSError as e:
+                logger.warning(f"Could not lock {CREDENTIALS_OWNER_LOCK}: {e}")
+            
             logger.info("Starting WiFi credentials file watcher...")
             
             # TR: Dosyayı oluştur (yoksa) | EN: Create file if it doesn't exist | RU: Создать файл, если его нет
@@ -1260,9 +3080,55 @@ network={{
                 logger.error(f"Error stopping WiFi watcher: {e}")
             finally:
                 self.wifi_watcher = None
+        if self.credentials_owner:
+            self.credentials_owner.close()
+            self.credentials_owner = None
     
+    def dump_trace(self) -> Optional[str]:
+        """TR: İz halkasını dosyaya yaz ve yolu bildir | EN: Dump the trace ring to a file and report its path | RU: Сохранить буфер трассировки в файл и сообщить путь"""
+        path = tracer.dump()
+        self.send_status(f"Trace: {path}" if path else "Trace Failed")
+        return path
+
+    def start_profiler(self, seconds: float = PROFILE_DEFAULT_SEC):
+        """TR: Örnekleyici profilleyiciyi başlat | EN: Start the sampling profiler | RU: Запустить сэмплирующий профилировщик"""
+        started = profiler.start(seconds)
+        self.send_status("Profiling Started" if started else "Profiling Busy")
+
+    def start_metrics_server(self, host: str = METRICS_HOST, port: int = METRICS_PORT):
+        """TR: Yerel Prometheus uç noktasını başlat | EN: Start the local Prometheus endpoint | RU: Запустить локальный эндпоинт Prometheus"""
+        if self.metrics_server:
+            return
+        try:
+            self.metrics_server = ThreadingHTTPServer((host, port), MetricsRequestHandler)
+            self.metrics_server.daemon_threads = True
+            threading.Thread(target=self.metrics_server.serve_forever, daemon=True).start()
+            logger.info(f"Metrics endpoint: http://{host}:{port}/metrics")
+        except Exception as e:
+            self.metrics_server = None
+            logger.error(f"Metrics server error: {e}")
+
+    def stop_metrics_server(self):
+        """TR: Prometheus uç noktasını durdur | EN: Stop the Prometheus endpoint | RU: Остановить эндпоинт Prometheus"""
+        if self.metrics_server:
+            self.metrics_server.shutdown()
+            self.metrics_server.server_close()
+            self.metrics_server = None
+
+    def install_signal_handlers(self):
+        """TR: SIGUSR1 iz dökümü, SIGUSR2 profilleme | EN: SIGUSR1 dumps the trace, SIGUSR2 starts profiling | RU: SIGUSR1 сохраняет трассировку, SIGUSR2 запускает профилирование"""
+        # TR: İşleyicide dosya yazma yapma, thread'e devret | EN: Don't do file I/O inside the handler, hand it to a thread | RU: Не выполнять файловый ввод-вывод в обработчике, передать потоку
+        signal.signal(signal.SIGUSR1,
+                      lambda signum, frame: threading.Thread(target=tracer.dump, daemon=True).start())
+        signal.signal(signal.SIGUSR2,
+                      lambda signum, frame: profiler.start(PROFILE_DEFAULT_SEC))
+        logger.info("Signal handlers installed (SIGUSR1: trace dump, SIGUSR2: profile)")
+
     def run(self):
         logger.info("OPTIX Smart Glasses starting...")
+        self.install_signal_handlers()
+        self.start_metrics_server()
+        self.wifi_scanner.start()
         
         # TR: WiFi file watcher'ı başlat | EN: Start WiFi file watcher | RU: Запустить наблюдатель файла WiFi
         self.start_wifi_watcher()
@@ -1284,16 +3150,25 @@ network={{
                 wifi_connected = SystemUtils.is_wifi_connected()
                 
                 if wifi_connected:
-                    logger.info("WiFi connected - Starting camera streaming")
+                    logger.info("WiFi connected - Starting camera streaming",
+                                extra=rate_limited('run.wifi_connected', 300.0))
                     if not self.ble_active:
                         self.start_ble_service()
                     
                     if not self.streaming_active:
                         self.start_camera_streaming()
+
+                    if time.monotonic() - self.last_credential_sync > CREDENTIAL_SYNC_INTERVAL_SEC:
+                        self.last_credential_sync = time.monotonic()
+                        self.jobs.submit('sync', self.sync_credentials, silent=True)
                 else:
-                    logger.info("WiFi disconnected - BLE service already active")
+                    logger.info("WiFi disconnected - BLE service already active",
+                                extra=rate_limited('run.wifi_disconnected', 300.0))
                     if self.streaming_active:
                         self.streaming_active = False
+                    self.roam()
+
+                self.update_advertised_state(wifi_connected)
                 
                 
                 time.sleep(15)
@@ -1310,9 +3185,14 @@ network={{
         if self.ble_active:
             self.stop_ble_service()
         self.stop_wifi_watcher()
+        self.stop_metrics_server()
+        self.wifi_scanner.stop()
+        self.jobs.shutdown()
+        self.supabase.close()
         logger.info("Cleanup completed")
 
 def main():
+    setup_logging()
     logger.info("OPTIX Smart Glasses")
     logger.info("=" * 50)
     
@@ -0,0 +1,334 @@
+#!/usr/bin/env python3
+"""
+TR: OPTIX results tablosu için akışlı toplu dışa/içe aktarma ve arama aracı | EN: Streaming bulk export/import and search tool for the OPTIX results table | RU: Потоковый инструмент массового экспорта/импорта и поиска по таблице results OPTIX
+TR: Dışa aktarma result_blocks üzerinde idx_result_blocks_user_date ile keyset sayfalama yapar, aşamaları istemcide açar ve sabit bellekte çalışır | EN: Export pages result_blocks by keyset on idx_result_blocks_user_date, expands the stages client-side and runs in constant memory | RU: Экспорт постранично читает result_blocks по keyset через idx_result_blocks_user_date, разворачивает стадии на клиенте и работает в постоянной памяти
+"""
+
+import argparse
+import csv
+import hashlib
+import logging
+import os
+import sys
+import time
+import uuid
+
+from results_uploader import ResultsUploader
+from supabase_client import SupabaseClient
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - [OPTIX] - %(message)s')
+logger = logging.getLogger('OPTIX')
+
+EXPORT_COLUMNS = ('id', 'created_by', 'created_at', 'file', 'ts', 'text_index', 'text_type',
+                  'text', 'confidence', 'box', 'box_points')
+BLOCK_COLUMNS = ('id', 'created_by', 'created_at', 'file', 'ts', 'text_index', 'confidence', 'box',
+                 'box_points', 'variants')
+STAGE_ORDER = ('raw', 'character_corrected', 'meaning_corrected')
+PAGE_ROWS = 1000  # Blocks per page; each expands to one row per stage
+IMPORT_BATCH_ROWS = 500
+PROGRESS_INTERVAL_SEC = 2.0
+
+# =======================
+#  PROGRESS
+# =======================
+
+class Throughput:
+    """TR: Satır/s ilerlemesini stderr'e yaz | EN: Report rows/s progress on stderr | RU: Выводить прогресс строк/с в stderr"""
+
+    def __init__(self, label: str):
+        self.label = label
+        self.rows = 0
+        self.started = time.monotonic()
+        self.last_report = self.started
+
+    def add(self, count: int):
+        self.rows += count
+        now = time.monotonic()
+        if now - self.last_report >= PROGRESS_INTERVAL_SEC:
+            self.last_report = now
+            self.report()
+
+    def report(self, final: bool = False):
+        elapsed = max(time.monotonic() - self.started, 1e-9)
+        prefix = 'done' if final else '...'
+        print(f"{self.label} {prefix}: {self.rows} rows in {elapsed:.1f}s ({self.rows / elapsed:.0f} rows/s)",
+              file=sys.stderr)
+
+# =======================
+#  EXPORT
+# =======================
+
+def keyset_params(last: dict, user: str = None) -> dict:
+    """TR: Son satırdan sonrası: (created_by ASC, created_at DESC, id DESC) | EN: Rows after the last one: (created_by ASC, created_at DESC, id DESC) | RU: Строки после последней: (created_by ASC, created_at DESC, id DESC)"""
+    created_at, row_id = last['created_at'], last['id']
+    # TR: Zaman damgası ':' ve '.' içerir; mantıksal filtrelerde tırnaklanır | EN: Timestamps contain ':' and '.'; they are quoted inside logic filters | RU: Метки времени содержат ':' и '.'; в логических фильтрах они заключаются в кавычки
+    within_user = f'created_at.lt."{created_at}",and(created_at.eq."{created_at}",id.lt.{row_id})'
+    # TR: Gereksiz AND sınırı planlayıcıya indeks aralığının başlangıcını verir; OR tek başına indekse inmez | EN: The redundant AND bound gives the planner an index range start; the OR alone is not pushed into the index | RU: Избыточная граница AND дает планировщику начало диапазона индекса; один OR в индекс не попадает
+    if user:
+        return {'or': f'({within_user})', 'and': f'(created_at.lte."{created_at}")'}
+    owner = last['created_by']
+    return {'or': f'(created_by.gt.{owner},and(created_by.eq.{owner},or({within_user})))',
+            'and': f'(created_by.gte.{owner})'}
+
+def result_stage_id(block_id: str, stage: str) -> str:
+    """TR: SQL result_stage_id() ile aynı: md5(block_id || '/' || stage)::uuid | EN: Same as SQL result_stage_id(): md5(block_id || '/' || stage)::uuid | RU: То же, что SQL result_stage_id(): md5(block_id || '/' || stage)::uuid"""
+    return str(uuid.UUID(hashlib.md5(f"{block_id}/{stage}".encode('utf-8')).hexdigest()))
+
+def stage_rank(stage: str) -> tuple:
+    return (STAGE_ORDER.index(stage) if stage in STAGE_ORDER else len(STAGE_ORDER), stage)
+
+def expand_blocks(blocks: list) -> list:
+    """TR: Blok başına bir satırı aşama başına bir satıra aç (results görünümüyle aynı biçim) | EN: Expand one row per block into one row per stage (same shape as the results view) | RU: Развернуть строку на блок в строку на стадию (как в представлении results)"""
+    rows = []
+    for block in blocks:
+        variants = block.get('variants') or {}
+        for stage in sorted(variants, key=stage_rank):
+            row = {column: block.get(column) for column in EXPORT_COLUMNS}
+            row.update(id=result_stage_id(block['id'], stage), text_type=stage, text=variants[stage])
+            rows.append(row)
+    return rows
+
+def iter_pages(client, user: str = None, since: str = None, page_rows: int = PAGE_ROWS):
+    """TR: Blokları sayfa sayfa getir; OFFSET yok, her sayfa indeksten devam eder | EN: Fetch blocks page by page; no OFFSET, every page resumes from the index | RU: Получать блоки постранично; без OFFSET, каждая страница продолжает по индексу"""
+    # TR: results görünümünün id'si md5 ile türetilir, hiçbir indeks onu sıralayamaz; sayfalama tablo üzerinde yapılır | EN: The results view derives its id with md5, so no index can order it; paging runs on the table | RU: id представления results вычисляется через md5, и ни один индекс его не упорядочит; пагинация идет по таблице
+    base = {'select': ','.join(BLOCK_COLUMNS),
+            'order': 'created_by.asc,created_at.desc,id.desc',
+            'limit': str(page_rows)}
+    if user:
+        base['created_by'] = f'eq.{user}'
+    if since:
+        base['created_at'] = f'gte.{since}'
+    last = None
+    while True:
+        params = dict(base)
+        if last is not None:
+            params.update(keyset_params(last, user))
+        response = client.get('result_blocks', params=params)
+        response.raise_for_status()
+        blocks = response.json()
+        if not blocks:
+            return
+        rows = expand_blocks(blocks)
+        if rows:
+            yield rows
+        if len(blocks) < page_rows:
+            return
+        last = blocks[-1]
+
+class CsvSink:
+    """TR: Çok satırlı text alanları csv modülünün tırnaklamasıyla korunur | EN: Multi-line text fields are preserved by csv quoting | RU: Многострочные поля text сохраняются благодаря кавычкам csv"""
+
+    def __init__(self, path: str):
+        self.file = open(path, 'w', newline='', encoding='utf-8') if path != '-' else sys.stdout
+        self.writer = csv.DictWriter(self.file, fieldnames=EXPORT_COLUMNS, extrasaction='ignore')
+        self.writer.writeheader()
+
+    def write(self, rows: list):
+        self.writer.writerows(rows)
+
+    def close(self):
+        if self.file is not sys.stdout:
+            self.file.close()
+
+class ParquetSink:
+    """TR: Her sayfa bir satır grubu olarak yazılır | EN: Each page is written as one row group | RU: Каждая страница записывается как одна группа строк"""
+
+    def __init__(self, path: str):
+        self.schema = pa.schema([
+            ('id', pa.string()), ('created_by', pa.string()), ('created_at', pa.string()),
+            ('file', pa.string()), ('ts', pa.float64()), ('text_index', pa.int32()),
+            ('text_type', pa.string()), ('text', pa.string()), ('confidence', pa.float64()),
+            ('box', pa.string()), ('box_points', pa.list_(pa.int32())),
+        ])
+        self.writer = pq.ParquetWriter(path, self.schema, compression='zstd')
+
+    def write(self, rows: list):
+        self.writer.write_table(pa.Table.from_pylist(rows, schema=self.schema))
+
+    def close(self):
+        self.writer.close()
+
+def output_format(path: str, requested: str) -> str:
+    if requested:
+        return requested
+    return 'parquet' if path.endswith('.parquet') else 'csv'
+
+def export_results(client, path: str, fmt: str, user: str = None, since: str = None,
+                   page_rows: int = PAGE_ROWS) -> int:
+    if fmt == 'parquet' and not HAS_PYARROW:
+        raise SystemExit("parquet output needs pyarrow (pip install pyarrow)")
+    sink = ParquetSink(path) if fmt == 'parquet' else CsvSink(path)
+    progress = Throughput('export')
+    try:
+        for rows in iter_pages(client, user, since, page_rows):
+            sink.write(rows)
+            progress.add(len(rows))
+    finally:
+        sink.close()
+    progress.report(final=True)
+    return progress.rows
+
+# =======================
+#  IMPORT
+# =======================
+
+def typed_row(row: dict) -> dict:
+    """TR: CSV dizgelerini sütun tiplerine çevir | EN: Convert CSV strings to column types | RU: Преобразовать строки CSV в типы столбцов"""
+    for column, kind in (('ts', float), ('text_index', int), ('confidence', float)):
+        value = row.get(column)
+        if isinstance(value, str):
+            row[column] = kind(value) if value else None
+    return row
+
+def iter_csv(path: str):
+    with open(path, newline='', encoding='utf-8') if path != '-' else sys.stdin as f:
+        for row in csv.DictReader(f):
+            yield typed_row(row)
+
+def iter_parquet(path: str, batch_rows: int):
+    for batch in pq.ParquetFile(path).iter_batches(batch_size=batch_rows):
+        yield from batch.to_pylist()
+
+def import_results(client, path: str, fmt: str, batch_rows: int = IMPORT_BATCH_ROWS,
+                   created_by: str = None, spool_dir: str = None) -> int:
+    if fmt == 'parquet' and not HAS_PYARROW:
+        raise SystemExit("parquet input needs pyarrow (pip install pyarrow)")
+    rows = iter_parquet(path, batch_rows) if fmt == 'parquet' else iter_csv(path)
+    uploader = ResultsUploader(client, batch_rows=batch_rows, batch_bytes=sys.maxsize, spool_dir=spool_dir)
+    progress = Throughput('import')
+    chunk = []
+    for row in rows:
+        if created_by:
+            row['created_by'] = created_by
+        chunk.append(row)
+        if len(chunk) >= batch_rows:
+            # TR: Zamanlayıcı yok: her tam yığın senkron gönderilir, bellek sabit kalır | EN: No timer: each full batch is sent synchronously, memory stays flat | RU: Без таймера: каждый полный пакет отправляется синхронно, память не растет
+            uploader.add_many(chunk)
+            progress.add(len(chunk))
+            chunk = []
+    uploader.add_many(chunk)
+    uploader.flush()
+    progress.add(len(chunk))
+    progress.report(final=True)
+    if uploader.stats['spooled'] or uploader.stats['rejected']:
+        logger.warning(f"{uploader.stats['spooled']} rows spooled for retry, "
+                       f"{uploader.stats['rejected']} rejected (see {spool_dir})")
+    return uploader.stats['rows']
+
+# =======================
+#  SEARCH
+# =======================
+
+SEARCH_LIMIT = 20
+
+def search_results(client, user: str, query: str, limit: int = SEARCH_LIMIT) -> list:
+    """TR: search_results RPC: sıralı isabetler (file, box dahil) | EN: search_results RPC: ranked hits including file and box | RU: RPC search_results: ранжированные совпадения с file и box"""
+    response = client.rpc('search_results', {'p_user': user, 'p_query': query, 'p_limit': limit})
+    response.raise_for_status()
+    return response.json()
+
+def print_hits(hits: list):
+    for hit in hits:
+        snippet = ' '.join((hit.get('text') or '').split())[:80]
+        print(f"{hit['rank']:6.3f}  {hit['file']}#{hit['text_index']} [{hit['text_type']}] box={hit['box_points']}")
+        print(f"        {snippet}")
+
+# =======================
+#  REGION
+# =======================
+
+def parse_region(value: str) -> tuple:
+    """TR: 'x1,y1,x2,y2' -> dört tamsayı | EN: 'x1,y1,x2,y2' -> four integers | RU: 'x1,y1,x2,y2' -> четыре целых"""
+    try:
+        x1, y1, x2, y2 = (int(part) for part in value.split(','))
+    except ValueError:
+        raise argparse.ArgumentTypeError("region must be x1,y1,x2,y2")
+    return x1, y1, x2, y2
+
+def results_in_region(client, user: str, region: tuple, margin: int = 0, file: str = None,
+                      text_type: str = None, limit: int = SEARCH_LIMIT) -> list:
+    """TR: results_in_region RPC: bölgeyle kesişen bloklar (box_points sayısal) | EN: results_in_region RPC: blocks overlapping the region (numeric box_points) | RU: RPC results_in_region: блоки, пересекающие область (числовые box_points)"""
+    x1, y1, x2, y2 = region
+    payload = {'p_user': user, 'p_x1': x1, 'p_y1': y1, 'p_x2': x2, 'p_y2': y2,
+               'p_margin': margin, 'p_limit': limit}
+    if file:
+        payload['p_file'] = file
+    if text_type:
+        payload['p_text_type'] = text_type
+    response = client.rpc('results_in_region', payload)
+    response.raise_for_status()
+    return response.json()
+
+def print_blocks(blocks: list):
+    for block in blocks:
+        snippet = ' '.join((block.get('text') or '').split())[:80]
+        print(f"{block['file']}#{block['text_index']} [{block['text_type']}] box={block['box_points']}")
+        print(f"        {snippet}")
+
+def main():
+    parser = argparse.ArgumentParser(description='OPTIX results export/import/search')
+    parser.add_argument('--url', default=os.environ.get('SUPABASE_URL'), help='Supabase URL (env SUPABASE_URL)')
+    parser.add_argument('--key', default=os.environ.get('SUPABASE_KEY'), help='Service key (env SUPABASE_KEY)')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    export = sub.add_parser('export', help='Stream the results table to CSV or Parquet')
+    export.add_argument('-o', '--output', default='-', help="Output file ('-' = stdout, CSV only)")
+    export.add_argument('--format', choices=('csv', 'parquet'))
+    export.add_argument('--user', help='Only this created_by UUID')
+    export.add_argument('--since', help='Only rows with created_at >= this ISO timestamp')
+    export.add_argument('--page', type=int, default=PAGE_ROWS)
+
+    load = sub.add_parser('import', help='Stream CSV or Parquet rows back into results')
+    load.add_argument('input', help="Input file ('-' = stdin, CSV only)")
+    load.add_argument('--format', choices=('csv', 'parquet'))
+    load.add_argument('--batch', type=int, default=IMPORT_BATCH_ROWS)
+    load.add_argument('--created-by', help='Override created_by for every row')
+    load.add_argument('--spool', default='results_import_spool', help='Directory for failed batches')
+
+    find = sub.add_parser('search', help='Ranked full-text/fuzzy search in one user\'s results')
+    find.add_argument('user', help='created_by UUID')
+    find.add_argument('query')
+    find.add_argument('--limit', type=int, default=SEARCH_LIMIT)
+
+    area = sub.add_parser('region', help='Text blocks of one user overlapping an image region')
+    area.add_argument('user', help='created_by UUID')
+    area.add_argument('region', type=parse_region, help='x1,y1,x2,y2 in image pixels')
+    area.add_argument('--margin', type=int, default=0, help='Grow the region by this many pixels')
+    area.add_argument('--file', help='Only this image file')
+    area.add_argument('--text-type', help='raw / character_corrected / meaning_corrected')
+    area.add_argument('--limit', type=int, default=SEARCH_LIMIT)
+
+    args = parser.parse_args()
+    if not args.url or not args.key:
+        parser.error('--url/--key (or SUPABASE_URL/SUPABASE_KEY) are required')
+    client = SupabaseClient(args.url, args.key, deadline=60.0)
+    try:
+        if args.command == 'export':
+            export_results(client, args.output, output_format(args.output, args.format),
+                           args.user, args.since, args.page)
+        elif args.command == 'search':
+            started = time.monotonic()
+            hits = search_results(client, args.user, args.query, args.limit)
+            print_hits(hits)
+            print(f"{len(hits)} hits in {(time.monotonic() - started) * 1000:.0f} ms", file=sys.stderr)
+        elif args.command == 'region':
+            started = time.monotonic()
+            blocks = results_in_region(client, args.user, args.region, args.margin, args.file,
+                                       args.text_type, args.limit)
+            print_blocks(blocks)
+            print(f"{len(blocks)} blocks in {(time.monotonic() - started) * 1000:.0f} ms", file=sys.stderr)
+        else:
+            import_results(client, args.input, output_format(args.input, args.format),
+                           args.batch, args.created_by, args.spool)
+    finally:
+        client.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""
+TR: OPTIX OCR sonuçları için toplu, sıkıştırılmış yükleyici | EN: Batched, compressed uploader for OPTIX OCR results | RU: Пакетный загрузчик OCR-результатов OPTIX со сжатием
+TR: Satırları tamponlar, çok satırlı PostgREST eklemeleri gönderir (gzip'i çözen bir ağ geçidi varsa sıkıştırılmış), başarısız yığınları diskte saklayıp tekrar dener | EN: Buffers rows, sends multi-row PostgREST inserts (gzip only behind a gateway that decodes it), spools failed batches to disk and retries them | RU: Буферизует строки, отправляет многострочные вставки PostgREST (gzip только за шлюзом, который его распаковывает), сохраняет неудачные пакеты на диск и повторяет их
+"""
+
+import gzip
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from typing import Optional
+
+logger = logging.getLogger('OPTIX')
+
+RESULT_COLUMNS = ('id', 'file', 'ts', 'text_index', 'text_type', 'text', 'confidence', 'box', 'box_points',
+                  'created_by', 'created_at')
+UPSERT_RPC = 'upsert_results'
+BATCH_ROWS = 200
+BATCH_BYTES = 256 * 1024
+FLUSH_INTERVAL_SEC = 2.0
+GZIP_LEVEL = 5
+SPOOL_DIR = os.path.expanduser('~/.optix/results_spool')
+SPOOL_MAX_FILES = 1000
+SPOOL_MAX_REJECTED_FILES = 100
+# TR: Geçici sayılan 4xx: zaman aşımı, hız sınırı, süresi dolmuş/dönen anahtar | EN: 4xx treated as transient: timeout, rate limit, expired or rotated key | RU: 4xx, считающиеся временными: тайм-аут, лимит запросов, истекший или смененный ключ
+RETRYABLE_4XX = (401, 403, 408, 429)
+RETRY_MAX_SEC = 60.0
+
+def box_points(box) -> Optional[list]:
+    """TR: [[x, y] x4] (veya düz) kutuyu 8 tamsayıya çevir; geçersizse None | EN: Turn a [[x, y] x4] (or flat) box into 8 integers; None if malformed | RU: Преобразовать рамку [[x, y] x4] (или плоскую) в 8 целых; None при ошибке"""
+    try:
+        if isinstance(box, str):
+            box = json.loads(box)
+        flat = [value for item in box for value in (item if isinstance(item, (list, tuple)) else [item])]
+        points = [int(round(float(value))) for value in flat]
+    except (TypeError, ValueError):
+        return None
+    return points if len(points) == 8 else None
+
+def normalize_row(row: dict) -> dict:
+    """TR: Satırı results sütunlarına indir; istemci tarafı UUID tekrarları idempotent yapar | EN: Reduce a row to the results columns; a client-side UUID makes retries idempotent | RU: Привести строку к столбцам results; UUID на клиенте делает повторы идемпотентными"""
+    out = {column: row[column] for column in RESULT_COLUMNS if row.get(column) not in (None, '')}
+    try:
+        out['id'] = str(uuid.UUID(str(out['id'])))
+    except (KeyError, ValueError):
+        out['id'] = str(uuid.uuid4())
+    # TR: box sütunu TEXT; listeler JSON olarak saklanır | EN: The box column is TEXT; lists are stored as JSON | RU: Столбец box имеет тип TEXT; списки хранятся как JSON
+    if 'box' in out and not isinstance(out['box'], str):
+        out['box'] = json.dumps(out['box'], separators=(',', ':'))
+    # TR: Sayısal kopya istemcide hesaplanır; sunucu metni ayrıştırmak zorunda kalmaz | EN: The numeric copy is computed client-side so the server does not have to parse the text | RU: Числовая копия вычисляется на клиенте, серверу не нужно разбирать текст
+    points = box_points(out.get('box_points', out.get('box')))
+    out.pop('box_points', None)
+    if points is not None:
+        out['box_points'] = points
+    return out
+
+class ResultsUploader:
+    """TR: Boyut veya süre dolunca gönderen, sınırlı gecikmeli yükleyici | EN: Uploader with bounded latency that flushes on size or time | RU: Загрузчик с ограниченной задержкой, отправляющий по размеру или времени"""
+
+    def __init__(self, client, table: str = 'results', batch_rows: int = BATCH_ROWS,
+                 batch_bytes: int = BATCH_BYTES, max_delay: float = FLUSH_INTERVAL_SEC,
+                 spool_dir: Optional[str] = SPOOL_DIR, compress: bool = False,
+                 rpc: Optional[str] = UPSERT_RPC):
+        self.client = client  # supabase_client.SupabaseClient
+        self.table = table
+        self.rpc = rpc  # None: plain inserts into table (pre-result_blocks databases)
+        self.batch_rows = batch_rows
+        self.batch_bytes = batch_bytes
+        self.max_delay = max_delay
+        self.spool_dir = spool_dir
+        self.compress = compress  # PostgREST/Supabase don't decode gzip bodies; only for gateways that do
+        self.buffer = []
+        self.buffer_bytes = 0
+        self.oldest = None  # monotonic time of the oldest buffered row
+        self.lock = threading.Lock()
+        self.send_lock = threading.Lock()  # Keeps batches in order
+        self.wakeup = threading.Event()
+        self.running = False
+        self.thread = None
+        self.retry_delay = max_delay
+        self.next_retry = 0.0
+        self.stats = {'rows': 0, 'batches': 0, 'raw_bytes': 0, 'wire_bytes': 0,
+                      'spooled': 0, 'replayed': 0, 'rejected': 0}
+
+    def start(self):
+        if self.running:
+            return
+        self.running = True
+        self.thread = threading.Thread(target=self._loop, name='results-uploader', daemon=True)
+        self.thread.start()
+
+    def close(self, timeout: float = 10.0):
+        """TR: Döngüyü durdur, kalanları gönder (olmazsa diske yaz) | EN: Stop the loop and send what is left (or spool it) | RU: Остановить цикл и отправить остаток (или сохранить на диск)"""
+        self.running = False
+        self.wakeup.set()
+        if self.thread:
+            self.thread.join(timeout)
+        self.flush()
+
+    def add(self, row: dict):
+        self.add_many([row])
+
+    def add_many(self, rows):
+        """TR: Satırları tampona ekle; eşik aşılırsa gönderimi tetikle | EN: Buffer rows; trigger a send when a threshold is crossed | RU: Добавить строки в буфер; запустить отправку при превышении порога"""
+        rows = [normalize_row(row) for row in rows]
+        size = sum(len(row.get('text') or '') + 160 for row in rows)  # Rough JSON size estimate
+        with self.lock:
+            if self.oldest is None:
+                self.oldest = time.monotonic()
+            self.buffer.extend(rows)
+            self.buffer_bytes += size
+            full = len(self.buffer) >= self.batch_rows or self.buffer_bytes >= self.batch_bytes
+        if full:
+            if self.running:
+                self.wakeup.set()
+            else:
+                self.flush()
+
+    def flush(self) -> bool:
+        """TR: Tampondakileri hemen gönder | EN: Send whatever is buffered now | RU: Немедленно отправить содержимое буфера"""
+        with self.lock:
+            rows, self.buffer = self.buffer, []
+            self.buffer_bytes = 0
+            self.oldest = None
+        ok = True
+        for start in range(0, len(rows), self.batch_rows):
+            batch = rows[start:start + self.batch_rows]
+            if not self._send(batch):
+                self._spool(batch)
+                ok = False
+        return ok
+
+    def _loop(self):
+        while self.running:
+            with self.lock:
+                due = self.oldest + self.max_delay if self.oldest is not None else None
+            timeout = self.max_delay if due is None else max(0.0, due - time.monotonic())
+            self.wakeup.wait(timeout)
+            self.wakeup.clear()
+            try:
+                if self.buffer and self.flush():
+                    self.replay()
+                elif not self.buffer and time.monotonic() >= self.next_retry:
+                    self.replay()
+            except Exception as e:
+                logger.error(f"Results uploader error: {e}")
+
+    def _send(self, rows: list) -> bool:
+        """TR: Tek çok satırlı yazma; tekrarlar çift kayıt oluşturmaz | EN: One multi-row write; retries never create duplicates | RU: Одна многострочная запись; повторы не создают дубликатов"""
+        if self.rpc:
+            # TR: upsert_results aşamaları blok başına birleştirir | EN: upsert_results folds the stages into one row per block | RU: upsert_results сворачивает стадии в одну строку на блок
+            body = json.dumps({'p_rows': rows}, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+            path, params, prefer = f'rpc/{self.rpc}', None, 'return=minimal'
+        else:
+            body = json.dumps(rows, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+            # TR: Eksik alanlar NULL değil, sütun varsayılanı alır | EN: Missing keys take the column default, not NULL | RU: Отсутствующие ключи получают значение по умолчанию, а не NULL
+            path, params, prefer = self.table, {'on_conflict': 'id'}, 'return=minimal,resolution=ignore-duplicates,missing=default'
+        with self.send_lock:
+            while True:
+                headers = {'Prefer': prefer}
+                payload = body
+                if self.compress:
+                    payload = gzip.compress(body, GZIP_LEVEL)
+                    headers['Content-Encoding'] = 'gzip'
+                try:
+                    # TR: Blok anahtarıyla birleştirme ya da istemci kimlikleri sayesinde tekrar güvenlidir | EN: Merging on the block key (or client-side row IDs) makes a retry safe | RU: Слияние по ключу блока (или ID строк с клиента) делает повтор безопасным
+                    response = self.client.post(path, params=params, data=payload,
+                                                headers=headers, idempotent=True)
+                except Exception as e:
+                    logger.warning(f"Results upload failed ({len(rows)} rows): {e}")
+                    return False
+                if response.status_code in (400, 415) and self.compress:
+                    # TR: Gzip kabul edilmiyor (PostgREST gövdeyi geçersiz JSON sayıp 400 döner): sıkıştırmasız devam et | EN: gzip is not accepted (PostgREST reads the body as invalid JSON and answers 400): continue uncompressed | RU: gzip не принимается (PostgREST считает тело невалидным JSON и отвечает 400): продолжить без сжатия
+                    logger.warning(f"Results endpoint rejected gzip ({response.status_code}); sending uncompressed")
+                    self.compress = False
+                    continue
+                break
+        if response.status_code in (200, 201, 204):
+            self.stats['rows'] += len(rows)
+            self.stats['batches'] += 1
+            self.stats['raw_bytes'] += len(body)
+            self.stats['wire_bytes'] += len(payload)
+            self.retry_delay = self.max_delay
+            return True
+        if response.status_code in (401, 403):
+            # TR: Anahtar/JWT sorunu verinin değil; yığın kuyrukta kalır ve tekrar denenir | EN: A key/JWT problem is not a data problem; the batch stays queued and is retried | RU: Проблема ключа/JWT — не ошибка данных; пакет остается в очереди и повторяется
+            logger.error(f"Results upload unauthorized: {response.status_code} - {response.text[:200]}")
+            return False
+        if 400 <= response.status_code < 500 and response.status_code not in RETRYABLE_4XX:
+            # TR: Veri hatası: tekrar denemek işe yaramaz, ayrı dosyaya koy | EN: Data error: retrying will not help, set it aside | RU: Ошибка данных: повтор не поможет, отложить отдельно
+            logger.error(f"Results rejected: {response.status_code} - {response.text[:200]}")
+            self._spool(rows, rejected=True)
+            return True
+        logger.warning(f"Results upload failed: {response.status_code}")
+        return False
+
+    def _spool(self, rows: list, rejected: bool = False):
+        """TR: Yığını diske yaz (gzip'li JSON) | EN: Write the batch to disk (gzipped JSON) | RU: Записать пакет на диск (JSON в gzip)"""
+        if not self.spool_dir:
+            logger.error(f"Dropping {len(rows)} result rows: no spool directory")
+            return
+        suffix = '.rejected.json.gz' if rejected else '.json.gz'
+        os.makedirs(self.spool_dir, exist_ok=True)
+        path = os.path.join(self.spool_dir, f"{time.time_ns()}{suffix}")
+        with gzip.open(path + '.tmp', 'wt', encoding='utf-8') as f:
+            json.dump(rows, f, ensure_ascii=False)
+        os.replace(path + '.tmp', path)
+        self.stats['rejected' if rejected else 'spooled'] += len(rows)
+        self._prune(rejected)
+        if not rejected:
+            self.next_retry = time.monotonic() + self.retry_delay
+            self.retry_delay = min(RETRY_MAX_SEC, self.retry_delay * 2)
+
+    def _prune(self, rejected: bool):
+        """TR: İki kuyruk da sınırlı: en eskiler atılır | EN: Both queues are bounded: the oldest are dropped | RU: Обе очереди ограничены: самые старые удаляются"""
+        pending = self.rejected_files() if rejected else self.spooled_files()
+        limit = SPOOL_MAX_REJECTED_FILES if rejected else SPOOL_MAX_FILES
+        for stale in pending[:max(0, len(pending) - limit)]:
+            logger.warning(f"Results spool full, dropping {stale}")
+            os.unlink(stale)
+
+    def spooled_files(self) -> list:
+        if not self.spool_dir or not os.path.isdir(self.spool_dir):
+            return []
+        names = sorted(name for name in os.listdir(self.spool_dir)
+                       if name.endswith('.json.gz') and not name.endswith('.rejected.json.gz'))
+        return [os.path.join(self.spool_dir, name) for name in names]
+
+    def rejected_files(self) -> list:
+        """TR: İnceleme için ayrılan reddedilmiş yığınlar, eskiden yeniye | EN: Rejected batches kept for inspection, oldest first | RU: Отклоненные пакеты, сохраненные для проверки, от старых к новым"""
+        if not self.spool_dir or not os.path.isdir(self.spool_dir):
+            return []
+        names = sorted(name for name in os.listdir(self.spool_dir) if name.endswith('.rejected.json.gz'))
+        return [os.path.join(self.spool_dir, name) for name in names]
+
+    def replay(self) -> int:
+        """TR: Diskteki yığınları eskiden yeniye yeniden gönder; ilk hatada dur | EN: Resend spooled batches oldest first; stop at the first failure | RU: Повторно отправить сохраненные пакеты от старых к новым; остановиться при первой ошибке"""
+        sent = 0
+        for path in self.spooled_files():
+            try:
+                with gzip.open(path, 'rt', encoding='utf-8') as f:
+                    rows = json.load(f)
+            except (OSError, ValueError) as e:
+                logger.error(f"Unreadable spool file {path}: {e}")
+                os.replace(path, path[:-len('.json.gz')] + '.rejected.json.gz')
+                self._prune(rejected=True)
+                continue
+            if not self._send(rows):
+                self.next_retry = time.monotonic() + self.retry_delay
+                self.retry_delay = min(RETRY_MAX_SEC, self.retry_delay * 2)
+                break
+            os.unlink(path)
+            sent += len(rows)
+        if sent:
+            self.stats['replayed'] += sent
+            logger.info(f"Replayed {sent} spooled result rows")
+        return sent
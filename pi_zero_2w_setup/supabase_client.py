@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+TR: OPTIX ortak Supabase REST istemcisi | EN: OPTIX shared Supabase REST client | RU: Общий REST-клиент Supabase для OPTIX
+TR: Kalıcı bağlantı havuzu, çağrı başına süre sınırı, idempotent çağrılar için geri çekilmeli tekrar | EN: Keep-alive connection pool, per-call deadlines, retries with backoff for idempotent calls | RU: Пул keep-alive соединений, дедлайны на вызов, повторы с задержкой для идемпотентных вызовов
+"""
+
+import logging
+import random
+import time
+from typing import Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger('OPTIX')
+
+CONNECT_TIMEOUT_SEC = 3.05
+READ_TIMEOUT_SEC = 10.0
+DEADLINE_SEC = 15.0
+POOL_SIZE = 4
+RETRIES = 2
+BACKOFF_SEC = 0.25
+BACKOFF_MAX_SEC = 2.0
+RETRY_STATUSES = (408, 429, 500, 502, 503, 504)
+IDEMPOTENT_METHODS = ('GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE')
+
+class SupabaseClient:
+    """TR: PostgREST için paylaşılan, iş parçacığı güvenli istemci | EN: Shared, thread-safe client for PostgREST | RU: Общий потокобезопасный клиент для PostgREST"""
+
+    def __init__(self, url: str, key: str, observer=None, pool_size: int = POOL_SIZE,
+                 deadline: float = DEADLINE_SEC, retries: int = RETRIES):
+        self.url = url.rstrip('/')
+        self.deadline = deadline
+        self.retries = retries
+        self.observer = observer  # observer(method, path, status, seconds); status is 'error' on transport failure
+        self.session = requests.Session()
+        # TR: Başlıklar bir kez kurulur | EN: Headers are built once | RU: Заголовки формируются один раз
+        self.session.headers.update({
+            'apikey': key,
+            'Authorization': f'Bearer {key}',
+            'Content-Type': 'application/json'
+        })
+        # TR: Tekrarlar burada, süre sınırını bilerek yapılır; urllib3 tekrarları kapalı | EN: Retries are done here, deadline-aware; urllib3 retries are off | RU: Повторы выполняются здесь с учетом дедлайна; повторы urllib3 отключены
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    def request(self, method: str, path: str, deadline: Optional[float] = None,
+                idempotent: Optional[bool] = None, **kwargs) -> requests.Response:
+        """TR: İsteği süre sınırı içinde gönder; yalnızca idempotent çağrılar tekrarlanır | EN: Send a request within a deadline; only idempotent calls are retried | RU: Отправить запрос в пределах дедлайна; повторяются только идемпотентные вызовы"""
+        method = method.upper()
+        if idempotent is None:
+            idempotent = method in IDEMPOTENT_METHODS
+        retries = self.retries if idempotent else 0
+        deadline_at = time.monotonic() + (deadline or self.deadline)
+        url = f"{self.url}{path}"
+
+        for attempt in range(retries + 1):
+            remaining = deadline_at - time.monotonic()
+            if remaining <= 0:
+                raise requests.Timeout(f"{method} {path}: deadline exceeded")
+            timeout = (min(CONNECT_TIMEOUT_SEC, remaining), min(READ_TIMEOUT_SEC, remaining))
+            started = time.monotonic()
+            try:
+                response = self.session.request(method, url, timeout=timeout, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                self._observe(method, path, 'error', time.monotonic() - started)
+                if attempt == retries or not self._backoff(attempt, deadline_at):
+                    raise
+                logger.debug(f"Supabase {method} {path} retry {attempt + 1}: {e}")
+                continue
+            self._observe(method, path, response.status_code, time.monotonic() - started)
+            if response.status_code not in RETRY_STATUSES or attempt == retries:
+                return response
+            if not self._backoff(attempt, deadline_at, response.headers.get('Retry-After')):
+                return response
+            logger.debug(f"Supabase {method} {path} retry {attempt + 1}: HTTP {response.status_code}")
+        return response
+
+    def get(self, table: str, **kwargs) -> requests.Response:
+        return self.request('GET', f"/rest/v1/{table}", **kwargs)
+
+    def post(self, table: str, **kwargs) -> requests.Response:
+        return self.request('POST', f"/rest/v1/{table}", **kwargs)
+
+    def patch(self, table: str, **kwargs) -> requests.Response:
+        return self.request('PATCH', f"/rest/v1/{table}", **kwargs)
+
+    def rpc(self, function: str, payload: dict, **kwargs) -> requests.Response:
+        """TR: PostgREST RPC çağrısı | EN: PostgREST RPC call | RU: Вызов RPC PostgREST"""
+        return self.request('POST', f"/rest/v1/rpc/{function}", json=payload, **kwargs)
+
+    def close(self):
+        self.session.close()
+
+    def _backoff(self, attempt: int, deadline_at: float, retry_after: Optional[str] = None) -> bool:
+        """TR: Üstel bekleme (jitter'lı); süre sınırını aşacaksa False | EN: Exponential backoff with jitter; False if it would pass the deadline | RU: Экспоненциальная задержка с джиттером; False, если она превысит дедлайн"""
+        delay = min(BACKOFF_MAX_SEC, BACKOFF_SEC * 2 ** attempt) * random.uniform(0.5, 1.0)
+        if retry_after and retry_after.isdigit():
+            delay = max(delay, float(retry_after))
+        if time.monotonic() + delay >= deadline_at:
+            return False
+        time.sleep(delay)
+        return True
+
+    def _observe(self, method: str, path: str, status, seconds: float):
+        if self.observer:
+            try:
+                self.observer(method, path, status, seconds)
+            except Exception as e:
+                logger.debug(f"Supabase observer failed: {e}")
@@ -0,0 +1,35 @@
+"""TR: Testler için ortak kurulum | EN: Shared test setup | RU: Общая настройка тестов
+
+TR: Daemon modülü dbus-python'u koşulsuz içe aktarır; geliştirme makinelerinde yoksa yalnızca
+içe aktarmayı sağlayan en küçük modüller yüklenir. Çerçeveleme ve TLV kodlayıcı D-Bus'a dokunmaz.
+EN: The daemon module imports dbus-python unconditionally; on development machines without it, only
+the minimal modules needed for the import are installed. Framing and the TLV codec never touch D-Bus.
+RU: Модуль демона безусловно импортирует dbus-python; на машинах разработчиков без него
+устанавливаются только минимальные модули для импорта. Фрейминг и TLV-кодек не используют D-Bus.
+"""
+
+import os
+import sys
+import types
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+try:
+    import dbus  # noqa: F401
+except ImportError:
+    dbus = types.ModuleType('dbus')
+    # TR: D-Bus değer türleri düz Python türleridir | EN: D-Bus value types are plain Python types | RU: Типы значений D-Bus — обычные типы Python
+    dbus.String, dbus.ObjectPath, dbus.Boolean, dbus.UInt16, dbus.UInt32 = str, str, bool, int, int
+    dbus.Array = lambda value, signature=None: list(value)
+    dbus.Dictionary = lambda value, signature=None: dict(value)
+    dbus.Interface = lambda obj, dbus_interface=None: obj
+    dbus.exceptions = types.ModuleType('dbus.exceptions')
+    dbus.exceptions.DBusException = type('DBusException', (Exception,), {})
+    dbus.service = types.ModuleType('dbus.service')
+    dbus.service.Object = type('Object', (), {'__init__': lambda self, *args, **kwargs: None})
+    dbus.service.method = dbus.service.signal = lambda *args, **kwargs: (lambda func: func)
+    dbus.mainloop = types.ModuleType('dbus.mainloop')
+    dbus.mainloop.glib = types.ModuleType('dbus.mainloop.glib')
+    dbus.mainloop.glib.DBusGMainLoop = lambda **kwargs: None
+    sys.modules.update({'dbus': dbus, 'dbus.exceptions': dbus.exceptions, 'dbus.service': dbus.service,
+                        'dbus.mainloop': dbus.mainloop, 'dbus.mainloop.glib': dbus.mainloop.glib})
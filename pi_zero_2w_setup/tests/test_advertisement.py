@@ -0,0 +1,47 @@
+"""TR: Reklam üretici verisi ve durum baytı testleri | EN: Advertisement manufacturer data and state byte tests | RU: Тесты данных производителя в рекламе и байта состояния"""
+
+import types
+
+import optix_smart_glasses as optix
+
+DEVICE_HASH = 'a1b2c3d4e5f60718293a4b5c6d7e8f90'
+
+def advertisement(state):
+    system = types.SimpleNamespace(adv_state=state, device_hash=DEVICE_HASH)
+    return optix.Advertisement(bus=None, index=0, optix_system=system)
+
+def test_manufacturer_data_layout():
+    data = advertisement(optix.ADV_STATE_WIFI | optix.ADV_STATE_PROVISIONED).manufacturer_data()
+    assert list(data) == [0xFFFF]
+    assert bytes(data[0xFFFF]) == bytes((0x05, 0xA1, 0xB2, 0xC3, 0xD4))
+
+def test_manufacturer_data_fits_the_legacy_payload():
+    payload = bytes(advertisement(0x07).manufacturer_data()[0xFFFF])
+    # TR: Bayraklar (3) + 128 bit servis UUID (18) + üretici AD yapısı (uzunluk, tür, şirket kimliği, veri) | EN: Flags (3) + 128-bit service UUID (18) + manufacturer AD structure (length, type, company ID, data) | RU: Флаги (3) + 128-битный UUID сервиса (18) + AD-структура производителя (длина, тип, ID компании, данные)
+    assert 3 + 18 + 2 + 2 + len(payload) <= 31
+
+def test_properties_carry_manufacturer_data():
+    properties = advertisement(0).get_properties()[optix.LE_ADVERTISEMENT_IFACE]
+    assert properties['ManufacturerData'][0xFFFF][0] == 0
+    assert properties['ServiceUUIDs'] == [optix.WIFI_SERVICE_UUID]
+
+class FakeGLib:
+    def __init__(self):
+        self.calls = []
+
+    def idle_add(self, func, *args):
+        self.calls.append(func)
+
+def test_state_byte_refreshes_only_on_change(monkeypatch):
+    glib = FakeGLib()
+    monkeypatch.setattr(optix, 'GLib', glib, raising=False)
+    monkeypatch.setattr(optix, 'HAS_GLIB', True)
+    system = types.SimpleNamespace(wifi_connected=False, streaming_active=True, provisioned=True, adv_state=0,
+                                   advertisement=types.SimpleNamespace(refresh='refresh'))
+    optix.OptixSystem.update_advertised_state(system, wifi_connected=True)
+    assert system.adv_state == optix.ADV_STATE_WIFI | optix.ADV_STATE_STREAMING | optix.ADV_STATE_PROVISIONED
+    optix.OptixSystem.update_advertised_state(system)
+    assert glib.calls == ['refresh']
+    system.streaming_active = False
+    optix.OptixSystem.update_advertised_state(system)
+    assert system.adv_state == 0x05 and glib.calls == ['refresh', 'refresh']
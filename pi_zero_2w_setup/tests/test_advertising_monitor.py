@@ -0,0 +1,91 @@
+"""TR: Reklam sağlığı (BlueZ D-Bus özellikleri) testleri | EN: Advertising health (BlueZ D-Bus properties) tests | RU: Тесты состояния рекламы (свойства BlueZ D-Bus)"""
+
+import types
+
+import pytest
+
+import optix_smart_glasses as optix
+
+ADAPTER = '/org/bluez/hci0'
+
+class FakeAdapter:
+    """TR: Özellikleri tutan ve Set çağrılarını kaydeden adaptör | EN: Adapter that holds properties and records Set calls | RU: Адаптер, хранящий свойства и записывающий вызовы Set"""
+
+    def __init__(self, adapter, manager=None):
+        self.properties = {optix.ADAPTER_IFACE: adapter}
+        if manager is not None:
+            self.properties[optix.LE_ADVERTISING_MANAGER_IFACE] = manager
+        self.sets = []
+
+    def GetAll(self, interface):
+        if interface not in self.properties:
+            raise optix.dbus.exceptions.DBusException('org.freedesktop.DBus.Error.UnknownInterface')
+        return self.properties[interface]
+
+    def Set(self, interface, name, value, reply_handler=None, error_handler=None):
+        self.sets.append((name, value))
+        reply_handler()
+
+class FakeBus:
+    def __init__(self, adapter):
+        self.adapter = adapter
+        self.receivers = []
+
+    def get_object(self, service, path):
+        assert (service, path) == (optix.BLUEZ_SERVICE_NAME, ADAPTER)
+        return self.adapter
+
+    def add_signal_receiver(self, handler, **kwargs):
+        self.receivers.append((handler, kwargs))
+
+class FakeSystem:
+    def __init__(self):
+        self.restarts = 0
+
+    def restart_advertising(self):
+        self.restarts += 1
+
+def monitor(adapter_properties, manager=None):
+    adapter = FakeAdapter(adapter_properties, manager)
+    bus = FakeBus(adapter)
+    system = FakeSystem()
+    return optix.AdvertisingMonitor(system, bus, ADAPTER), adapter, bus, system
+
+def test_subscribes_to_adapter_property_changes():
+    _, _, bus, _ = monitor({})
+    (handler, kwargs), = bus.receivers
+    assert kwargs == {'signal_name': 'PropertiesChanged', 'dbus_interface': optix.DBUS_PROP_IFACE, 'path': ADAPTER}
+
+def test_refresh_reads_adapter_and_manager_properties():
+    adv, _, _, _ = monitor({'Discoverable': True, 'Pairable': False}, {'ActiveInstances': 1})
+    adv.refresh()
+    assert (adv.discoverable, adv.pairable, adv.active_instances) == (True, False, 1)
+
+def test_refresh_without_advertising_manager_properties():
+    adv, _, _, _ = monitor({'Discoverable': False})
+    adv.refresh()
+    assert adv.discoverable is False and adv.active_instances is None
+
+def test_configure_disables_the_discoverable_timeout():
+    adv, adapter, _, _ = monitor({})
+    adv.configure('OPTIX-1')
+    assert adapter.sets == [('Alias', 'OPTIX-1'), ('DiscoverableTimeout', 0), ('Discoverable', True), ('Pairable', True)]
+
+def test_lost_discoverability_is_re_enabled():
+    adv, adapter, _, _ = monitor({})
+    adv._on_properties_changed(optix.ADAPTER_IFACE, {'Discoverable': False, 'Pairable': True}, [])
+    assert adapter.sets == [('Discoverable', True)] and adv.pairable is True
+    adv._on_properties_changed(optix.ADAPTER_IFACE, {'Discoverable': True}, [])
+    assert len(adapter.sets) == 1
+
+@pytest.mark.parametrize('instances, restarts', [(0, 1), (1, 0)])
+def test_no_active_instances_restarts_advertising(instances, restarts):
+    adv, _, _, system = monitor({})
+    adv._on_properties_changed(optix.LE_ADVERTISING_MANAGER_IFACE, {'ActiveInstances': instances}, [])
+    assert adv.active_instances == instances and system.restarts == restarts
+
+def test_periodic_check_falls_back_to_properties():
+    adv, adapter, _, system = monitor({'Discoverable': False}, {'ActiveInstances': 0})
+    owner = types.SimpleNamespace(adv_monitor=adv, restart_advertising=system.restart_advertising)
+    assert optix.OptixSystem._check_advertising(owner) is False
+    assert ('Discoverable', True) in adapter.sets and system.restarts == 1
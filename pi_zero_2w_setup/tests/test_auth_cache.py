@@ -0,0 +1,81 @@
+"""TR: Çevrimdışı giriş önbelleği testleri | EN: Offline login cache tests | RU: Тесты кэша офлайн-входа"""
+
+import optix_smart_glasses as optix
+
+def test_truncated_key_is_regenerated(tmp_path):
+    key_path = tmp_path / 'auth_cache.key'
+    key_path.write_bytes(b'short')
+    cache = optix.AuthCache(str(tmp_path / 'auth_cache.bin'), str(key_path))
+    assert len(cache.secret) == optix.AUTH_CACHE_KEY_BYTES
+    assert key_path.read_bytes() == cache.secret
+    cache.store('ayse', 'hash')
+    reloaded = optix.AuthCache(str(tmp_path / 'auth_cache.bin'), str(key_path))
+    assert reloaded.lookup('ayse', 'hash') is (True if optix.HAS_CRYPTOGRAPHY else None)
+
+def test_valid_key_is_kept(tmp_path):
+    key_path = tmp_path / 'auth_cache.key'
+    key_path.write_bytes(bytes(range(32)))
+    assert optix.AuthCache(str(tmp_path / 'auth_cache.bin'), str(key_path)).secret == bytes(range(32))
+
+def make_cache(tmp_path, **kwargs):
+    return optix.AuthCache(str(tmp_path / 'auth_cache.bin'), str(tmp_path / 'auth_cache.key'), **kwargs)
+
+def test_lookup_returns_stored_verdict(tmp_path):
+    cache = make_cache(tmp_path)
+    cache.store('ayse', 'hash', is_active=True)
+    cache.store('mehmet', 'hash2', is_active=False)
+    assert cache.lookup('ayse', 'hash') is True
+    assert cache.lookup('mehmet', 'hash2') is False
+    assert cache.lookup('zeynep', 'hash') is None
+
+def test_other_password_defers_to_supabase(tmp_path):
+    cache = make_cache(tmp_path)
+    cache.store('ayse', 'hash')
+    assert cache.lookup('ayse', 'other') is None
+    assert 'hash' not in cache.entries['ayse']['verifier']
+
+def test_expired_entry_is_ignored(tmp_path, monkeypatch):
+    cache = make_cache(tmp_path, ttl=60)
+    now = [1000.0]
+    monkeypatch.setattr(optix.time, 'time', lambda: now[0])
+    cache.store('ayse', 'hash')
+    now[0] += 59
+    assert cache.lookup('ayse', 'hash') is True
+    now[0] += 2
+    assert cache.lookup('ayse', 'hash') is None
+
+def test_least_recently_verified_is_evicted(tmp_path, monkeypatch):
+    cache = make_cache(tmp_path)
+    now = [1000.0]
+    monkeypatch.setattr(optix.time, 'time', lambda: now[0])
+    for i in range(optix.AUTH_CACHE_MAX_ENTRIES + 1):
+        now[0] += 1
+        cache.store(f'user{i}', 'hash')
+    assert len(cache.entries) == optix.AUTH_CACHE_MAX_ENTRIES
+    assert 'user0' not in cache.entries
+    assert cache.lookup(f'user{optix.AUTH_CACHE_MAX_ENTRIES}', 'hash') is True
+
+def test_invalidate_one_or_all(tmp_path):
+    cache = make_cache(tmp_path)
+    cache.store('ayse', 'hash')
+    cache.store('mehmet', 'hash')
+    assert cache.invalidate('zeynep') == 0
+    assert cache.invalidate('ayse') == 1
+    assert cache.lookup('ayse', 'hash') is None
+    assert cache.invalidate() == 1
+    assert cache.entries == {}
+
+def test_cache_is_encrypted_and_survives_restart(tmp_path):
+    if not optix.HAS_CRYPTOGRAPHY:
+        return
+    cache = make_cache(tmp_path)
+    cache.store('ayse', 'hash')
+    raw = (tmp_path / 'auth_cache.bin').read_bytes()
+    assert b'ayse' not in raw
+    assert (tmp_path / 'auth_cache.bin').stat().st_mode & 0o777 == 0o600
+    assert make_cache(tmp_path).lookup('ayse', 'hash') is True
+
+def test_unreadable_cache_starts_empty(tmp_path):
+    make_cache(tmp_path)
+    (tmp_path / 'auth_cache.bin').write_bytes(b'not a fernet token')
+    assert make_cache(tmp_path).entries == {}
@@ -0,0 +1,101 @@
+"""TR: BLE çerçeveleme ve birleştirme testleri | EN: BLE framing and reassembly tests | RU: Тесты фрейминга и сборки BLE"""
+
+import pytest
+
+import optix_smart_glasses as optix
+
+MTU = 23
+CHUNK = MTU - optix.ATT_OVERHEAD - optix.FRAME_HEADER.size
+
+def payload(size: int) -> bytes:
+    return bytes(index % 251 for index in range(size))
+
+def header(frame: bytes) -> tuple:
+    return optix.FRAME_HEADER.unpack_from(bytes(frame))
+
+def test_round_trip_multiple_fragments():
+    data = payload(CHUNK * 3 + 5)
+    frames = optix.fragment_message(data, 7, MTU)
+    assert len(frames) == 4
+    assert all(len(frame) <= MTU - optix.ATT_OVERHEAD for frame in frames)
+    assert [header(frame) for frame in frames] == [(optix.FRAME_MAGIC, 7, index, 4) for index in range(4)]
+    reassembler = optix.Reassembler()
+    results = [reassembler.feed(bytes(frame)) for frame in frames]
+    assert results[:-1] == [None, None, None]
+    assert results[-1] == data
+    assert reassembler.pending == {}
+
+def test_empty_payload_is_one_frame():
+    frames = optix.fragment_message(b'', 1, MTU)
+    assert [header(frame) for frame in frames] == [(optix.FRAME_MAGIC, 1, 0, 1)]
+    assert optix.Reassembler().feed(bytes(frames[0])) == b''
+
+def test_sequence_wraps_to_one_byte():
+    data = payload(CHUNK + 1)
+    assert header(optix.fragment_message(data, 256, MTU)[0])[1] == 0
+    assert header(optix.fragment_message(data, 255, MTU)[0])[1] == 255
+    # TR: 255'ten 0'a geçiş iki ayrı mesajdır | EN: 255 followed by 0 are two separate messages | RU: 255 и затем 0 — два разных сообщения
+    reassembler = optix.Reassembler()
+    last, first = optix.fragment_message(data, 255, MTU), optix.fragment_message(data[::-1], 256, MTU)
+    assert reassembler.feed(bytes(last[0])) is None
+    assert reassembler.feed(bytes(first[0])) is None
+    assert reassembler.feed(bytes(last[1])) == data
+    assert reassembler.feed(bytes(first[1])) == data[::-1]
+
+def test_out_of_order_fragments():
+    data = payload(CHUNK * 4)
+    frames = optix.fragment_message(data, 3, MTU)
+    reassembler = optix.Reassembler()
+    for frame in (frames[2], frames[0], frames[3]):
+        assert reassembler.feed(bytes(frame)) is None
+    assert reassembler.feed(bytes(frames[1])) == data
+
+def test_duplicate_fragment_does_not_complete_message():
+    data = payload(CHUNK * 3)
+    frames = optix.fragment_message(data, 9, MTU)
+    reassembler = optix.Reassembler()
+    assert reassembler.feed(bytes(frames[0])) is None
+    assert reassembler.feed(bytes(frames[0])) is None
+    assert reassembler.feed(bytes(frames[1])) is None
+    assert reassembler.feed(bytes(frames[1])) is None
+    assert reassembler.feed(bytes(frames[2])) == data
+
+def test_interleaved_sequences():
+    first, second = payload(CHUNK * 2), payload(CHUNK * 2)[::-1]
+    a, b = optix.fragment_message(first, 1, MTU), optix.fragment_message(second, 2, MTU)
+    reassembler = optix.Reassembler()
+    assert reassembler.feed(bytes(a[0])) is None
+    assert reassembler.feed(bytes(b[1])) is None
+    assert reassembler.feed(bytes(b[0])) == second
+    assert reassembler.feed(bytes(a[1])) == first
+
+def test_unframed_write_passes_through():
+    reassembler = optix.Reassembler()
+    assert reassembler.feed(b'{"ssid": "x"}') == b'{"ssid": "x"}'
+    assert reassembler.feed(b'') == b''
+
+def test_stale_message_expires():
+    data = payload(CHUNK * 2)
+    frames = optix.fragment_message(data, 4, MTU)
+    reassembler = optix.Reassembler(timeout=-1)
+    assert reassembler.feed(bytes(frames[0])) is None
+    # TR: Süresi dolan ilk parça atılır; ikinci parça tek başına tamamlamaz | EN: The expired first part is dropped; the second alone doesn't complete | RU: Просроченная первая часть отбрасывается; вторая сама по себе не завершает
+    assert reassembler.feed(bytes(frames[1])) is None
+
+@pytest.mark.parametrize('frame', [
+    bytes((optix.FRAME_MAGIC, 1)),
+    bytes((optix.FRAME_MAGIC, 1, 0, 0)),
+    bytes((optix.FRAME_MAGIC, 1, 2, 2)),
+])
+def test_malformed_frames_are_rejected(frame):
+    with pytest.raises(ValueError):
+        optix.Reassembler().feed(frame)
+
+def test_mtu_too_small():
+    with pytest.raises(ValueError):
+        optix.fragment_message(b'x', 0, optix.ATT_OVERHEAD + optix.FRAME_HEADER.size)
+
+def test_payload_over_max_fragments():
+    assert len(optix.fragment_message(payload(CHUNK * optix.MAX_FRAGMENTS), 0, MTU)) == optix.MAX_FRAGMENTS
+    with pytest.raises(ValueError):
+        optix.fragment_message(payload(CHUNK * optix.MAX_FRAGMENTS + 1), 0, MTU)
@@ -0,0 +1,66 @@
+"""TR: İkili TLV komut kodlayıcı testleri | EN: Binary TLV command codec tests | RU: Тесты двоичного TLV-кодека команд"""
+
+import pytest
+
+import optix_smart_glasses as optix
+
+def test_round_trip_all_field_types():
+    fields = {'username': 'kullanıcı', 'password': 'p@ss "quoted"', 'email': 'a@b.c',
+              'device_serial': 'SN-1', 'seconds': 300, 'message': ''}
+    request = optix.decode_command(optix.encode_command(optix.OP_REGISTER, fields, 513))
+    assert (request.opcode, request.request_id, request.fields) == (optix.OP_REGISTER, 513, fields)
+
+def test_request_id_wraps_to_16_bits():
+    assert optix.decode_command(optix.encode_command(optix.OP_AUTH, {}, 0x10005)).request_id == 5
+
+def test_int_field_sizes():
+    for value in (0, 255, 256, 2 ** 40):
+        encoded = optix.encode_command(optix.OP_PROFILE, {'seconds': value})
+        assert optix.decode_command(encoded).fields == {'seconds': value}
+
+def test_negative_int_is_rejected():
+    with pytest.raises(ValueError):
+        optix.encode_command(optix.OP_PROFILE, {'seconds': -1})
+
+def test_longest_field_round_trips():
+    value = 'x' * 0xFFFF
+    assert optix.decode_command(optix.encode_command(optix.OP_AUTH, {'username': value})).fields == {'username': value}
+
+def test_over_long_field_is_rejected():
+    with pytest.raises(ValueError):
+        optix.encode_command(optix.OP_AUTH, {'username': 'x' * 0x10000})
+
+def test_unknown_tags_are_skipped():
+    encoded = optix.encode_command(optix.OP_AUTH, {'username': 'u'})
+    encoded += optix.CMD_FIELD.pack(0x7F, 3) + b'abc'
+    assert optix.decode_command(encoded).fields == {'username': 'u'}
+
+def test_read_command_dispatches_binary_and_text():
+    assert optix.read_command(optix.encode_command(optix.OP_SCAN_WIFI, {}, 1)).request_id == 1
+    request = optix.read_command(b'auth:{"username": "u"}')
+    assert (request.opcode, request.fields, request.request_id) == (optix.OP_AUTH, {'username': 'u'}, None)
+    assert optix.read_command(b'profile:2.5').fields == {'seconds': 2.5}
+
+def header(**overrides) -> bytes:
+    values = dict(magic=optix.CMD_MAGIC, version=optix.CMD_VERSION, opcode=optix.OP_AUTH, request_id=1)
+    values.update(overrides)
+    return optix.CMD_HEADER.pack(values['magic'], values['version'], values['opcode'], values['request_id'])
+
+@pytest.mark.parametrize('data', [
+    b'',
+    header()[:-1],
+    header(version=optix.CMD_VERSION + 1),
+    header(magic=0x00),
+    header() + b'\x01',
+    header() + optix.CMD_FIELD.pack(0x01, 4) + b'abc',
+    header() + optix.CMD_FIELD.pack(0x01, 0xFFFF) + b'x' * 100,
+    header() + optix.CMD_FIELD.pack(0x01, 2) + b'\xff\xfe',
+])
+def test_malformed_commands_are_rejected(data):
+    with pytest.raises(ValueError):
+        optix.decode_command(data)
+
+@pytest.mark.parametrize('text', [b'unknown', b'auth:{not json', b'profile:abc'])
+def test_malformed_text_commands_are_rejected(text):
+    with pytest.raises(ValueError):
+        optix.read_command(text)
@@ -0,0 +1,14 @@
+"""TR: WiFi kimlik bilgisi deposu testleri | EN: WiFi credential store tests | RU: Тесты хранилища учетных данных WiFi"""
+
+import optix_smart_glasses as optix
+
+def test_sync_falls_back_to_rank_for_bad_priority(tmp_path):
+    store = optix.CredentialStore(str(tmp_path / 'wifi_networks.json'))
+    changed = store.sync([
+        {'ssid': 'Home', 'priority': 'high'},
+        {'ssid': 'Office', 'priority': None},
+        {'ssid': 'Cafe', 'priority': '7'},
+        'Guest',
+    ])
+    assert changed == 4
+    assert {ssid: n['priority'] for ssid, n in store.networks.items()} == {'Home': 4, 'Office': 3, 'Cafe': 7, 'Guest': 1}
@@ -0,0 +1,122 @@
+"""TR: Kimlik dosyası izleme ve özet testleri | EN: Credentials file watching and digest tests | RU: Тесты наблюдения за файлом учетных данных и хэша"""
+
+import json
+import threading
+import types
+
+import pytest
+
+import optix_smart_glasses as optix
+import wifi_provisioning
+
+class FakeSystem:
+    """TR: Sonucu ayarlanabilir configure_wifi | EN: configure_wifi with a settable outcome | RU: configure_wifi с настраиваемым результатом"""
+
+    def __init__(self):
+        self.outcome = True
+        self.calls = []
+
+    def configure_wifi(self, ssid, password):
+        self.calls.append(ssid)
+        return self.outcome
+
+def daemon_handler(monkeypatch, tmp_path):
+    monkeypatch.setattr(optix, 'WIFI_CREDENTIALS_FILE', str(tmp_path / 'wifi_credentials.json'))
+    monkeypatch.setattr(optix, 'WIFI_CREDENTIALS_DIGEST', str(tmp_path / 'state' / 'wifi_credentials.sha256'))
+    system = FakeSystem()
+    return optix.WiFiCredentialsHandler(system), system, optix
+
+def watcher_handler(monkeypatch, tmp_path):
+    pytest.importorskip('watchdog')
+    import wifi_file_watcher as watcher
+    monkeypatch.setattr(watcher, 'WIFI_CREDENTIALS_FILE', str(tmp_path / 'wifi_credentials.json'))
+    monkeypatch.setattr(watcher, 'WIFI_CREDENTIALS_DIGEST', str(tmp_path / 'state' / 'wifi_credentials.sha256'))
+    system = FakeSystem()
+    handler = watcher.WiFiCredentialsHandler()
+    monkeypatch.setattr(handler, '_configure_wifi', system.configure_wifi)
+    return handler, system, watcher
+
+@pytest.fixture(params=[daemon_handler, watcher_handler], ids=['daemon', 'watcher'])
+def handler(request, monkeypatch, tmp_path):
+    return request.param(monkeypatch, tmp_path)
+
+def write(module, ssid, password='password1'):
+    with open(module.WIFI_CREDENTIALS_FILE, 'w') as f:
+        json.dump({'ssid': ssid, 'password': password}, f)
+
+def test_read_credentials_file(tmp_path):
+    path = tmp_path / 'wifi_credentials.json'
+    path.write_text('  \n')
+    assert wifi_provisioning.read_credentials_file(str(path)) == (None, None)
+    path.write_text('{broken')
+    digest, credentials = wifi_provisioning.read_credentials_file(str(path))
+    assert digest and credentials is None
+    path.write_text('{"ssid": "Home", "password": "password1"}')
+    digest, credentials = wifi_provisioning.read_credentials_file(str(path))
+    assert credentials == {'ssid': 'Home', 'password': 'password1', 'timestamp': ''}
+    assert wifi_provisioning.read_credentials_file(str(tmp_path / 'missing.json')) == (None, None)
+
+def test_digest_is_persisted_and_cleared(tmp_path):
+    path = str(tmp_path / 'state' / 'wifi_credentials.sha256')
+    wifi_provisioning.CredentialsDigest(path).save('abc')
+    digest = wifi_provisioning.CredentialsDigest(path)
+    assert digest.value == 'abc'
+    digest.clear()
+    assert digest.value is None and wifi_provisioning.CredentialsDigest(path).value is None
+    digest.clear()
+
+def test_success_saves_digest_and_skips_repeat(handler):
+    handler, system, module = handler
+    write(module, 'Home')
+    handler._process_credentials()
+    handler._process_credentials()
+    assert system.calls == ['Home']
+    # TR: Yeniden başlatmadan sonra da atlanır | EN: Still skipped after a restart | RU: Пропускается и после перезапуска
+    assert wifi_provisioning.CredentialsDigest(module.WIFI_CREDENTIALS_DIGEST).value == handler.digest.value is not None
+
+def test_failure_lets_same_credentials_be_sent_again(handler):
+    handler, system, module = handler
+    write(module, 'Home')
+    handler._process_credentials()
+    write(module, 'Office')
+    system.outcome = False
+    handler._process_credentials()
+    assert handler.digest.value is None
+    system.outcome = True
+    handler._process_credentials()
+    # TR: Daha önce başarılı olan içerik de yeniden uygulanır | EN: Content that succeeded before is applied again too | RU: Ранее успешное содержимое тоже применяется снова
+    write(module, 'Home')
+    handler._process_credentials()
+    assert system.calls == ['Home', 'Office', 'Office', 'Home']
+
+def test_invalid_credentials_are_not_retried(handler):
+    handler, system, module = handler
+    write(module, 'Home', password='')
+    handler._process_credentials()
+    handler._process_credentials()
+    assert system.calls == [] and handler.digest.value is not None
+
+def test_close_write_and_rename_are_debounced(handler, monkeypatch):
+    handler, system, module = handler
+    runs = []
+    done = threading.Event()
+    monkeypatch.setattr(handler, '_process_credentials', lambda: (runs.append(1), done.set()))
+    target = module.WIFI_CREDENTIALS_FILE
+    handler.on_closed(types.SimpleNamespace(src_path=target + '.tmp'))
+    handler.on_moved(types.SimpleNamespace(src_path=target + '.tmp', dest_path=target))
+    handler.on_closed(types.SimpleNamespace(src_path=target))
+    assert done.wait(2)
+    handler.timer.join()
+    assert runs == [1]
+
+def test_unrelated_files_are_ignored(handler, monkeypatch):
+    handler, system, module = handler
+    monkeypatch.setattr(handler, '_schedule', lambda: pytest.fail('scheduled'))
+    handler.on_closed(types.SimpleNamespace(src_path=module.WIFI_CREDENTIALS_FILE + '.tmp'))
+    handler.on_moved(types.SimpleNamespace(src_path=module.WIFI_CREDENTIALS_FILE, dest_path='/tmp/other.json'))
+
+def test_pipeline_run_returns_its_own_result(monkeypatch):
+    pipeline = optix.ProvisioningPipeline(FakeSystem())
+    monkeypatch.setattr(pipeline, '_run', lambda attempt: attempt.ssid == 'Home')
+    assert pipeline.run('Home', 'password1') is True
+    assert pipeline.run('Office', 'password1') is False
@@ -0,0 +1,52 @@
+"""TR: Kare havuzu bütçesi ve aşama RSS testleri | EN: Frame pool budget and stage RSS tests | RU: Тесты бюджета пула кадров и RSS этапов"""
+
+import threading
+import time
+
+import optix_smart_glasses as optix
+
+SLOT = 1024
+
+def test_budget_bounds_the_number_of_slots():
+    pool = optix.FramePool(budget_bytes=3 * SLOT + 100, slot_bytes=SLOT)
+    buffers = [pool.acquire(timeout=0) for _ in range(3)]
+    assert None not in buffers and pool.allocated == 3
+    waits = optix.FRAME_POOL_WAITS.value
+    assert pool.acquire(timeout=0.01) is None
+    assert optix.FRAME_POOL_WAITS.value == waits + 1
+    assert optix.FRAME_POOL_IN_USE.value == 3 * SLOT
+
+def test_budget_below_one_slot_still_allows_one():
+    pool = optix.FramePool(budget_bytes=10, slot_bytes=SLOT)
+    assert pool.max_slots == 1 and pool.acquire(timeout=0) is not None
+
+def test_released_buffer_is_reused_and_reset():
+    pool = optix.FramePool(budget_bytes=SLOT, slot_bytes=SLOT)
+    with pool.acquire() as frame:
+        frame.data[:3] = b'jpg'
+        frame.length = 3
+        assert bytes(frame.view()) == b'jpg' and len(frame) == 3
+        first = frame
+    again = pool.acquire(timeout=0)
+    assert again is first and len(again) == 0 and pool.allocated == 1
+    assert optix.FRAME_POOL_IN_USE.value == SLOT
+
+def test_acquire_waits_for_a_release():
+    pool = optix.FramePool(budget_bytes=SLOT, slot_bytes=SLOT)
+    frame = pool.acquire(timeout=0)
+    threading.Timer(0.05, frame.release).start()
+    started = time.monotonic()
+    assert pool.acquire(timeout=5) is frame
+    assert time.monotonic() - started < 5
+
+def test_stage_peak_is_sampled_while_the_stage_runs():
+    memory = optix.StageMemory(interval=0.005)
+    before = memory.current_rss()
+    with memory.stage('test-allocate'):
+        block = b'\x01' * (64 * 1024 * 1024)
+        time.sleep(0.1)
+        del block
+    report = memory.report()['test-allocate']
+    # TR: Blok aşama bitmeden serbest bırakıldı; yalnızca başta/sonda ölçmek onu kaçırırdı | EN: The block was freed before the stage ended; sampling only at the edges would miss it | RU: Блок освобожден до конца этапа; замеры только на границах его бы пропустили
+    assert report['peak'] >= before + 48 * 1024 * 1024
+    assert report['rss'] < report['peak']
@@ -0,0 +1,85 @@
+"""TR: İş havuzu ve istek yaşam döngüsü testleri | EN: Job pool and request lifecycle tests | RU: Тесты пула задач и жизненного цикла запроса"""
+
+import threading
+
+import optix_smart_glasses as optix
+
+class FakeSystem:
+    def __init__(self):
+        self.request_local = threading.local()
+        self.statuses = []
+
+    def send_status(self, message):
+        self.statuses.append(message)
+
+class CountingSession(optix.BleSession):
+    """TR: finish çağrılarını say | EN: Count finish calls | RU: Считать вызовы finish"""
+
+    def __init__(self):
+        super().__init__('/org/bluez/hci0/dev_test')
+        self.finished = []
+
+    def finish(self, request):
+        self.finished.append(request.request_id)
+        super().finish(request)
+
+def handle(system, dispatcher, request, work):
+    """TR: WriteValue'nun istek yaşam döngüsü | EN: WriteValue's request lifecycle | RU: Жизненный цикл запроса в WriteValue"""
+    assert request.session.begin(request)
+    system.request_local.request = request
+    request.hold()
+    try:
+        work()
+    finally:
+        request.release()
+        system.request_local.request = None
+
+def test_job_finishing_before_handler_returns_keeps_request_open():
+    system = FakeSystem()
+    dispatcher = optix.JobDispatcher(system, workers=1)
+    session = CountingSession()
+    request = optix.CommandRequest(optix.OP_SCAN_WIFI, {}, 7, session)
+    ran = threading.Event()
+
+    def work():
+        dispatcher.submit('scan', ran.set)
+        dispatcher.executor.shutdown(wait=True)
+        # TR: İş bitti ama işleyici hâlâ çalışıyor | EN: The job is done but the handler is still running | RU: Задача завершена, но обработчик еще работает
+        assert ran.is_set() and session.finished == [] and 7 in session.in_flight
+
+    handle(system, dispatcher, request, work)
+    assert session.finished == [7] and not session.in_flight
+    assert system.statuses == ['Job 1 scan: queued', 'Job 1 scan: running', 'Job 1 scan: done']
+
+def test_request_finishes_once_after_its_last_job():
+    system = FakeSystem()
+    dispatcher = optix.JobDispatcher(system, workers=4)
+    session = CountingSession()
+    gate = threading.Event()
+    for request_id in range(50):
+        request = optix.CommandRequest(optix.OP_AUTH, {}, request_id, session)
+        handle(system, dispatcher, request, lambda: [dispatcher.submit('auth', gate.wait) for _ in range(3)])
+    assert session.finished == []
+    gate.set()
+    dispatcher.executor.shutdown(wait=True)
+    assert sorted(session.finished) == list(range(50)) and not session.in_flight
+
+def test_silent_job_is_not_tied_to_the_request():
+    system = FakeSystem()
+    dispatcher = optix.JobDispatcher(system, workers=1)
+    session = CountingSession()
+    request = optix.CommandRequest(optix.OP_AUTH, {}, 3, session)
+    gate = threading.Event()
+    handle(system, dispatcher, request, lambda: dispatcher.submit('auth-revalidate', gate.wait, silent=True))
+    assert session.finished == [3]
+    gate.set()
+    dispatcher.executor.shutdown(wait=True)
+    assert system.statuses == [] and session.finished == [3]
+
+def test_failed_job_reports_failed():
+    system = FakeSystem()
+    dispatcher = optix.JobDispatcher(system, workers=1)
+    dispatcher.submit('sync', lambda: False)
+    dispatcher.submit('scan', lambda: 1 / 0)
+    dispatcher.executor.shutdown(wait=True)
+    assert system.statuses[-1] == 'Job 2 scan: failed' and 'Job 1 sync: failed' in system.statuses
@@ -0,0 +1,72 @@
+"""TR: Metrik kaydı ve Prometheus çıktısı testleri | EN: Metrics registry and Prometheus output tests | RU: Тесты реестра метрик и вывода Prometheus"""
+
+import threading
+import urllib.error
+import urllib.request
+
+import pytest
+
+import optix_smart_glasses as optix
+
+def test_same_name_and_labels_share_one_metric():
+    registry = optix.MetricsRegistry()
+    first = registry.counter('optix_x_total', 'X', {'stage': 'send'})
+    assert registry.counter('optix_x_total', 'X', {'stage': 'send'}) is first
+    assert registry.counter('optix_x_total', 'X', {'stage': 'capture'}) is not first
+
+def test_render_prometheus_text():
+    registry = optix.MetricsRegistry()
+    registry.counter('optix_frames_total', 'Frames').inc(3)
+    registry.gauge('optix_rss_bytes', 'RSS', {'stage': 'send'}).set(42)
+    registry.gauge('optix_rss_bytes', 'RSS', {'stage': 'capture'}).set(7)
+    lines = registry.render_prometheus().splitlines()
+    assert lines[:3] == ['# HELP optix_frames_total Frames', '# TYPE optix_frames_total counter', 'optix_frames_total 3']
+    # TR: Aynı ada sahip etiketli seriler tek HELP/TYPE başlığı altında | EN: Labelled series of one name share a single HELP/TYPE header | RU: Помеченные серии одного имени под одним заголовком HELP/TYPE
+    assert lines.count('# TYPE optix_rss_bytes gauge') == 1
+    assert 'optix_rss_bytes{stage="send"} 42' in lines and 'optix_rss_bytes{stage="capture"} 7' in lines
+
+def test_histogram_buckets_are_cumulative():
+    histogram = optix.Histogram('optix_send_seconds', 'Send', buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        histogram.observe(value)
+    samples = {(name, labels.get('le')): value for name, labels, value in histogram.samples()}
+    assert samples[('optix_send_seconds_bucket', '0.1')] == 2
+    assert samples[('optix_send_seconds_bucket', '1.0')] == 3
+    assert samples[('optix_send_seconds_bucket', '+Inf')] == 4
+    assert samples[('optix_send_seconds_count', None)] == 4
+    assert samples[('optix_send_seconds_sum', None)] == pytest.approx(3.65)
+    assert histogram.mean() == pytest.approx(3.65 / 4)
+
+def test_histogram_time_observes_the_block():
+    histogram = optix.Histogram('optix_capture_seconds', 'Capture')
+    with histogram.time():
+        pass
+    assert histogram.count == 1 and histogram.sum >= 0
+
+def test_gauge_callback_failure_keeps_last_value():
+    values = iter([51.5])
+    gauge = optix.Gauge('optix_cpu_temperature_celsius', 'Temp', callback=lambda: next(values))
+    assert gauge.samples()[0][2] == 51.5
+    assert gauge.samples()[0][2] == 51.5
+
+def test_summary_fits_one_status_line(monkeypatch):
+    monkeypatch.setattr(optix, 'read_cpu_temperature', lambda: 48.25)
+    summary = optix.metrics_summary()
+    assert summary.startswith('M cap=') and summary.endswith('t=48.2')
+    assert len(summary.encode()) < 200
+
+def test_metrics_endpoint():
+    server = optix.ThreadingHTTPServer(('127.0.0.1', 0), optix.MetricsRequestHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f'http://127.0.0.1:{server.server_address[1]}'
+    try:
+        with urllib.request.urlopen(base + '/metrics', timeout=5) as response:
+            body = response.read().decode()
+            assert response.headers['Content-Type'].startswith('text/plain; version=0.0.4')
+        assert '# TYPE optix_frames_sent_total counter' in body
+        with pytest.raises(urllib.error.HTTPError) as error:
+            urllib.request.urlopen(base + '/other', timeout=5)
+        assert error.value.code == 404
+    finally:
+        server.shutdown()
+        server.server_close()
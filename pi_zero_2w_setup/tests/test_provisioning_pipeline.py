@@ -0,0 +1,190 @@
+"""TR: Ağ kurulum durum makinesi testleri | EN: Provisioning state machine tests | RU: Тесты конечного автомата настройки сети"""
+
+import threading
+import time
+
+import pytest
+
+import optix_smart_glasses as optix
+import wifi_provisioning
+
+class FakeJobs:
+    """TR: İşleri hemen bu thread'de çalıştır | EN: Run jobs right away on this thread | RU: Выполнять задачи сразу в этом потоке"""
+
+    def __init__(self):
+        self.submitted = []
+
+    def submit(self, kind, func, *args, silent=False):
+        self.submitted.append((kind, silent))
+        func(*args)
+        return len(self.submitted)
+
+class FakeSystem:
+    def __init__(self):
+        self.statuses = []
+        self.jobs = FakeJobs()
+
+    def send_status(self, message):
+        self.statuses.append(message)
+
+def pipeline():
+    system = FakeSystem()
+    return optix.ProvisioningPipeline(system), system
+
+def run_steps(pipeline, attempt):
+    with pipeline.step(attempt, 'parse'):
+        pass
+    return True
+
+def test_roam_attempts_stay_off_status(monkeypatch):
+    provisioning, system = pipeline()
+    monkeypatch.setattr(provisioning, '_run', lambda attempt: run_steps(provisioning, attempt))
+    provisioning.submit('Home', '0' * 64, 'roam', silent=True)
+    assert system.jobs.submitted == [('roam', True)]
+    assert system.statuses == []
+
+def test_client_attempts_report_progress(monkeypatch):
+    provisioning, system = pipeline()
+    monkeypatch.setattr(provisioning, '_run', lambda attempt: run_steps(provisioning, attempt))
+    provisioning.submit('Home', 'password1')
+    assert system.jobs.submitted == [('wifi', False)]
+    assert system.statuses == ['Provisioning: parse']
+
+class FakeStore:
+    def __init__(self):
+        self.remembered = []
+
+    def remember(self, ssid, psk):
+        self.remembered.append(ssid)
+
+class ConnectingSystem(FakeSystem):
+    """TR: Tam bir deneme için gereken daemon yüzeyi | EN: The daemon surface a full attempt needs | RU: Поверхность демона, нужная для полной попытки"""
+
+    def __init__(self):
+        super().__init__()
+        self.credential_store = FakeStore()
+        self.streams = 0
+
+    def start_camera_streaming(self):
+        self.streams += 1
+
+class FakeProvisioner:
+    """TR: Adımları kaydeden WpaProvisioner; associate davranışı ayarlanır | EN: WpaProvisioner that records steps; associate behaviour is configurable | RU: WpaProvisioner, записывающий шаги; поведение associate настраивается"""
+
+    associate_with = staticmethod(lambda cancelled: 'CTRL-EVENT-CONNECTED')
+    log = []
+
+    def __init__(self, ssid, psk):
+        self.ssid = ssid
+
+    def configure(self):
+        FakeProvisioner.log.append(('configure', self.ssid))
+
+    def associate(self, cancelled):
+        return FakeProvisioner.associate_with(cancelled)
+
+    def commit(self):
+        FakeProvisioner.log.append(('commit', self.ssid))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        FakeProvisioner.log.append(('close', self.ssid))
+
+def connecting(monkeypatch, associate=None, address=lambda cancelled: '192.168.1.20', reachable=True):
+    FakeProvisioner.log = []
+    FakeProvisioner.associate_with = staticmethod(associate or (lambda cancelled: 'CTRL-EVENT-CONNECTED'))
+    monkeypatch.setattr(optix, 'WpaProvisioner', FakeProvisioner)
+    monkeypatch.setattr(optix.WpaCtrl, 'available', staticmethod(lambda: True))
+    monkeypatch.setattr(optix, 'wait_for_address', address)
+    system = ConnectingSystem()
+    provisioning = optix.ProvisioningPipeline(system)
+    monkeypatch.setattr(provisioning, '_check_connectivity', lambda: reachable)
+    return provisioning, system
+
+def test_successful_attempt_walks_every_step(monkeypatch):
+    provisioning, system = connecting(monkeypatch)
+    assert provisioning.run('Home', 'password1') is True
+    steps = [message.split(': ', 1)[1] for message in system.statuses[:-1]]
+    assert steps == ['parse', 'configure', 'associate', 'dhcp', 'save', 'connectivity', 'stream']
+    assert system.statuses[-1].startswith('Provisioning Complete: parse=')
+    assert FakeProvisioner.log == [('configure', 'Home'), ('commit', 'Home'), ('close', 'Home')]
+    assert system.credential_store.remembered == ['Home'] and system.streams == 1
+
+def test_unreachable_server_is_not_fatal(monkeypatch):
+    provisioning, system = connecting(monkeypatch, reachable=False)
+    assert provisioning.run('Home', 'password1') is True
+    assert system.statuses[-1].endswith(' server=unreachable')
+
+def test_association_timeout_fails_the_associate_step(monkeypatch):
+    def never(cancelled):
+        raise OSError('no association within 20s')
+    provisioning, system = connecting(monkeypatch, associate=never)
+    failures = optix.WIFI_PROVISION_FAILURES.value
+    assert provisioning.run('Home', 'password1') is False
+    assert system.statuses[-1] == 'Provisioning Failed: associate'
+    assert ('commit', 'Home') not in FakeProvisioner.log and FakeProvisioner.log[-1] == ('close', 'Home')
+    assert optix.WIFI_PROVISION_FAILURES.value == failures + 1
+    assert system.credential_store.remembered == []
+
+def test_dhcp_timeout_fails_the_dhcp_step(monkeypatch):
+    monkeypatch.setattr(wifi_provisioning, 'interface_ipv4', lambda iface=None: None)
+    provisioning, system = connecting(monkeypatch,
+                                      address=lambda cancelled: wifi_provisioning.wait_for_address(cancelled, 0.2))
+    started = time.monotonic()
+    assert provisioning.run('Home', 'password1') is False
+    assert system.statuses[-1] == 'Provisioning Failed: dhcp'
+    assert time.monotonic() - started < 2
+
+def test_bad_passphrase_fails_at_parse(monkeypatch):
+    provisioning, system = connecting(monkeypatch)
+    assert provisioning.run('Home', 'short') is False
+    assert system.statuses == ['Provisioning: parse', 'Provisioning Failed: parse']
+
+def test_newer_credentials_cancel_the_attempt_in_flight(monkeypatch):
+    associating = threading.Event()
+
+    def wait_until_cancelled(cancelled):
+        if FakeProvisioner.log[-1] == ('configure', 'Home'):
+            associating.set()
+            cancelled.wait(5)
+            return None
+        return 'CTRL-EVENT-CONNECTED'
+
+    provisioning, system = connecting(monkeypatch, associate=wait_until_cancelled)
+    results = []
+    first = threading.Thread(target=lambda: results.append(provisioning.run('Home', 'password1')))
+    first.start()
+    assert associating.wait(5)
+    # TR: Çalışan boşaltıcıya katılır; sonucu o thread'de belli olur | EN: Merged into the running drainer; its result is settled on that thread | RU: Объединяется с текущим обработчиком; результат определяется в том потоке
+    assert provisioning.run('Office', 'password2') is None
+    first.join(5)
+    assert results == [False]
+    assert 'Provisioning Cancelled' in system.statuses
+    assert system.statuses[-1].startswith('Provisioning Complete')
+    assert system.credential_store.remembered == ['Office']
+
+def test_real_associate_times_out(monkeypatch):
+    class SilentCtrl:
+        def __init__(self, *args, **kwargs):
+            pass
+
+        def command(self, command):
+            return 'OK'
+
+        def wait_event(self, markers, timeout):
+            time.sleep(timeout)
+            return None
+
+        def close(self):
+            pass
+
+    monkeypatch.setattr(wifi_provisioning, 'WpaCtrl', SilentCtrl)
+    wpa = wifi_provisioning.WpaProvisioner('Home', '0' * 64)
+    wpa.network_id = '1'
+    with pytest.raises(OSError, match='no association within 0.3s'):
+        wpa.associate(threading.Event(), timeout=0.3)
+    cancelled = threading.Event()
+    cancelled.set()
+    assert wpa.associate(cancelled, timeout=5) is None
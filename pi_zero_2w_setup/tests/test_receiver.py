@@ -0,0 +1,58 @@
+"""TR: Alıcı aşama hata yolu testleri | EN: Receiver stage error-path tests | RU: Тесты путей ошибок стадий приемника"""
+
+import multiprocessing
+import socket
+import threading
+
+import optix_receiver
+
+class PickyStage(optix_receiver.Stage):
+    """TR: 'bad' dosyasını içeren her yığında hata verir | EN: Fails on any batch that contains the 'bad' file | RU: Падает на любом пакете с файлом 'bad'"""
+
+    def process(self, items):
+        if any(item['file'] == 'bad' for item in items):
+            raise RuntimeError('boom')
+        return [dict(item, seen=True) for item in items]
+
+def test_failed_batch_is_retried_item_by_item():
+    failed = multiprocessing.Value('q', 0)
+    items = [{'file': 'a'}, {'file': 'bad'}, {'file': 'b'}]
+    survivors = optix_receiver.process_batch(PickyStage(), 'raw', items, failed)
+    assert [item['file'] for item in survivors] == ['a', 'b']
+    assert failed.value == 1
+
+def test_good_batch_counts_nothing():
+    failed = multiprocessing.Value('q', 0)
+    assert len(optix_receiver.process_batch(PickyStage(), 'raw', [{'file': 'a'}], failed)) == 1
+    assert failed.value == 0
+
+class CollectingPipeline:
+    def __init__(self, expected):
+        self.items = []
+        self.done = threading.Event()
+        self.expected = expected
+
+    def submit(self, item):
+        self.items.append(item)
+        if len(self.items) == self.expected:
+            self.done.set()
+
+def test_peers_in_the_same_millisecond_get_distinct_files(monkeypatch):
+    monkeypatch.setattr(optix_receiver.time, 'time', lambda: 1700000000.123)
+    pipeline = CollectingPipeline(4)
+    server = optix_receiver.FrameServer(('127.0.0.1', 0), pipeline, {}, 'owner')
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        clients = [socket.create_connection(server.server_address) for _ in range(2)]
+        for client in clients:
+            for _ in range(2):
+                client.sendall((3).to_bytes(4, 'big') + b'jpg')
+        assert pipeline.done.wait(5)
+        for client in clients:
+            client.close()
+    finally:
+        server.shutdown()
+        server.server_close()
+    files = [item['file'] for item in pipeline.items]
+    assert len(set(files)) == 4
+    assert all(name.startswith('image_1700000000123_127.0.0.1_') for name in files)
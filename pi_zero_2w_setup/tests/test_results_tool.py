@@ -0,0 +1,112 @@
+"""TR: Dışa aktarma sayfalama testleri | EN: Export pagination tests | RU: Тесты пагинации экспорта"""
+
+import argparse
+import hashlib
+import types
+
+import pytest
+
+import results_tool
+
+class FakeClient:
+    """TR: Sırayla sayfa döndüren istemci | EN: Client that returns queued pages | RU: Клиент, возвращающий страницы по очереди"""
+
+    def __init__(self, pages):
+        self.pages = list(pages)
+        self.calls = []
+
+    def get(self, path, params=None):
+        self.calls.append((path, params))
+        page = self.pages.pop(0) if self.pages else []
+        return types.SimpleNamespace(json=lambda: page, raise_for_status=lambda: None)
+
+LAST = {'created_by': 'u1', 'created_at': '2025-01-01T00:00:00+00:00', 'id': 'b1'}
+
+def test_keyset_within_user_has_and_bound():
+    params = results_tool.keyset_params(LAST, 'u1')
+    assert params['and'] == '(created_at.lte."2025-01-01T00:00:00+00:00")'
+    assert params['or'].startswith('(created_at.lt.')
+
+def test_keyset_across_users_has_and_bound():
+    params = results_tool.keyset_params(LAST)
+    assert params['and'] == '(created_by.gte.u1)'
+    assert params['or'].startswith('(created_by.gt.u1,')
+
+def test_stage_id_matches_sql():
+    # TR: SELECT md5('00000000-0000-0000-0000-000000000001/raw')::uuid | EN: SELECT md5('00000000-0000-0000-0000-000000000001/raw')::uuid | RU: SELECT md5('00000000-0000-0000-0000-000000000001/raw')::uuid
+    block_id = '00000000-0000-0000-0000-000000000001'
+    digest = hashlib.md5(f'{block_id}/raw'.encode()).hexdigest()
+    expected = f'{digest[:8]}-{digest[8:12]}-{digest[12:16]}-{digest[16:20]}-{digest[20:]}'
+    assert results_tool.result_stage_id(block_id, 'raw') == expected
+
+def test_expand_blocks_one_row_per_stage():
+    block = {'id': 'b1', 'created_by': 'u1', 'created_at': '2025-01-01T00:00:00+00:00', 'file': 'a.jpg',
+             'ts': 1.0, 'text_index': 2, 'confidence': 0.9, 'box': None, 'box_points': [1] * 8,
+             'variants': {'meaning_corrected': 'c', 'raw': 'a', 'character_corrected': 'b'}}
+    rows = results_tool.expand_blocks([block, dict(block, id='b2', variants={})])
+    assert [(row['text_type'], row['text']) for row in rows] == [
+        ('raw', 'a'), ('character_corrected', 'b'), ('meaning_corrected', 'c')]
+    assert rows[0]['id'] == results_tool.result_stage_id('b1', 'raw')
+    assert set(rows[0]) == set(results_tool.EXPORT_COLUMNS)
+
+def test_pages_follow_the_last_block():
+    blocks = [{'id': f'b{index}', 'created_by': 'u1', 'created_at': '2025-01-01T00:00:00+00:00',
+               'variants': {'raw': str(index)}} for index in range(3)]
+    client = FakeClient([blocks[:2], blocks[2:]])
+    pages = list(results_tool.iter_pages(client, user='u1', page_rows=2))
+    assert [len(page) for page in pages] == [2, 1]
+    assert [path for path, _ in client.calls] == ['result_blocks', 'result_blocks']
+    assert 'b1' in client.calls[1][1]['or']
+
+class FakeRpcClient:
+    """TR: RPC çağrılarını kaydeden istemci | EN: Client that records RPC calls | RU: Клиент, записывающий вызовы RPC"""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.calls = []
+
+    def rpc(self, name, payload):
+        self.calls.append((name, payload))
+        return types.SimpleNamespace(json=lambda: self.rows, raise_for_status=lambda: None)
+
+HIT = {'rank': 1.5, 'file': 'a.jpg', 'text_index': 3, 'text_type': 'raw',
+       'text': 'çok\n satırlı   metin', 'box_points': [0, 0, 10, 0, 10, 5, 0, 5]}
+
+def test_search_passes_user_query_and_limit():
+    client = FakeRpcClient([HIT])
+    assert results_tool.search_results(client, 'u1', 'metin', limit=5) == [HIT]
+    assert client.calls == [('search_results', {'p_user': 'u1', 'p_query': 'metin', 'p_limit': 5})]
+
+def test_print_hits_collapses_whitespace(capsys):
+    results_tool.print_hits([HIT, dict(HIT, text=None)])
+    lines = capsys.readouterr().out.splitlines()
+    assert lines[0].startswith(' 1.500  a.jpg#3 [raw] box=[0, 0, 10')
+    assert lines[1].strip() == 'çok satırlı metin'
+    assert lines[3].strip() == ''
+
+def test_search_main_prints_hits(monkeypatch, capsys):
+    client = FakeRpcClient([HIT])
+    client.close = lambda: None
+    monkeypatch.setattr(results_tool, 'SupabaseClient', lambda *args, **kwargs: client)
+    monkeypatch.setattr('sys.argv', ['results_tool.py', '--url', 'http://x', '--key', 'k', 'search', 'u1', 'metin'])
+    results_tool.main()
+    assert client.calls[0][1]['p_limit'] == results_tool.SEARCH_LIMIT
+    assert '1 hits in' in capsys.readouterr().err
+
+def test_parse_region():
+    assert results_tool.parse_region('1,2,30,40') == (1, 2, 30, 40)
+    for value in ('1,2,3', '1,2,3,x'):
+        with pytest.raises(argparse.ArgumentTypeError):
+            results_tool.parse_region(value)
+
+def test_region_sends_optional_filters_only_when_set():
+    client = FakeRpcClient([])
+    results_tool.results_in_region(client, 'u1', (1, 2, 30, 40))
+    results_tool.results_in_region(client, 'u1', (1, 2, 30, 40), margin=5, file='a.jpg',
+                                   text_type='raw', limit=3)
+    assert client.calls[0] == ('results_in_region', {'p_user': 'u1', 'p_x1': 1, 'p_y1': 2, 'p_x2': 30,
+                                                     'p_y2': 40, 'p_margin': 0,
+                                                     'p_limit': results_tool.SEARCH_LIMIT})
+    assert client.calls[1][1]['p_file'] == 'a.jpg'
+    assert client.calls[1][1]['p_text_type'] == 'raw'
+    assert (client.calls[1][1]['p_margin'], client.calls[1][1]['p_limit']) == (5, 3)
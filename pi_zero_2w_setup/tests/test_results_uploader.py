@@ -0,0 +1,70 @@
+"""TR: Sonuç yükleyici hata yolu testleri | EN: Results uploader error-path tests | RU: Тесты путей ошибок загрузчика результатов"""
+
+import types
+
+import results_uploader
+from results_uploader import ResultsUploader
+
+class FakeClient:
+    """TR: Sırayla durum kodları döndüren istemci | EN: Client that answers with queued status codes | RU: Клиент, отвечающий кодами из очереди"""
+
+    def __init__(self, *statuses):
+        self.statuses = list(statuses)
+        self.calls = []
+
+    def post(self, path, params=None, data=None, headers=None, idempotent=False):
+        self.calls.append(dict(headers))
+        status = self.statuses.pop(0) if self.statuses else 201
+        return types.SimpleNamespace(status_code=status, text='')
+
+ROW = {'file': 'a.jpg', 'text_index': 0, 'text_type': 'raw', 'text': 'x'}
+
+def test_compression_is_off_by_default(tmp_path):
+    client = FakeClient(201)
+    uploader = ResultsUploader(client, spool_dir=str(tmp_path))
+    uploader.add(ROW)
+    assert uploader.flush()
+    assert 'Content-Encoding' not in client.calls[0]
+
+def test_gzip_400_falls_back_to_uncompressed(tmp_path):
+    client = FakeClient(400, 201)
+    uploader = ResultsUploader(client, spool_dir=str(tmp_path), compress=True)
+    uploader.add(ROW)
+    assert uploader.flush()
+    assert [call.get('Content-Encoding') for call in client.calls] == ['gzip', None]
+    assert uploader.stats['rows'] == 1 and not uploader.rejected_files()
+
+def test_auth_errors_are_retried_not_rejected(tmp_path):
+    for status in (401, 403):
+        uploader = ResultsUploader(FakeClient(status), spool_dir=str(tmp_path / str(status)))
+        uploader.add(ROW)
+        assert not uploader.flush()
+        assert len(uploader.spooled_files()) == 1 and not uploader.rejected_files()
+        assert uploader.replay() == 1 and not uploader.spooled_files()
+
+def test_rejected_files_are_capped(tmp_path, monkeypatch):
+    monkeypatch.setattr(results_uploader, 'SPOOL_MAX_REJECTED_FILES', 3)
+    uploader = ResultsUploader(FakeClient(*[422] * 5), spool_dir=str(tmp_path))
+    for _ in range(5):
+        uploader.add(ROW)
+        assert uploader.flush()
+    assert len(uploader.rejected_files()) == 3
+    assert uploader.stats['rejected'] == 5
+
+def test_box_points_accepts_pairs_flat_and_json():
+    pairs = [[0.4, 1.6], [10, 1], [10, 5], [0, 5]]
+    assert results_uploader.box_points(pairs) == [0, 2, 10, 1, 10, 5, 0, 5]
+    assert results_uploader.box_points(list(range(8))) == list(range(8))
+    assert results_uploader.box_points('[[1,2],[3,4],[5,6],[7,8]]') == [1, 2, 3, 4, 5, 6, 7, 8]
+
+def test_box_points_rejects_malformed():
+    for box in (None, 'not json', [[1, 2], [3, 4]], [[1, 'x']] * 4, list(range(9))):
+        assert results_uploader.box_points(box) is None
+
+def test_normalize_row_adds_numeric_box_next_to_text():
+    row = results_uploader.normalize_row(dict(ROW, box=[[1, 2], [3, 4], [5, 6], [7, 8]]))
+    assert row['box'] == '[[1,2],[3,4],[5,6],[7,8]]'
+    assert row['box_points'] == [1, 2, 3, 4, 5, 6, 7, 8]
+    # TR: Geçersiz box_points atılır, sunucu tetikleyicisi box'tan türetir | EN: Malformed box_points are dropped and the server trigger derives them from box | RU: Некорректные box_points отбрасываются, серверный триггер выводит их из box
+    row = results_uploader.normalize_row(dict(ROW, box='garbage', box_points='1,2'))
+    assert 'box_points' not in row and row['box'] == 'garbage'
@@ -0,0 +1,71 @@
+"""TR: BLE oturumları ve yanıt kuyrukları testleri | EN: BLE sessions and reply outbox tests | RU: Тесты BLE-сессий и очередей ответов"""
+
+import threading
+import types
+
+import optix_smart_glasses as optix
+
+PHONE = '/org/bluez/hci0/dev_AA_BB_CC_DD_EE_FF'
+TABLET = '/org/bluez/hci0/dev_11_22_33_44_55_66'
+
+def test_sessions_are_keyed_by_device_and_track_mtu():
+    sessions = optix.SessionManager()
+    phone = sessions.get({'device': PHONE, 'mtu': 185})
+    assert sessions.get({'device': PHONE}) is phone and phone.mtu == 185
+    tablet = sessions.get({'device': TABLET, 'mtu': 64})
+    assert tablet is not phone
+    assert sessions.min_mtu() == 64
+    assert optix.SessionManager().min_mtu() == optix.ATT_DEFAULT_MTU
+
+def test_idle_sessions_are_dropped_when_a_new_one_opens(monkeypatch):
+    sessions = optix.SessionManager(idle_timeout=10)
+    now = [1000.0]
+    monkeypatch.setattr(optix.time, 'monotonic', lambda: now[0])
+    sessions.get({'device': PHONE})
+    now[0] += 11
+    sessions.get({'device': TABLET})
+    assert list(sessions.sessions) == [TABLET]
+
+def test_disconnect_signal_drops_the_session():
+    sessions = optix.SessionManager()
+    sessions.get({'device': PHONE})
+    sessions._on_device_changed(optix.DEVICE_IFACE, {'RSSI': -60}, [], path=PHONE)
+    assert PHONE in sessions.sessions
+    sessions._on_device_changed(optix.DEVICE_IFACE, {'Connected': False}, [], path=PHONE)
+    assert PHONE not in sessions.sessions
+
+def test_outbox_serves_long_reads_from_one_message():
+    session = optix.BleSession(PHONE)
+    session.push(b'first reply')
+    session.push(b'second')
+    assert session.read(0) == b'first reply'
+    assert session.read(6) == b'reply'
+    assert session.read(0) == b'second'
+    assert session.read(0) is None and session.read(3) is None
+
+def test_outbox_keeps_the_latest_replies():
+    session = optix.BleSession(PHONE)
+    for index in range(optix.SESSION_OUTBOX_SIZE + 5):
+        session.push(bytes((index,)))
+    assert session.read(0) == bytes((5,))
+
+def test_duplicate_request_id_is_rejected_until_finished():
+    session = optix.BleSession(PHONE)
+    request = optix.CommandRequest(optix.OP_SCAN_WIFI, {}, 9, session)
+    assert session.begin(request)
+    assert not session.begin(optix.CommandRequest(optix.OP_SCAN_WIFI, {}, 9, session))
+    session.finish(request)
+    assert session.begin(request)
+    # TR: Metin komutlarının kimliği yoktur | EN: Text commands carry no ID | RU: У текстовых команд нет ID
+    text = optix.CommandRequest(optix.OP_SCAN_WIFI, {}, None, session)
+    assert session.begin(text) and session.begin(text)
+
+def test_status_reply_goes_to_the_requesting_session():
+    phone, tablet = optix.BleSession(PHONE), optix.BleSession(TABLET)
+    emitted = []
+    system = types.SimpleNamespace(request_local=threading.local(), ble_thread=None, _emit_status=emitted.append)
+    system.request_local.request = optix.CommandRequest(optix.OP_GET_SERIAL, {}, 4, phone)
+    optix.OptixSystem.send_status(system, 'Serial: X1')
+    reply = optix.decode_command(phone.read(0))
+    assert (reply.opcode, reply.request_id, reply.fields['message']) == (optix.OP_STATUS, 4, 'Serial: X1')
+    assert tablet.read(0) is None and emitted == [phone.read_value]
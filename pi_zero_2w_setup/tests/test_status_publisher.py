@@ -0,0 +1,82 @@
+"""TR: Durum yayıncısı hız sınırı testleri | EN: Status publisher pacing tests | RU: Тесты темпа публикатора статусов"""
+
+import optix_smart_glasses as optix
+
+class FakeGLib:
+    """TR: Zamanlayıcıları çalıştırmadan biriktir | EN: Collect timers without running them | RU: Накапливать таймеры, не запуская их"""
+
+    def __init__(self):
+        self.timers = []
+
+    def idle_add(self, func, *args):
+        self.timers.append((func, args))
+
+    def timeout_add(self, delay_ms, func, *args):
+        self.timers.append((func, args))
+
+    def run_next(self):
+        func, args = self.timers.pop(0)
+        return func(*args)
+
+def publisher(monkeypatch, fragments_per_message: int):
+    glib = FakeGLib()
+    monkeypatch.setattr(optix, 'GLib', glib, raising=False)
+    sent = []
+    packetize = lambda message: [message + bytes((index,)) for index in range(fragments_per_message)]
+    status = optix.StatusPublisher(packetize, sent.append, packets_per_interval=4)
+    return status, glib, sent
+
+def test_long_message_is_paced_per_fragment(monkeypatch):
+    status, glib, sent = publisher(monkeypatch, 10)
+    status.publish('Serial: x', b'S')
+    glib.run_next()  # idle -> schedule
+    glib.run_next()  # first flush
+    assert len(sent) == 4
+    glib.run_next()
+    assert len(sent) == 8
+    glib.run_next()
+    assert sent == [b'S' + bytes((index,)) for index in range(10)]
+    assert not glib.timers and not status.scheduled
+
+def test_next_message_waits_for_remaining_fragments(monkeypatch):
+    status, glib, sent = publisher(monkeypatch, 3)
+    status.publish('Serial: a', b'A')
+    status.publish('Serial: b', b'B')
+    glib.run_next()
+    glib.run_next()
+    assert sent == [b'A\x00', b'A\x01', b'A\x02', b'B\x00']
+    glib.run_next()
+    assert sent[4:] == [b'B\x01', b'B\x02']
+    assert not status.scheduled
+
+def test_empty_packetize_skips_message(monkeypatch):
+    status, glib, sent = publisher(monkeypatch, 0)
+    status.publish('Serial: a', b'A')
+    glib.run_next()
+    glib.run_next()
+    assert sent == [] and not status.scheduled and not glib.timers
+
+def test_status_keys():
+    assert optix.status_key('Provisioning: Associating') == ('Provisioning', False)
+    assert optix.status_key('Provisioning Complete: home') == ('Provisioning', True)
+    assert optix.status_key('Provisioning Failed: timeout') == ('Provisioning', True)
+    assert optix.status_key('Provisioning Cancelled') == ('Provisioning', True)
+    assert optix.status_key('Job 3 sync: done') == ('Job 3', True)
+    assert optix.status_key('Serial: x') == (None, True)
+
+def test_terminal_supersedes_pending_progress(monkeypatch):
+    status, glib, sent = publisher(monkeypatch, 1)
+    status.publish('Provisioning: Associating', b'P')
+    status.publish('Provisioning Complete: home', b'C')
+    glib.run_next()
+    glib.run_next()
+    assert sent == [b'C\x00']
+    assert not status.scheduled
+
+def test_progress_after_terminal_keeps_order(monkeypatch):
+    status, glib, sent = publisher(monkeypatch, 1)
+    status.publish('Provisioning Failed: timeout', b'F')
+    status.publish('Provisioning: Scanning', b'S')
+    glib.run_next()
+    glib.run_next()
+    assert sent == [b'F\x00', b'S\x00']
@@ -0,0 +1,104 @@
+"""TR: Ortak Supabase istemcisi süre sınırı ve geri çekilme testleri | EN: Shared Supabase client deadline and backoff tests | RU: Тесты дедлайна и задержек общего клиента Supabase"""
+
+import types
+
+import pytest
+import requests
+
+import supabase_client
+
+def response(status, headers=None):
+    return types.SimpleNamespace(status_code=status, headers=headers or {})
+
+@pytest.fixture
+def client(monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(supabase_client.time, 'sleep', sleeps.append)
+    monkeypatch.setattr(supabase_client.random, 'uniform', lambda low, high: 1.0)
+    observed = []
+    client = supabase_client.SupabaseClient('https://example.supabase.co/', 'anon',
+                                            observer=lambda *args: observed.append(args))
+    client.sleeps, client.observed, client.calls = sleeps, observed, []
+
+    def reply_with(*outcomes):
+        outcomes = list(outcomes)
+
+        def fake_request(method, url, timeout=None, **kwargs):
+            client.calls.append((method, url, timeout, kwargs))
+            outcome = outcomes.pop(0)
+            if isinstance(outcome, Exception):
+                raise outcome
+            return outcome
+        monkeypatch.setattr(client.session, 'request', fake_request)
+
+    client.reply_with = reply_with
+    yield client
+    client.close()
+
+def test_session_is_set_up_once(client):
+    assert client.session.headers['apikey'] == 'anon'
+    assert client.session.headers['Authorization'] == 'Bearer anon'
+    adapter = client.session.get_adapter('https://example.supabase.co')
+    assert adapter.max_retries.total == 0
+
+def test_idempotent_call_is_retried_with_backoff(client):
+    client.reply_with(response(503), requests.ConnectionError('reset'), response(200))
+    assert client.get('users', params={'select': 'id'}).status_code == 200
+    assert [call[1] for call in client.calls] == ['https://example.supabase.co/rest/v1/users'] * 3
+    assert client.sleeps == [supabase_client.BACKOFF_SEC, supabase_client.BACKOFF_SEC * 2]
+    assert [args[2] for args in client.observed] == [503, 'error', 200]
+
+def test_non_idempotent_call_is_not_retried(client):
+    client.reply_with(response(503))
+    assert client.post('users', json={}).status_code == 503
+    client.reply_with(requests.ConnectionError('reset'))
+    with pytest.raises(requests.ConnectionError):
+        client.patch('users', json={})
+    assert len(client.calls) == 2 and client.sleeps == []
+
+def test_rpc_can_opt_into_retries(client):
+    client.reply_with(response(502), response(200))
+    assert client.rpc('register_device_user', {'p_device_id': 'x'}, idempotent=True).status_code == 200
+    method, url, _, kwargs = client.calls[0]
+    assert (method, url) == ('POST', 'https://example.supabase.co/rest/v1/rpc/register_device_user')
+    assert kwargs['json'] == {'p_device_id': 'x'}
+
+def test_last_retryable_response_is_returned(client):
+    client.reply_with(*(response(503) for _ in range(supabase_client.RETRIES + 1)))
+    assert client.get('users').status_code == 503
+    assert len(client.calls) == supabase_client.RETRIES + 1
+
+def test_backoff_that_would_pass_the_deadline_stops_retrying(client):
+    client.reply_with(response(429, {'Retry-After': '30'}))
+    assert client.get('users', deadline=5).status_code == 429
+    assert len(client.calls) == 1 and client.sleeps == []
+    client.reply_with(requests.Timeout('read'))
+    with pytest.raises(requests.Timeout):
+        client.get('users', deadline=0.1)
+
+def test_retry_after_is_honoured(client):
+    client.reply_with(response(429, {'Retry-After': '2'}), response(200))
+    assert client.get('users').status_code == 200
+    assert client.sleeps == [2.0]
+
+def test_timeouts_are_capped_by_the_deadline(client):
+    client.reply_with(response(200))
+    client.get('users', deadline=1.0)
+    connect, read = client.calls[0][2]
+    assert connect <= 1.0 and read <= 1.0
+    client.reply_with(response(200))
+    client.get('users')
+    assert client.calls[1][2] == pytest.approx((supabase_client.CONNECT_TIMEOUT_SEC, supabase_client.READ_TIMEOUT_SEC), abs=0.01)
+
+def test_spent_deadline_raises_before_sending(client, monkeypatch):
+    clock = iter([100.0, 200.0])
+    monkeypatch.setattr(supabase_client.time, 'monotonic', lambda: next(clock))
+    client.reply_with()
+    with pytest.raises(requests.Timeout, match='deadline exceeded'):
+        client.get('users', deadline=1.0)
+    assert client.calls == []
+
+def test_observer_failure_does_not_break_the_call(client):
+    client.observer = lambda *args: 1 / 0
+    client.reply_with(response(200))
+    assert client.get('users').status_code == 200
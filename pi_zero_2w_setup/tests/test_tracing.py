@@ -0,0 +1,74 @@
+"""TR: İz halkası ve örnekleyici profilleyici testleri | EN: Trace ring and sampling profiler tests | RU: Тесты буфера трассировки и сэмплирующего профилировщика"""
+
+import json
+import threading
+
+import pytest
+
+import optix_smart_glasses as optix
+
+def test_span_records_duration_thread_and_args():
+    trace = optix.TraceBuffer()
+    with trace.span('camera.capture', profile='quality'):
+        pass
+    name, start, duration, tid, args = trace.events[0]
+    assert name == 'camera.capture' and duration >= 0
+    assert tid == threading.get_ident() and args == {'profile': 'quality'}
+
+def test_span_is_recorded_when_the_block_raises():
+    trace = optix.TraceBuffer()
+    with pytest.raises(RuntimeError):
+        with trace.span('stream.send'):
+            raise RuntimeError('boom')
+    assert [event[0] for event in trace.events] == ['stream.send']
+
+def test_ring_keeps_only_the_latest_spans():
+    trace = optix.TraceBuffer(size=3)
+    for index in range(5):
+        with trace.span(f'span{index}'):
+            pass
+    assert [event[0] for event in trace.events] == ['span2', 'span3', 'span4']
+
+def test_traced_keeps_function_metadata_and_result():
+    trace = optix.TraceBuffer()
+
+    @trace.traced('supabase.auth')
+    def authenticate(user):
+        """doc"""
+        return f'ok {user}'
+
+    assert authenticate('ada') == 'ok ada'
+    assert authenticate.__name__ == 'authenticate' and authenticate.__doc__ == 'doc'
+    assert trace.events[0][0] == 'supabase.auth'
+
+def test_chrome_trace_dump(tmp_path):
+    trace = optix.TraceBuffer()
+    with trace.span('gatt.write', opcode=1):
+        pass
+    path = trace.dump(str(tmp_path))
+    with open(path) as f:
+        data = json.load(f)
+    event, = data['traceEvents']
+    assert event['name'] == 'gatt.write' and event['ph'] == 'X' and event['pid'] == trace.pid
+    assert event['args'] == {'opcode': '1'} and event['dur'] >= 0
+    assert trace.dump(str(tmp_path / 'missing')) is None
+
+def busy(stop):
+    while not stop.is_set():
+        sum(range(100))
+
+def test_profiler_writes_folded_stacks(tmp_path):
+    profiler = optix.SamplingProfiler(interval=0.005)
+    stop = threading.Event()
+    worker = threading.Thread(target=busy, args=(stop,), daemon=True)
+    worker.start()
+    try:
+        assert profiler.start(0.1, str(tmp_path))
+        assert not profiler.start(0.1, str(tmp_path))
+        profiler.thread.join(5)
+    finally:
+        stop.set()
+    folded, = tmp_path.glob('optix_profile_*.folded')
+    lines = folded.read_text().splitlines()
+    assert any('busy (test_tracing.py:' in line for line in lines)
+    assert all(line.rsplit(' ', 1)[1].isdigit() for line in lines)
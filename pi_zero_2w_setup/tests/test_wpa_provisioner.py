@@ -0,0 +1,100 @@
+"""TR: wpa_supplicant ağ ekleme adımları testleri | EN: wpa_supplicant provisioning step tests | RU: Тесты шагов настройки сети через wpa_supplicant"""
+
+import threading
+
+import pytest
+
+import wifi_provisioning
+
+class FakeCtrl:
+    """TR: Komutları kaydeden kontrol soketi | EN: Control socket that records commands | RU: Управляющий сокет, записывающий команды"""
+
+    networks = ''
+    log = []
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def request(self, command):
+        FakeCtrl.log.append(command)
+        return FakeCtrl.networks if command == 'LIST_NETWORKS' else 'OK'
+
+    def command(self, command):
+        self.request(command)
+        return '9' if command == 'ADD_NETWORK' else 'OK'
+
+    def attach(self):
+        pass
+
+    def close(self):
+        pass
+
+def provisioner(monkeypatch, ssid, networks):
+    monkeypatch.setattr(wifi_provisioning, 'WpaCtrl', FakeCtrl)
+    FakeCtrl.networks = 'network id / ssid / bssid / flags\n' + networks
+    FakeCtrl.log = []
+    return wifi_provisioning.WpaProvisioner(ssid, '0' * 64)
+
+def test_ssid_text_matches_wpa_escaping():
+    assert wifi_provisioning.wpa_ssid_text('Ev') == 'Ev'
+    assert wifi_provisioning.wpa_ssid_text('Çay "5G"\\') == '\\xc3\\x87ay \\"5G\\"\\\\'
+
+def test_stale_entries_are_removed_only_on_commit(monkeypatch):
+    wpa = provisioner(monkeypatch, 'Çay', '0\tHome\tany\t\n1\t\\xc3\\x87ay\tany\t[DISABLED]\n2\tÇay\tany\t\n')
+    wpa.configure()
+    assert not any(command.startswith('REMOVE_NETWORK') for command in FakeCtrl.log)
+    wpa.commit()
+    assert 'REMOVE_NETWORK 1' in FakeCtrl.log
+    assert 'REMOVE_NETWORK 2' not in FakeCtrl.log and 'REMOVE_NETWORK 0' not in FakeCtrl.log
+    assert FakeCtrl.log[-1] == 'SAVE_CONFIG'
+
+def test_rollback_keeps_stale_entries(monkeypatch):
+    wpa = provisioner(monkeypatch, 'Home', '0\tHome\tany\t\n')
+    wpa.configure()
+    wpa.close()
+    assert [command for command in FakeCtrl.log if command.startswith('REMOVE_NETWORK')] == ['REMOVE_NETWORK 9']
+    assert 'SAVE_CONFIG' not in FakeCtrl.log
+
+class FakeMonitor(FakeCtrl):
+    """TR: Sıradaki olayları döndüren izleme soketi | EN: Monitor socket that returns queued events | RU: Сокет мониторинга, возвращающий события из очереди"""
+
+    events = []
+
+    def wait_event(self, markers, timeout):
+        return FakeMonitor.events.pop(0) if FakeMonitor.events else None
+
+def associating(monkeypatch, events):
+    wpa = provisioner(monkeypatch, 'Home', '')
+    wpa.monitor = FakeMonitor()
+    FakeMonitor.events = list(events)
+    wpa.configure()
+    return wpa
+
+def test_event_network_id():
+    assert wifi_provisioning.event_network_id('<3>CTRL-EVENT-CONNECTED - Connection to aa completed [id=9 id_str=]') == '9'
+    assert wifi_provisioning.event_network_id('<3>CTRL-EVENT-SSID-TEMP-DISABLED id=2 ssid="x" reason=WRONG_KEY') == '2'
+    assert wifi_provisioning.event_network_id('<3>CTRL-EVENT-CONNECTED - Connection to aa completed') is None
+
+def test_connect_event_for_another_network_is_ignored(monkeypatch):
+    wpa = associating(monkeypatch, [
+        '<3>CTRL-EVENT-CONNECTED - Connection to aa completed [id=0 id_str=]',
+        '<3>CTRL-EVENT-SSID-TEMP-DISABLED id=0 ssid="Old" auth_failures=1 reason=WRONG_KEY',
+        '<3>CTRL-EVENT-CONNECTED - Connection to bb completed [id=9 id_str=]',
+    ])
+    event = wpa.associate(threading.Event(), timeout=5)
+    assert '[id=9 ' in event and not FakeMonitor.events
+
+def test_wrong_key_for_the_new_network_fails(monkeypatch):
+    wpa = associating(monkeypatch, ['<3>CTRL-EVENT-SSID-TEMP-DISABLED id=9 ssid="Home" auth_failures=1 reason=WRONG_KEY'])
+    with pytest.raises(OSError, match='wrong password'):
+        wpa.associate(threading.Event(), timeout=5)
+
+def test_credentials_file_has_one_owner(monkeypatch, tmp_path):
+    monkeypatch.setattr(wifi_provisioning, 'CREDENTIALS_OWNER_LOCK', str(tmp_path / 'owner.lock'))
+    owner = wifi_provisioning.claim_credentials_file()
+    assert owner is not None
+    assert wifi_provisioning.claim_credentials_file() is None
+    owner.close()
+    other = wifi_provisioning.claim_credentials_file()
+    assert other is not None
+    other.close()
@@ -4,169 +4,87 @@ TR: WiFi kimlik bilgisi dosyası izleyici | EN: WiFi credentials file watcher |
 TR: /tmp/wifi_credentials.json dosyasını izleyip WiFi'yi yapılandırır | EN: Monitors /tmp/wifi_credentials.json and configures WiFi | RU: Следит за /tmp/wifi_credentials.json и настраивает WiFi
 """
 
-import json
 import logging
 import os
-import subprocess
+import threading
 import time
 from pathlib import Path
 from watchdog.observers import Observer
 from watchdog.events import FileSystemEventHandler
 
+# TR: Daemon ile aynı PSK türetme, tekrar temizleme ve geri alma adımları | EN: Same PSK derivation, dedupe and rollback steps as the daemon | RU: Те же шаги вычисления PSK, удаления дубликатов и отката, что и в демоне
+from wifi_provisioning import (WIFI_CREDENTIALS_DIGEST, WIFI_CREDENTIALS_FILE, CredentialsDigest, WpaProvisioner,
+                               claim_credentials_file, read_credentials_file, wait_for_address, wpa_psk)
+
 logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - %(levelname)s - [WiFi Watcher] - %(message)s'
 )
 logger = logging.getLogger('WiFiWatcher')
 
-WIFI_CREDENTIALS_FILE = '/tmp/wifi_credentials.json'
-WPA_SUPPLICANT_CONF = '/etc/wpa_supplicant/wpa_supplicant.conf'
-LAST_PROCESSED_HASH = '/tmp/wifi_credentials_last_hash.txt'
+CONNECT_TIMEOUT_SEC = 30
+DEBOUNCE_SEC = 0.05
 
 
 class WiFiCredentialsHandler(FileSystemEventHandler):
-    """TR: WiFi kimlik bilgisi dosya değişikliklerini işle | EN: Handle WiFi credentials file changes | RU: Обрабатывай изменения файла учетных данных WiFi"""
+    """TR: WiFi kimlik bilgisi dosyasının yazılıp kapatılmasını / atomik taşınmasını işle | EN: Handle close-after-write / atomic rename of the WiFi credentials file | RU: Обрабатывай закрытие после записи / атомарное переименование файла учетных данных WiFi"""
     
     def __init__(self):
-        self.last_hash = self._get_file_hash()
+        self.digest = CredentialsDigest(WIFI_CREDENTIALS_DIGEST)
+        self.timer = None
+        self.lock = threading.Lock()
         logger.info(f"📁 Watching {WIFI_CREDENTIALS_FILE}")
     
-    def _get_file_hash(self):
-        """TR: Değişikliği tespit etmek için dosya hash'ini al | EN: Get file hash to detect changes | RU: Получить хеш файла для обнаружения изменений"""
-        try:
-            if os.path.exists(WIFI_CREDENTIALS_FILE):
-                with open(WIFI_CREDENTIALS_FILE, 'r') as f:
-                    content = f.read()
-                    return hash(content)
-        except Exception as e:
-            logger.debug(f"Error getting file hash: {e}")
-        return None
-    
-    def _read_credentials(self):
-        """TR: WiFi kimlik bilgilerini dosyadan oku | EN: Read WiFi credentials from file | RU: Прочитать учетные данные WiFi из файла"""
-        try:
-            if not os.path.exists(WIFI_CREDENTIALS_FILE):
-                return None
-            
-            with open(WIFI_CREDENTIALS_FILE, 'r') as f:
-                data = json.load(f)
-                return {
-                    'ssid': data.get('ssid', ''),
-                    'password': data.get('password', ''),
-                    'timestamp': data.get('timestamp', '')
-                }
-        except Exception as e:
-            logger.error(f"Error reading credentials: {e}")
-            return None
-    
     def _configure_wifi(self, ssid, password):
-        """TR: wpa_supplicant kullanarak WiFi yapılandır | EN: Configure WiFi using wpa_supplicant | RU: Настроить WiFi с помощью wpa_supplicant"""
+        """TR: wpa_supplicant kontrol soketiyle WiFi yapılandır (servis yeniden başlatmadan) | EN: Configure WiFi through the wpa_supplicant control socket (no service restarts) | RU: Настроить WiFi через управляющий сокет wpa_supplicant (без перезапуска служб)"""
         try:
-            logger.info(f"Configuring WiFi for SSID: {ssid}")
-            
-            # TR: wpa_supplicant yapılandırmasını oluştur | EN: Create wpa_supplicant configuration | RU: Создай конфиг wpa_supplicant
-            config = f"""country=TR
-ctrl_interface=DIR=/var/run/wpa_supplicant GROUP=netdev
-update_config=1
-
-network={{
-    ssid="{ssid}"
-    psk="{password}"
-    key_mgmt=WPA-PSK
-}}
-"""
-            # TR: Geçici dosyaya yaz | EN: Write to temporary file | RU: Запиши во временный файл
-            temp_config = '/tmp/wpa_supplicant_new.conf'
-            with open(temp_config, 'w') as f:
-                f.write(config)
-            
-            # TR: Sisteme sudo ile kopyala | EN: Copy to system location with sudo | RU: Скопируй в системный путь через sudo
-            result = subprocess.run(
-                ['sudo', 'cp', temp_config, WPA_SUPPLICANT_CONF],
-                capture_output=True,
-                text=True,
-                timeout=10
-            )
-            
-            if result.returncode != 0:
-                logger.error(f"Failed to copy config: {result.stderr}")
-                return False
-            
-            # TR: Ağ servislerini yeniden başlat | EN: Restart networking | RU: Перезапусти сетевые службы
-            logger.info("Restarting networking...")
-            result = subprocess.run(
-                ['sudo', 'systemctl', 'restart', 'dhcpcd'],
-                capture_output=True,
-                text=True,
-                timeout=10
-            )
-            
-            if result.returncode != 0:
-                logger.warning(f"dhcpcd restart warning: {result.stderr}")
-            
-            # TR: wpa_supplicant'ı da yeniden başlat | EN: Also restart wpa_supplicant | RU: Перезапусти wpa_supplicant
-            result = subprocess.run(
-                ['sudo', 'systemctl', 'restart', 'wpa_supplicant'],
-                capture_output=True,
-                text=True,
-                timeout=10
-            )
-            
-            logger.info("WiFi configuration applied")
-            
-            # TR: Bekle ve bağlantıyı kontrol et | EN: Wait and check connection | RU: Подожди и проверь подключение
-            time.sleep(5)
-            if self._check_wifi_connection(ssid):
-                logger.info(f"WiFi connected to {ssid}")
-                return True
-            else:
-                logger.warning(f"WiFi connection to {ssid} not confirmed")
-                return False
-                
-        except Exception as e:
-            logger.error(f"WiFi configuration error: {e}")
+            psk = wpa_psk(ssid, password)
+        except ValueError as e:
+            logger.error(f"Invalid WiFi password for {ssid}: {e}")
             return False
-    
-    def _check_wifi_connection(self, ssid):
-        """TR: WiFi verilen SSID'ye bağlı mı kontrol et | EN: Check if WiFi is connected to given SSID | RU: Проверить, подключен ли WiFi к данному SSID"""
+        logger.info(f"Configuring WiFi for SSID: {ssid}")
+        started = time.monotonic()
+        never_cancelled = threading.Event()
         try:
-            result = subprocess.run(
-                ['iwgetid'],
-                capture_output=True,
-                text=True,
-                timeout=5
-            )
-            if result.returncode == 0 and ssid in result.stdout:
-                return True
-        except Exception:
-            pass
-        return False
+            # TR: Başarısızlıkta yeni ağ kaldırılır, diğerleri yeniden etkinleşir | EN: On failure the new network is removed and the others re-enabled | RU: При ошибке новая сеть удаляется, остальные снова включаются
+            with WpaProvisioner(ssid, psk) as wpa:
+                wpa.configure()
+                # TR: Yoklama yerine CTRL-EVENT-CONNECTED olayını bekle | EN: Wait for CTRL-EVENT-CONNECTED instead of polling | RU: Ждать событие CTRL-EVENT-CONNECTED вместо опроса
+                wpa.associate(never_cancelled, CONNECT_TIMEOUT_SEC)
+                remaining = max(1.0, CONNECT_TIMEOUT_SEC - (time.monotonic() - started))
+                address = wait_for_address(never_cancelled, remaining)
+                wpa.commit()
+        except Exception as e:
+            logger.error(f"WiFi configuration error for {ssid}: {e}")
+            return False
+        logger.info(f"WiFi connected to {ssid} ({address}) in {time.monotonic() - started:.1f}s")
+        return True
     
-    def on_modified(self, event):
-        """TR: Dosya değişikliğini işle | EN: Handle file modification | RU: Обработать изменение файла"""
+    def on_closed(self, event):
+        """TR: IN_CLOSE_WRITE: yazan dosyayı kapattı | EN: IN_CLOSE_WRITE: the writer closed the file | RU: IN_CLOSE_WRITE: писатель закрыл файл"""
         if event.src_path == WIFI_CREDENTIALS_FILE:
-            logger.info("WiFi credentials file modified")
-            self._process_credentials()
+            self._schedule()
     
-    def on_created(self, event):
-        """TR: Dosya oluşturulmasını işle | EN: Handle file creation | RU: Обработать создание файла"""
-        if event.src_path == WIFI_CREDENTIALS_FILE:
-            logger.info("WiFi credentials file created")
-            self._process_credentials()
+    def on_moved(self, event):
+        """TR: IN_MOVED_TO: geçici dosya hedefe taşındı (atomik yazma) | EN: IN_MOVED_TO: a temp file was renamed onto the target (atomic write) | RU: IN_MOVED_TO: временный файл переименован в целевой (атомарная запись)"""
+        if event.dest_path == WIFI_CREDENTIALS_FILE:
+            self._schedule()
+    
+    def _schedule(self):
+        # TR: Art arda gelen olayları tek işleme indir | EN: Collapse bursts of events into one run | RU: Сводить серию событий к одному запуску
+        with self.lock:
+            if self.timer:
+                self.timer.cancel()
+            self.timer = threading.Timer(DEBOUNCE_SEC, self._process_credentials)
+            self.timer.daemon = True
+            self.timer.start()
     
     def _process_credentials(self):
         """TR: Dosyadan WiFi kimlik bilgilerini işle | EN: Process WiFi credentials from file | RU: Обработать учетные данные WiFi из файла"""
-        # Wait a moment for file to be fully written
-        time.sleep(0.5)
-        
-        current_hash = self._get_file_hash()
-        if current_hash == self.last_hash:
-            logger.debug("File hash unchanged, skipping")
+        digest, credentials = read_credentials_file(WIFI_CREDENTIALS_FILE)
+        if digest is None or digest == self.digest.value:
+            logger.debug("Credentials digest unchanged, skipping")
             return
-        
-        self.last_hash = current_hash
-        
-        credentials = self._read_credentials()
         if not credentials:
             logger.warning("No credentials found in file")
             return
@@ -176,16 +94,26 @@ network={{
         
         if not ssid or not password:
             logger.warning("Invalid credentials (missing SSID or password)")
+            self.digest.save(digest)
             return
         
         logger.info(f"Processing WiFi credentials for: {ssid}")
-        self._configure_wifi(ssid, password)
-
+        # TR: Daemon ile aynı: özet yalnızca başarıda kaydedilir, başarısızlıkta silinir | EN: Same as the daemon: the digest is saved only on success and cleared on failure | RU: Как в демоне: хэш сохраняется только при успехе и сбрасывается при неудаче
+        if self._configure_wifi(ssid, password):
+            self.digest.save(digest)
+        else:
+            self.digest.clear()
 
 def main():
     """TR: Ana fonksiyon | EN: Main function | RU: Главная функция"""
     logger.info("WiFi Credentials File Watcher starting...")
     
+    # TR: Daemon dosyayı işliyorsa o durana kadar bekle; aynı ağı iki süreç eklemez | EN: While the daemon handles the file, wait for it to stop; two processes never add the same network | RU: Пока файл обрабатывает демон, ждать его остановки; два процесса не добавляют одну сеть
+    owner = claim_credentials_file()
+    if owner is None:
+        logger.info("OPTIX daemon owns the credentials file, waiting for it to release it...")
+        owner = claim_credentials_file(blocking=True)
+    
     # TR: Dosya yoksa oluştur | EN: Create file if it doesn't exist | RU: Создай файл, если его нет
     Path(WIFI_CREDENTIALS_FILE).touch(exist_ok=True)
     
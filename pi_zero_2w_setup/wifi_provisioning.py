@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+"""
+TR: OPTIX ortak wpa_supplicant yardımcıları | EN: OPTIX shared wpa_supplicant helpers | RU: Общие помощники wpa_supplicant для OPTIX
+TR: Kontrol soketi, PSK türetme ve geri alınabilir ağ ekleme; daemon ve dosya izleyici birlikte kullanır | EN: Control socket, PSK derivation and rollback-safe network provisioning, shared by the daemon and the file watcher | RU: Управляющий сокет, вычисление PSK и настройка сети с откатом; общие для демона и наблюдателя файлов
+"""
+
+import fcntl
+import hashlib
+import itertools
+import json
+import logging
+import os
+import re
+import socket
+import string
+import struct
+import threading
+import time
+from typing import Optional, Tuple
+
+logger = logging.getLogger('OPTIX')
+
+WIFI_INTERFACE = 'wlan0'
+WPA_CTRL_DIR = '/var/run/wpa_supplicant'
+WIFI_CONNECT_TIMEOUT_SEC = 20
+WIFI_DHCP_TIMEOUT_SEC = 15
+SIOCGIFADDR = 0x8915
+STATE_DIR = os.path.expanduser('~/.optix')
+WIFI_CREDENTIALS_FILE = '/tmp/wifi_credentials.json'
+WIFI_CREDENTIALS_DIGEST = os.path.join(STATE_DIR, 'wifi_credentials.sha256')
+# TR: Kimlik dosyasını tek bir süreç işler: daemon ya da bağımsız izleyici | EN: One process handles the credentials file: the daemon or the standalone watcher | RU: Файл учетных данных обрабатывает один процесс: демон или отдельный наблюдатель
+CREDENTIALS_OWNER_LOCK = '/run/optix_wifi_credentials.lock'
+
+class WpaCtrl:
+    """TR: wpa_supplicant kontrol soketi istemcisi | EN: wpa_supplicant control socket client | RU: Клиент управляющего сокета wpa_supplicant"""
+
+    _counter = itertools.count()
+
+    def __init__(self, iface: str = WIFI_INTERFACE, ctrl_dir: str = WPA_CTRL_DIR, timeout: float = 5.0):
+        self.ctrl_path = os.path.join(ctrl_dir, iface)
+        self.local_path = f"/tmp/optix_wpa_{os.getpid()}_{next(self._counter)}"
+        self.timeout = timeout
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self.sock.settimeout(timeout)
+        try:
+            self.sock.bind(self.local_path)
+            self.sock.connect(self.ctrl_path)
+        except OSError:
+            self.close()
+            raise
+
+    @staticmethod
+    def available(iface: str = WIFI_INTERFACE, ctrl_dir: str = WPA_CTRL_DIR) -> bool:
+        return os.path.exists(os.path.join(ctrl_dir, iface))
+
+    def request(self, command: str) -> str:
+        """TR: Komut gönder ve yanıtı döndür | EN: Send a command and return the reply | RU: Отправить команду и вернуть ответ"""
+        self.sock.send(command.encode('utf-8'))
+        while True:
+            reply = self.sock.recv(65536).decode('utf-8', 'replace')
+            # TR: ATTACH sonrası gelen '<N>' olaylarını atla | EN: Skip '<N>' events delivered after ATTACH | RU: Пропускать события '<N>', приходящие после ATTACH
+            if not reply.startswith('<'):
+                return reply
+
+    def command(self, command: str) -> str:
+        """TR: Komutu çalıştır, FAIL yanıtında hata ver | EN: Run a command, raising on a FAIL reply | RU: Выполнить команду, ошибка при ответе FAIL"""
+        reply = self.request(command).strip()
+        if reply.startswith('FAIL') or reply == 'UNKNOWN COMMAND':
+            raise OSError(f"wpa_supplicant {command.split()[0]}: {reply}")
+        return reply
+
+    def attach(self):
+        """TR: Olay almak için abone ol | EN: Subscribe to events | RU: Подписаться на события"""
+        self.command('ATTACH')
+
+    def wait_event(self, markers: tuple, timeout: float) -> Optional[str]:
+        """TR: İşaretlerden birini içeren ilk olayı bekle | EN: Wait for the first event containing one of the markers | RU: Ждать первое событие, содержащее один из маркеров"""
+        deadline = time.monotonic() + timeout
+        try:
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return None
+                self.sock.settimeout(remaining)
+                event = self.sock.recv(4096).decode('utf-8', 'replace')
+                if any(marker in event for marker in markers):
+                    return event
+        except socket.timeout:
+            return None
+        finally:
+            # TR: Sonraki istekler kısalmış zaman aşımını devralmasın | EN: Don't let later requests inherit the shortened timeout | RU: Последующие запросы не должны наследовать сокращенный тайм-аут
+            self.sock.settimeout(self.timeout)
+
+    def close(self):
+        try:
+            self.sock.close()
+        finally:
+            if os.path.exists(self.local_path):
+                os.unlink(self.local_path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def event_network_id(event: str) -> Optional[str]:
+    """TR: Olaydaki ağ kimliği ("[id=3 id_str=]", "id=3 ssid=..."); yoksa None | EN: Network id in an event ("[id=3 id_str=]", "id=3 ssid=..."); None if absent | RU: ID сети в событии ("[id=3 id_str=]", "id=3 ssid=..."); None, если нет"""
+    match = re.search(r'\bid=(\d+)', event)
+    return match.group(1) if match else None
+
+def claim_credentials_file(blocking: bool = False):
+    """TR: Kimlik dosyasının sahipliğini al; başka süreç sahipse None. Kilit dosya kapanınca ya da süreç ölünce bırakılır | EN: Take ownership of the credentials file; None if another process owns it. The lock is released when the file is closed or the process dies | RU: Получить владение файлом учетных данных; None, если им владеет другой процесс. Блокировка снимается при закрытии файла или завершении процесса"""
+    handle = open(CREDENTIALS_OWNER_LOCK, 'a')
+    try:
+        fcntl.flock(handle, fcntl.LOCK_EX | (0 if blocking else fcntl.LOCK_NB))
+    except BlockingIOError:
+        handle.close()
+        return None
+    return handle
+
+def read_credentials_file(path: str) -> Tuple[Optional[str], Optional[dict]]:
+    """TR: Dosyayı bir kez oku: (sha256, kimlik bilgileri); boşsa (None, None), bozuk JSON ise (sha256, None) | EN: Read the file once: (sha256, credentials); (None, None) if empty, (sha256, None) for broken JSON | RU: Прочитать файл один раз: (sha256, учетные данные); (None, None), если пуст, (sha256, None) для битого JSON"""
+    try:
+        with open(path, 'rb') as f:
+            content = f.read()
+    except OSError as e:
+        logger.error(f"Error reading credentials: {e}")
+        return None, None
+    if not content.strip():
+        return None, None
+    digest = hashlib.sha256(content).hexdigest()
+    try:
+        data = json.loads(content)
+    except ValueError as e:
+        logger.error(f"Error reading credentials: {e}")
+        return digest, None
+    return digest, {
+        'ssid': data.get('ssid', ''),
+        'password': data.get('password', ''),
+        'timestamp': data.get('timestamp', '')
+    }
+
+class CredentialsDigest:
+    """TR: Başarıyla uygulanan son kimlik dosyasının sha256 özeti; yeniden başlatmalar arasında korunur | EN: sha256 of the last credentials file that was applied successfully; persisted across restarts | RU: sha256 последнего успешно примененного файла учетных данных; сохраняется между перезапусками"""
+
+    def __init__(self, path: str):
+        self.path = path
+        try:
+            with open(path) as f:
+                self.value = f.read().strip() or None
+        except OSError:
+            self.value = None
+
+    def save(self, digest: str):
+        self.value = digest
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(self.path, 'w') as f:
+                f.write(digest)
+        except OSError as e:
+            logger.warning(f"Could not persist credentials digest: {e}")
+
+    def clear(self):
+        """TR: Başarısız denemeden sonra aynı içeriğin yeniden gönderilmesi tekrar uygulanır | EN: After a failed attempt, re-sending the same content applies it again | RU: После неудачной попытки повторная отправка того же содержимого снова применяется"""
+        self.value = None
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.warning(f"Could not clear credentials digest: {e}")
+
+def wpa_psk(ssid: str, password: str) -> str:
+    """TR: Parolayı 256-bit PSK'ya çevir; düz metin parola yapılandırmaya yazılmaz | EN: Derive the 256-bit PSK so the plain passphrase never reaches the config | RU: Вычислить 256-битный PSK, чтобы пароль в открытом виде не попадал в конфиг"""
+    if len(password) == 64 and all(c in string.hexdigits for c in password):
+        return password.lower()
+    if not 8 <= len(password) <= 63:
+        raise ValueError("WPA passphrase must be 8-63 characters")
+    return hashlib.pbkdf2_hmac('sha1', password.encode('utf-8'), ssid.encode('utf-8'), 4096, 32).hex()
+
+def wpa_ssid_text(ssid: str) -> str:
+    """TR: SSID'nin LIST_NETWORKS/STATUS çıktısındaki kaçışlı biçimi (wpa_supplicant printf_encode) | EN: The escaped SSID form printed by LIST_NETWORKS/STATUS (wpa_supplicant printf_encode) | RU: Экранированная форма SSID в выводе LIST_NETWORKS/STATUS (printf_encode из wpa_supplicant)"""
+    escapes = {0x22: '\\"', 0x5C: '\\\\', 0x1B: '\\e', 0x0A: '\\n', 0x0D: '\\r', 0x09: '\\t'}
+    return ''.join(escapes.get(byte) or (chr(byte) if 32 <= byte <= 126 else f'\\x{byte:02x}')
+                   for byte in ssid.encode('utf-8'))
+
+def interface_ipv4(iface: str = WIFI_INTERFACE) -> Optional[str]:
+    """TR: Arayüzün IPv4 adresi (alt süreç olmadan) | EN: Interface IPv4 address (without a subprocess) | RU: IPv4-адрес интерфейса (без подпроцесса)"""
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+        try:
+            packed = fcntl.ioctl(sock.fileno(), SIOCGIFADDR, struct.pack('256s', iface.encode()[:15]))
+        except OSError:
+            return None
+    return socket.inet_ntoa(packed[20:24])
+
+class WpaProvisioner:
+    """TR: Kontrol soketi üzerinden ağ ekleme adımları | EN: Network provisioning steps over the control socket | RU: Шаги настройки сети через управляющий сокет"""
+
+    def __init__(self, ssid: str, psk: str):
+        self.ssid = ssid
+        self.psk = psk
+        self.network_id = None
+        self.stale_ids = []  # Older entries for the same SSID, removed only on commit
+        self.committed = False
+        self.monitor = WpaCtrl()
+        try:
+            self.ctrl = WpaCtrl()
+        except OSError:
+            self.monitor.close()
+            raise
+
+    def configure(self):
+        """TR: Olaylara abone ol ve ağı ekle | EN: Subscribe to events and add the network | RU: Подписаться на события и добавить сеть"""
+        self.monitor.attach()
+        # TR: Aynı SSID'nin eski kayıtlarını not et; yeni ağ doğrulanmadan silinmez | EN: Note stale entries for the same SSID; they aren't removed before the new one is verified | RU: Запомнить старые записи того же SSID; они не удаляются до проверки новой
+        escaped = wpa_ssid_text(self.ssid)
+        for line in self.ctrl.request('LIST_NETWORKS').splitlines()[1:]:
+            fields = line.split('\t')
+            if len(fields) > 1 and fields[1] == escaped:
+                self.stale_ids.append(fields[0])
+        self.network_id = self.ctrl.command('ADD_NETWORK')
+        self.ctrl.command(f'SET_NETWORK {self.network_id} ssid {self.ssid.encode("utf-8").hex()}')
+        self.ctrl.command(f'SET_NETWORK {self.network_id} psk {self.psk}')
+        self.ctrl.command(f'SET_NETWORK {self.network_id} key_mgmt WPA-PSK')
+
+    def associate(self, cancelled: threading.Event, timeout: float = WIFI_CONNECT_TIMEOUT_SEC) -> Optional[str]:
+        """TR: Ağı seç ve bağlantı olayını bekle; iptal edilirse None | EN: Select the network and wait for the connect event; None if cancelled | RU: Выбрать сеть и ждать событие подключения; None при отмене"""
+        self.ctrl.command(f'SELECT_NETWORK {self.network_id}')
+        deadline = time.monotonic() + timeout
+        # TR: İptali fark etmek için kısa dilimlerle bekle | EN: Wait in short slices so cancellation is noticed | RU: Ждать короткими интервалами, чтобы заметить отмену
+        while not cancelled.is_set():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise OSError(f"no association within {timeout}s")
+            event = self.monitor.wait_event(('CTRL-EVENT-CONNECTED', 'reason=WRONG_KEY'), min(0.25, remaining))
+            # TR: Başka bir ağın olayı (ör. önceki ağa yeniden bağlanma) bu denemeyi sonuçlandırmaz | EN: An event for another network (e.g. a reconnect to the previous one) doesn't settle this attempt | RU: Событие другой сети (например, повторное подключение к прежней) не завершает эту попытку
+            if event is None or event_network_id(event) not in (None, self.network_id):
+                continue
+            if 'CTRL-EVENT-CONNECTED' not in event:
+                raise OSError("wrong password")
+            return event
+        return None
+
+    def commit(self):
+        """TR: Aynı SSID'nin eski kayıtlarını sil; diğer bilinen ağlar dolaşım için etkin kalır; yapılandırmayı kaydet | EN: Drop older entries for the same SSID; other known networks stay enabled for roaming; save the config | RU: Удалить старые записи того же SSID; другие известные сети остаются включенными для роуминга; сохранить конфиг"""
+        for network_id in self.stale_ids:
+            try:
+                self.ctrl.command(f'REMOVE_NETWORK {network_id}')
+            except OSError as e:
+                logger.warning(f"Could not remove stale network {network_id}: {e}")
+        self.ctrl.command('ENABLE_NETWORK all')
+        self.ctrl.command('SAVE_CONFIG')
+        self.committed = True
+
+    def rollback(self):
+        """TR: Yeni ağı geri al, önceki ağları yeniden etkinleştir | EN: Roll back the new network and re-enable the previous ones | RU: Откатить новую сеть и снова включить прежние"""
+        try:
+            if self.network_id is not None:
+                self.ctrl.command(f'REMOVE_NETWORK {self.network_id}')
+            self.ctrl.command('ENABLE_NETWORK all')
+        except OSError as e:
+            logger.warning(f"WiFi rollback failed: {e}")
+
+    def close(self):
+        if not self.committed:
+            self.rollback()
+        self.ctrl.close()
+        self.monitor.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def wait_for_address(cancelled: threading.Event, timeout: float = WIFI_DHCP_TIMEOUT_SEC) -> Optional[str]:
+    """TR: DHCP kirası için IPv4 adresini yokla; iptal edilirse None | EN: Poll for the DHCP-leased IPv4 address; None if cancelled | RU: Опрашивать IPv4-адрес от DHCP; None при отмене"""
+    deadline = time.monotonic() + timeout
+    address = interface_ipv4()
+    while address is None:
+        if cancelled.wait(0.1):
+            return None
+        if time.monotonic() > deadline:
+            raise OSError(f"no DHCP lease within {timeout}s")
+        address = interface_ipv4()
+    return address
@@ -0,0 +1,193 @@
+-- OPTIX migration 001: numeric bounding boxes for results
+-- Adds box_points INTEGER[8] / box_bounds BOX next to the TEXT box column, backfills existing rows
+-- in batches and builds the GiST index used by results_in_region().
+-- Mirrors section 20 of supabase_setup.sql; safe to run more than once.
+-- Run with psql outside a transaction (the backfill commits per batch, the index is built CONCURRENTLY):
+--   psql "$DATABASE_URL" -f supabase_migrations/001_results_box_numeric.sql
+
+-- 1. Columns (constraint validated after the backfill)
+ALTER TABLE public.results
+    ADD COLUMN IF NOT EXISTS box_points INTEGER[],
+    ADD COLUMN IF NOT EXISTS box_bounds BOX;
+
+DO $$
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM pg_constraint WHERE conname = 'results_box_points_check') THEN
+        ALTER TABLE public.results
+            ADD CONSTRAINT results_box_points_check
+            CHECK (box_points IS NULL OR cardinality(box_points) = 8) NOT VALID;
+    END IF;
+END $$;
+
+-- 2. Parsing helpers and write trigger
+CREATE OR REPLACE FUNCTION parse_box_points(box_text TEXT)
+RETURNS INTEGER[] AS $$
+DECLARE
+    points INTEGER[];
+BEGIN
+    SELECT array_agg(round(c.v::NUMERIC)::INTEGER ORDER BY p.i, c.j)
+    INTO points
+    FROM jsonb_array_elements(box_text::JSONB) WITH ORDINALITY AS p(pt, i),
+         jsonb_array_elements_text(p.pt) WITH ORDINALITY AS c(v, j);
+    IF cardinality(points) = 8 THEN
+        RETURN points;
+    END IF;
+    RETURN NULL;
+EXCEPTION
+    WHEN others THEN
+        RETURN NULL;
+END;
+$$ LANGUAGE plpgsql IMMUTABLE;
+
+CREATE OR REPLACE FUNCTION box_points_bounds(points INTEGER[])
+RETURNS BOX AS $$
+    SELECT box(
+        point(least(points[1], points[3], points[5], points[7]), least(points[2], points[4], points[6], points[8])),
+        point(greatest(points[1], points[3], points[5], points[7]), greatest(points[2], points[4], points[6], points[8])))
+    WHERE cardinality(points) = 8;
+$$ LANGUAGE sql IMMUTABLE;
+
+CREATE OR REPLACE FUNCTION results_box_columns()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF NEW.box_points IS NULL
+       OR (TG_OP = 'UPDATE' AND NEW.box IS DISTINCT FROM OLD.box AND NEW.box_points IS NOT DISTINCT FROM OLD.box_points) THEN
+        NEW.box_points := parse_box_points(NEW.box);
+    END IF;
+    NEW.box_bounds := box_points_bounds(NEW.box_points);
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS results_box_columns ON public.results;
+CREATE TRIGGER results_box_columns
+    BEFORE INSERT OR UPDATE ON public.results
+    FOR EACH ROW
+    EXECUTE FUNCTION results_box_columns();
+
+-- 3. Backfill in id order, 5000 rows per transaction (new writes are covered by the trigger)
+DO $$
+DECLARE
+    last_id UUID := '00000000-0000-0000-0000-000000000000';
+    batch_last UUID;
+    done BIGINT := 0;
+    batch_rows INTEGER;
+BEGIN
+    LOOP
+        WITH batch AS (
+            SELECT id FROM public.results
+            WHERE id > last_id
+            ORDER BY id
+            LIMIT 5000
+        ),
+        updated AS (
+            UPDATE public.results r
+            SET box_points = parse_box_points(r.box)
+            FROM batch
+            WHERE r.id = batch.id AND r.box_points IS NULL AND r.box IS NOT NULL
+            RETURNING 1
+        )
+        SELECT (SELECT max(id::TEXT)::UUID FROM batch), (SELECT count(*) FROM updated)
+        INTO batch_last, batch_rows;
+
+        EXIT WHEN batch_last IS NULL;
+        last_id := batch_last;
+        done := done + batch_rows;
+        COMMIT;
+        RAISE NOTICE 'box backfill: % rows updated (through %)', done, last_id;
+    END LOOP;
+END $$;
+
+ALTER TABLE public.results VALIDATE CONSTRAINT results_box_points_check;
+
+-- 4. Region index
+CREATE EXTENSION IF NOT EXISTS btree_gist;
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_results_user_box ON public.results USING GIST (created_by, box_bounds);
+
+-- 5. Region query and search_results with numeric boxes (return type changes, so drop first)
+CREATE OR REPLACE FUNCTION results_in_region(
+    p_user UUID,
+    p_x1 INTEGER,
+    p_y1 INTEGER,
+    p_x2 INTEGER,
+    p_y2 INTEGER,
+    p_margin INTEGER DEFAULT 0,
+    p_file VARCHAR(255) DEFAULT NULL,
+    p_text_type VARCHAR(50) DEFAULT NULL,
+    p_limit INTEGER DEFAULT 200
+)
+RETURNS TABLE(
+    id UUID,
+    file VARCHAR(255),
+    ts DOUBLE PRECISION,
+    text_index INTEGER,
+    text_type VARCHAR(50),
+    text TEXT,
+    confidence DOUBLE PRECISION,
+    box_points INTEGER[],
+    created_at TIMESTAMP WITH TIME ZONE
+) AS $$
+    SELECT r.id, r.file, r.ts, r.text_index, r.text_type, r.text, r.confidence, r.box_points, r.created_at
+    FROM public.results r
+    WHERE r.created_by = p_user
+      AND r.box_bounds && box(point(p_x1 - p_margin, p_y1 - p_margin), point(p_x2 + p_margin, p_y2 + p_margin))
+      AND (p_file IS NULL OR r.file = p_file)
+      AND (p_text_type IS NULL OR r.text_type = p_text_type)
+    ORDER BY r.created_at DESC, r.text_index
+    LIMIT p_limit;
+$$ LANGUAGE sql STABLE;
+
+GRANT EXECUTE ON FUNCTION results_in_region(UUID, INTEGER, INTEGER, INTEGER, INTEGER, INTEGER, VARCHAR, VARCHAR, INTEGER) TO anon, authenticated;
+
+DROP FUNCTION IF EXISTS search_results(UUID, TEXT, INTEGER, REAL);
+CREATE OR REPLACE FUNCTION search_results(
+    p_user UUID,
+    p_query TEXT,
+    p_limit INTEGER DEFAULT 20,
+    p_fuzzy_threshold REAL DEFAULT 0.5
+)
+RETURNS TABLE(
+    id UUID,
+    file VARCHAR(255),
+    ts DOUBLE PRECISION,
+    text_index INTEGER,
+    text_type VARCHAR(50),
+    text TEXT,
+    box TEXT,
+    box_points INTEGER[],
+    rank REAL,
+    created_at TIMESTAMP WITH TIME ZONE
+) AS $$
+#variable_conflict use_column
+BEGIN
+    -- <% uses this threshold and can be answered from the trigram index
+    PERFORM set_config('pg_trgm.word_similarity_threshold', p_fuzzy_threshold::TEXT, true);
+
+    RETURN QUERY
+    WITH q AS (
+        SELECT websearch_to_tsquery('simple', p_query) AS tsq
+    ),
+    matches AS (
+        SELECT r.id, r.file, r.ts, r.text_index, r.text_type, r.text, r.box, r.box_points, r.created_at,
+               1.0 + ts_rank_cd(r.text_search, q.tsq) AS score
+        FROM public.results r, q
+        WHERE r.created_by = p_user AND r.text_search @@ q.tsq
+        UNION ALL
+        SELECT r.id, r.file, r.ts, r.text_index, r.text_type, r.text, r.box, r.box_points, r.created_at,
+               word_similarity(p_query, r.text) AS score
+        FROM public.results r
+        WHERE r.created_by = p_user AND p_query <% r.text
+    ),
+    best AS (
+        SELECT DISTINCT ON (m.file, m.text_index) m.*
+        FROM matches m
+        ORDER BY m.file, m.text_index, m.score DESC, (m.text_type = 'meaning_corrected') DESC
+    )
+    SELECT b.id, b.file, b.ts, b.text_index, b.text_type, b.text, b.box, b.box_points, b.score::REAL, b.created_at
+    FROM best b
+    ORDER BY b.score DESC, b.created_at DESC
+    LIMIT p_limit;
+END;
+$$ LANGUAGE plpgsql;
+
+GRANT EXECUTE ON FUNCTION search_results(UUID, TEXT, INTEGER, REAL) TO anon, authenticated;
@@ -0,0 +1,325 @@
+-- OPTIX migration 002: one row per text block (result_blocks) behind a results compatibility view
+-- Folds the raw / character_corrected / meaning_corrected rows of each (created_by, file, text_index)
+-- into a single result_blocks row with the stage texts in variants, renames the old table to
+-- results_legacy and puts the public.results view (plus write triggers) in its place.
+-- Mirrors sections 5, 19, 20 and 21 of supabase_setup.sql. Requires migration 001.
+-- Run with psql outside a transaction (the backfill commits per user):
+--   psql "$DATABASE_URL" -f supabase_migrations/002_result_blocks.sql
+-- Size/latency before and after: pi_zero_2w_setup/bench_result_layout.py
+
+-- 1. Keep the old table under a new name; writers see a short gap until step 5
+DO $$
+BEGIN
+    IF (SELECT relkind FROM pg_class WHERE oid = to_regclass('public.results')) = 'r' THEN
+        ALTER TABLE public.results RENAME TO results_legacy;
+        DROP TRIGGER IF EXISTS update_results_updated_at ON public.results_legacy;
+    END IF;
+END $$;
+
+-- 2. Block table and helpers
+CREATE TABLE IF NOT EXISTS public.result_blocks (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    created_by UUID NOT NULL REFERENCES public.users(id) ON DELETE CASCADE,
+    file VARCHAR(255),
+    ts DOUBLE PRECISION,
+    text_index INTEGER,
+    confidence DOUBLE PRECISION,
+    box TEXT,
+    box_points INTEGER[] CHECK (box_points IS NULL OR cardinality(box_points) = 8), -- x1,y1,...,x4,y4; filled from box by trigger (section 20)
+    box_bounds BOX, -- axis-aligned bounds of box_points, for region queries
+    variants JSONB NOT NULL DEFAULT '{}'::JSONB, -- {"raw": "...", "character_corrected": "...", "meaning_corrected": "..."}
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    CONSTRAINT result_blocks_block_key UNIQUE NULLS NOT DISTINCT (created_by, file, text_index)
+);
+
+CREATE OR REPLACE FUNCTION update_updated_at_column()
+RETURNS TRIGGER AS $$
+BEGIN
+    NEW.updated_at = NOW();
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS update_result_blocks_updated_at ON public.result_blocks;
+CREATE TRIGGER update_result_blocks_updated_at
+    BEFORE UPDATE ON public.result_blocks
+    FOR EACH ROW
+    EXECUTE FUNCTION update_updated_at_column();
+
+DROP TRIGGER IF EXISTS result_blocks_box_columns ON public.result_blocks;
+CREATE TRIGGER result_blocks_box_columns
+    BEFORE INSERT OR UPDATE ON public.result_blocks
+    FOR EACH ROW
+    EXECUTE FUNCTION results_box_columns();
+
+ALTER TABLE public.result_blocks DISABLE ROW LEVEL SECURITY;
+GRANT ALL ON public.result_blocks TO authenticated;
+
+-- All stage texts of a block in one string; IMMUTABLE so it can back the search column and index
+CREATE OR REPLACE FUNCTION result_block_text(variants JSONB)
+RETURNS TEXT AS $$
+    SELECT coalesce(string_agg(v.value, E'\n' ORDER BY v.key), '')
+    FROM jsonb_each_text(variants) AS v(key, value);
+$$ LANGUAGE sql IMMUTABLE;
+
+-- Stage shown for a block when no stage is asked for: the most corrected one
+CREATE OR REPLACE FUNCTION result_block_stage(variants JSONB)
+RETURNS TEXT AS $$
+    SELECT k.key
+    FROM jsonb_object_keys(variants) AS k(key)
+    ORDER BY array_position(ARRAY['meaning_corrected', 'character_corrected', 'raw'], k.key) NULLS LAST, k.key
+    LIMIT 1;
+$$ LANGUAGE sql IMMUTABLE;
+
+-- Stable id of one stage of a block (the id column of the compatibility view)
+CREATE OR REPLACE FUNCTION result_stage_id(block_id UUID, stage TEXT)
+RETURNS UUID AS $$
+    SELECT md5(block_id::TEXT || '/' || stage)::UUID;
+$$ LANGUAGE sql IMMUTABLE;
+
+ALTER TABLE public.result_blocks
+    ADD COLUMN IF NOT EXISTS text_search TSVECTOR
+    GENERATED ALWAYS AS (to_tsvector('simple', public.result_block_text(variants))) STORED;
+
+-- 3. Backfill one user per transaction; later stages win when a stage was stored twice
+DO $$
+DECLARE
+    owner UUID;
+    moved BIGINT := 0;
+    block_rows BIGINT;
+BEGIN
+    IF to_regclass('public.results_legacy') IS NULL THEN
+        RETURN;
+    END IF;
+    FOR owner IN SELECT DISTINCT created_by FROM public.results_legacy LOOP
+        INSERT INTO public.result_blocks AS rb (created_by, file, ts, text_index, confidence, box, box_points, variants, created_at)
+        SELECT l.created_by, l.file, min(l.ts), l.text_index, max(l.confidence), min(l.box),
+               (array_agg(l.box_points) FILTER (WHERE l.box_points IS NOT NULL))[1],
+               jsonb_object_agg(coalesce(l.text_type, 'raw'), l.text ORDER BY l.created_at),
+               min(l.created_at)
+        FROM public.results_legacy l
+        WHERE l.created_by = owner
+        GROUP BY l.created_by, l.file, l.text_index
+        ON CONFLICT ON CONSTRAINT result_blocks_block_key DO UPDATE SET
+            variants = EXCLUDED.variants || rb.variants;
+        GET DIAGNOSTICS block_rows = ROW_COUNT;
+        moved := moved + block_rows;
+        COMMIT;
+    END LOOP;
+    RAISE NOTICE 'result_blocks: % blocks from % legacy rows', moved, (SELECT count(*) FROM public.results_legacy);
+END $$;
+
+-- 4. Indexes, built once the rows are in
+CREATE INDEX IF NOT EXISTS idx_result_blocks_user_date ON public.result_blocks (created_by, created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_result_blocks_file ON public.result_blocks (file);
+CREATE INDEX IF NOT EXISTS idx_result_blocks_user_text_search ON public.result_blocks USING GIN (created_by, text_search);
+CREATE INDEX IF NOT EXISTS idx_result_blocks_user_text_trgm ON public.result_blocks USING GIN (created_by, result_block_text(variants) gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_result_blocks_user_box ON public.result_blocks USING GIST (created_by, box_bounds);
+ANALYZE public.result_blocks;
+
+-- 5. RPCs on the new layout, then the compatibility view
+-- Ranked search for one user: exact term matches first, then typo-tolerant trigram matches.
+-- One hit per text block, shown with its most corrected stage.
+CREATE OR REPLACE FUNCTION search_results(
+    p_user UUID,
+    p_query TEXT,
+    p_limit INTEGER DEFAULT 20,
+    p_fuzzy_threshold REAL DEFAULT 0.5
+)
+RETURNS TABLE(
+    id UUID,
+    file VARCHAR(255),
+    ts DOUBLE PRECISION,
+    text_index INTEGER,
+    text_type VARCHAR(50),
+    text TEXT,
+    box TEXT,
+    box_points INTEGER[],
+    rank REAL,
+    created_at TIMESTAMP WITH TIME ZONE
+) AS $$
+#variable_conflict use_column
+BEGIN
+    -- <% uses this threshold and can be answered from the trigram index
+    PERFORM set_config('pg_trgm.word_similarity_threshold', p_fuzzy_threshold::TEXT, true);
+
+    RETURN QUERY
+    WITH q AS (
+        SELECT websearch_to_tsquery('simple', p_query) AS tsq
+    ),
+    matches AS (
+        SELECT b.id, 1.0 + ts_rank_cd(b.text_search, q.tsq) AS score
+        FROM public.result_blocks b, q
+        WHERE b.created_by = p_user AND b.text_search @@ q.tsq
+        UNION ALL
+        SELECT b.id, word_similarity(p_query, result_block_text(b.variants)) AS score
+        FROM public.result_blocks b
+        WHERE b.created_by = p_user AND p_query <% result_block_text(b.variants)
+    ),
+    best AS (
+        SELECT m.id, max(m.score) AS score
+        FROM matches m
+        GROUP BY m.id
+        ORDER BY max(m.score) DESC
+        LIMIT p_limit
+    )
+    SELECT result_stage_id(b.id, s.stage), b.file, b.ts, b.text_index, s.stage::VARCHAR(50),
+           b.variants->>s.stage, b.box, b.box_points, best.score::REAL, b.created_at
+    FROM best
+    JOIN public.result_blocks b ON b.id = best.id
+    CROSS JOIN LATERAL (SELECT result_block_stage(b.variants) AS stage) s
+    ORDER BY best.score DESC, b.created_at DESC;
+END;
+$$ LANGUAGE plpgsql;
+
+GRANT EXECUTE ON FUNCTION search_results(UUID, TEXT, INTEGER, REAL) TO anon, authenticated;
+
+-- Text blocks of one user whose bounds overlap a region (optionally widened by p_margin pixels).
+-- p_text_type picks the stage; without it each block comes with its most corrected stage.
+CREATE OR REPLACE FUNCTION results_in_region(
+    p_user UUID,
+    p_x1 INTEGER,
+    p_y1 INTEGER,
+    p_x2 INTEGER,
+    p_y2 INTEGER,
+    p_margin INTEGER DEFAULT 0,
+    p_file VARCHAR(255) DEFAULT NULL,
+    p_text_type VARCHAR(50) DEFAULT NULL,
+    p_limit INTEGER DEFAULT 200
+)
+RETURNS TABLE(
+    id UUID,
+    file VARCHAR(255),
+    ts DOUBLE PRECISION,
+    text_index INTEGER,
+    text_type VARCHAR(50),
+    text TEXT,
+    confidence DOUBLE PRECISION,
+    box_points INTEGER[],
+    created_at TIMESTAMP WITH TIME ZONE
+) AS $$
+    SELECT result_stage_id(b.id, s.stage), b.file, b.ts, b.text_index, s.stage::VARCHAR(50),
+           b.variants->>s.stage, b.confidence, b.box_points, b.created_at
+    FROM public.result_blocks b
+    CROSS JOIN LATERAL (SELECT coalesce(p_text_type, result_block_stage(b.variants)) AS stage) s
+    WHERE b.created_by = p_user
+      AND b.box_bounds && box(point(p_x1 - p_margin, p_y1 - p_margin), point(p_x2 + p_margin, p_y2 + p_margin))
+      AND (p_file IS NULL OR b.file = p_file)
+      AND (p_text_type IS NULL OR b.variants ? p_text_type)
+    ORDER BY b.created_at DESC, b.text_index
+    LIMIT p_limit;
+$$ LANGUAGE sql STABLE;
+
+GRANT EXECUTE ON FUNCTION results_in_region(UUID, INTEGER, INTEGER, INTEGER, INTEGER, INTEGER, VARCHAR, VARCHAR, INTEGER) TO anon, authenticated;
+
+CREATE OR REPLACE VIEW public.results WITH (security_invoker = true) AS
+SELECT result_stage_id(b.id, v.key) AS id,
+       b.created_by,
+       b.file,
+       b.ts,
+       b.text_index,
+       v.key::VARCHAR(50) AS text_type,
+       v.value AS text,
+       b.confidence,
+       b.box,
+       b.box_points,
+       b.box_bounds,
+       b.created_at,
+       b.updated_at,
+       b.id AS block_id
+FROM public.result_blocks b
+CROSS JOIN LATERAL jsonb_each_text(b.variants) AS v(key, value);
+
+GRANT SELECT, INSERT, UPDATE, DELETE ON public.results TO authenticated;
+
+-- Block-level fields (file, ts, box, confidence) are shared by all stages of a block:
+-- changing them through one stage row changes them for its siblings as well.
+CREATE OR REPLACE FUNCTION results_view_write()
+RETURNS TRIGGER AS $$
+DECLARE
+    block UUID;
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        NEW.text_type := coalesce(NEW.text_type, 'raw');
+        INSERT INTO public.result_blocks (created_by, file, ts, text_index, confidence, box, box_points, variants)
+        VALUES (NEW.created_by, NEW.file, NEW.ts, NEW.text_index, NEW.confidence, NEW.box, NEW.box_points,
+                jsonb_build_object(NEW.text_type, NEW.text))
+        ON CONFLICT ON CONSTRAINT result_blocks_block_key DO UPDATE SET
+            variants = result_blocks.variants || EXCLUDED.variants,
+            ts = coalesce(result_blocks.ts, EXCLUDED.ts),
+            confidence = coalesce(result_blocks.confidence, EXCLUDED.confidence),
+            box = coalesce(result_blocks.box, EXCLUDED.box),
+            box_points = coalesce(result_blocks.box_points, EXCLUDED.box_points)
+        RETURNING id INTO block;
+        NEW.id := result_stage_id(block, NEW.text_type);
+        NEW.block_id := block;
+        RETURN NEW;
+    ELSIF TG_OP = 'UPDATE' THEN
+        UPDATE public.result_blocks SET
+            file = NEW.file,
+            ts = NEW.ts,
+            text_index = NEW.text_index,
+            confidence = NEW.confidence,
+            box = NEW.box,
+            box_points = NEW.box_points,
+            variants = (variants - OLD.text_type::TEXT) || jsonb_build_object(coalesce(NEW.text_type, OLD.text_type), NEW.text)
+        WHERE id = OLD.block_id;
+        NEW.id := result_stage_id(OLD.block_id, coalesce(NEW.text_type, OLD.text_type));
+        RETURN NEW;
+    ELSE
+        UPDATE public.result_blocks SET variants = variants - OLD.text_type::TEXT WHERE id = OLD.block_id;
+        DELETE FROM public.result_blocks WHERE id = OLD.block_id AND variants = '{}'::JSONB;
+        RETURN OLD;
+    END IF;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS results_view_write ON public.results;
+CREATE TRIGGER results_view_write
+    INSTEAD OF INSERT OR UPDATE OR DELETE ON public.results
+    FOR EACH ROW
+    EXECUTE FUNCTION results_view_write();
+
+-- Bulk write path for the uploaders: stage rows in, one upsert per block out.
+-- Stages of one block may arrive in different calls; variants are merged, so retries are harmless.
+CREATE OR REPLACE FUNCTION upsert_results(p_rows JSONB)
+RETURNS INTEGER AS $$
+    WITH incoming AS (
+        SELECT r.created_by, r.file, r.ts, r.text_index, coalesce(r.text_type, 'raw') AS text_type,
+               r.text, r.confidence, r.box, r.box_points, coalesce(r.created_at, NOW()) AS created_at
+        FROM jsonb_to_recordset(p_rows) AS r(
+            created_by UUID, file VARCHAR(255), ts DOUBLE PRECISION, text_index INTEGER, text_type VARCHAR(50),
+            text TEXT, confidence DOUBLE PRECISION, box TEXT, box_points INTEGER[], created_at TIMESTAMP WITH TIME ZONE)
+    ),
+    blocks AS (
+        -- ON CONFLICT may touch a row only once per statement, so a block's stages are folded first
+        SELECT i.created_by, i.file, i.text_index,
+               min(i.ts) AS ts,
+               max(i.confidence) AS confidence,
+               min(i.box) AS box,
+               (array_agg(i.box_points) FILTER (WHERE i.box_points IS NOT NULL))[1] AS box_points,
+               jsonb_object_agg(i.text_type, i.text) AS variants,
+               min(i.created_at) AS created_at
+        FROM incoming i
+        GROUP BY i.created_by, i.file, i.text_index
+    ),
+    written AS (
+        INSERT INTO public.result_blocks AS rb (created_by, file, ts, text_index, confidence, box, box_points, variants, created_at)
+        SELECT created_by, file, ts, text_index, confidence, box, box_points, variants, created_at
+        FROM blocks
+        ON CONFLICT ON CONSTRAINT result_blocks_block_key DO UPDATE SET
+            variants = rb.variants || EXCLUDED.variants,
+            ts = coalesce(rb.ts, EXCLUDED.ts),
+            confidence = coalesce(rb.confidence, EXCLUDED.confidence),
+            box = coalesce(rb.box, EXCLUDED.box),
+            box_points = coalesce(rb.box_points, EXCLUDED.box_points)
+        RETURNING 1
+    )
+    SELECT count(*)::INTEGER FROM written;
+$$ LANGUAGE sql;
+
+GRANT EXECUTE ON FUNCTION upsert_results(JSONB) TO anon, authenticated;
+
+-- 6. After checking the counts above (and the app), drop the old table:
+--   DROP TABLE public.results_legacy;